@@ -0,0 +1,95 @@
+"""
+Splid ingest: wall time and peak memory (tracemalloc) of the .xls path (pandas + xlrd)
+vs the streaming CSV / JSON Lines readers on the same sheet.
+
+  python scripts/bench_splid_ingest.py [--rows 20000,100000] [--xls path/to/export.xls]
+
+Without --xls a synthetic sheet is generated, which needs xlwt to write the .xls
+(pip install -r requirements-dev.txt). With --xls the workbook is converted to CSV / JSON Lines once
+and every reader parses the same cells.
+"""
+from pathlib import Path
+import argparse
+import json
+from itertools import islice
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO = Path(__file__).resolve().parents[1]
+SRC = REPO / "src"
+if str(SRC) not in sys.path:
+  sys.path.insert(0, str(SRC))
+
+from ingest.splid import iter_splid
+from synthetic import HOUSEMATES, splid_sheet, synthetic_expenses, write_csv, write_xls
+
+MEMBERS = ["Alex", *HOUSEMATES]
+
+def synthetic_sheet(n_rows: int, seed: int = 7) -> list[list]:
+  """Splid-shaped grid of `n_rows` expenses over a year, shared three ways."""
+  return splid_sheet(MEMBERS, islice(synthetic_expenses(MEMBERS, 12, -(-n_rows // 12), seed=seed), n_rows))
+
+def read_xls_grid(path: Path) -> list[list]:
+  import pandas as pd
+  df = pd.read_excel(path, header=None, dtype=object, engine="xlrd")
+  return [["" if pd.isna(v) else v for v in row] for row in df.itertuples(index=False)]
+
+def write_jsonl(grid: list[list], path: Path) -> None:
+  with path.open("w", encoding="utf-8") as f:
+    for row in grid:
+      f.write(json.dumps(row) + "\n")
+
+def _measure(path: Path, name: str):
+  # time an untraced run; tracemalloc slows allocation-heavy code several times over
+  t0 = time.perf_counter()
+  n = sum(1 for _ in iter_splid(path, name))
+  dt = time.perf_counter() - t0
+  tracemalloc.start()
+  sum(1 for _ in iter_splid(path, name))
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  return n, dt, peak
+
+def _cell(res) -> str:
+  return f"{res[1]:.2f}s {res[2] / 2**20:.1f}MiB"
+
+def main():
+  ap = argparse.ArgumentParser()
+  ap.add_argument("--rows", default="20000,100000")
+  ap.add_argument("--xls", type=Path, default=None, help="benchmark on a real Splid export instead")
+  args = ap.parse_args()
+
+  sizes = [None] if args.xls else [int(x) for x in args.rows.split(",")]
+  print(f"{'rows':>8} | {'xls':>18} | {'csv':>18} | {'jsonl':>18} | csv speedup")
+  for n in sizes:
+    with tempfile.TemporaryDirectory() as tmp:
+      tmp = Path(tmp)
+      if args.xls:
+        grid, xls = read_xls_grid(args.xls), args.xls
+      else:
+        grid, xls = synthetic_sheet(n), tmp / "export.xls"
+        write_xls(grid, xls)
+      write_csv(grid, tmp / "export.csv")
+      write_jsonl(grid, tmp / "export.jsonl")
+      name = MEMBERS[0] if not args.xls else _first_member(grid)
+
+      r_xls = _measure(xls, name)
+      r_csv = _measure(tmp / "export.csv", name)
+      r_jsonl = _measure(tmp / "export.jsonl", name)
+      if r_xls[0] != r_csv[0]:
+        print(f"[WARN] row counts differ: xls {r_xls[0]}, csv {r_csv[0]}")
+      print(f"{r_csv[0]:>8} | {_cell(r_xls):>18} | {_cell(r_csv):>18} | {_cell(r_jsonl):>18} | {r_xls[1] / r_csv[1]:.1f}x")
+
+def _first_member(grid: list[list]) -> str:
+  """First member column of a real export (header row = the one with Title/Amount/By)."""
+  from ingest.splid import _pick_header_idx, _KNOWN_HEADERS
+  header = [str(c) for c in grid[_pick_header_idx([[str(c) for c in r] for r in grid[:10]])]]
+  for c in header:
+    if c.strip() and c.strip().lower() not in _KNOWN_HEADERS:
+      return c.strip()
+  raise SystemExit("no member column found in the header")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,101 @@
+"""
+Peak memory (tracemalloc) and wall time: batch run_pipeline vs run_pipeline_streaming
+on synthetic Splid histories of growing length. Outputs go to a temp dir.
+The "spill" column is the streaming path's own memory (normalize -> month partitions ->
+read back month by month); it must stay flat as months grow, else the script exits 1.
+The full streaming run also holds the persisted history state (recurring observations,
+anomaly keys, the sqlite store), which grows with the rows by design.
+
+  python scripts/bench_streaming.py [--months 12,60,240] [--rows-per-month 400]
+"""
+from pathlib import Path
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+
+REPO = Path(__file__).resolve().parents[1]
+SRC = REPO / "src"
+if str(SRC) not in sys.path:
+  sys.path.insert(0, str(SRC))
+
+from config.loader import load_unified_config
+from core.spill import MonthPartitions
+from normalize import iter_normalized, normalize_rows
+from synthetic import HOUSEMATES, raw_row, synthetic_expenses
+import pipeline
+
+# spill peak at the most months may exceed the fewest by this factor plus slack
+FLAT_FACTOR = 1.5
+FLAT_SLACK = 0.5 * 2**20
+
+def synthetic_raw_rows(n_months: int, rows_per_month: int, your_name: str, seed: int = 7):
+  """Lazily yield Splid-shaped raw rows, newest month first (like the export)."""
+  members = [your_name, *HOUSEMATES]
+  for e in synthetic_expenses(members, n_months, rows_per_month, seed=seed):
+    yield raw_row(e, members, your_name)
+
+def _cfg_in(tmp: Path):
+  cfg = load_unified_config(REPO)
+  return replace(
+    cfg,
+    paths=replace(cfg.paths, data_dir=tmp / "data", reports_dir=tmp / "reports"),
+    storage=replace(cfg.storage, sqlite_path=tmp / "data" / "tracker.sqlite"),
+  )
+
+def _measure(fn):
+  tracemalloc.start()
+  t0 = time.perf_counter()
+  fn()
+  dt = time.perf_counter() - t0
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  return dt, peak
+
+def main():
+  ap = argparse.ArgumentParser()
+  ap.add_argument("--months", default="12,60,240")
+  ap.add_argument("--rows-per-month", type=int, default=400)
+  args = ap.parse_args()
+
+  print(f"{'months':>7} {'rows':>8} | {'batch s':>8} {'batch peak MiB':>15} | {'stream s':>8} {'stream peak MiB':>16}"
+        f" | {'spill peak MiB':>15}")
+  spill_peaks = []
+  for n in [int(x) for x in args.months.split(",")]:
+    with tempfile.TemporaryDirectory() as a, tempfile.TemporaryDirectory() as b:
+      cfg_a, cfg_b = _cfg_in(Path(a)), _cfg_in(Path(b))
+      name = cfg_a.you.name
+
+      def batch():
+        rows = normalize_rows(list(synthetic_raw_rows(n, args.rows_per_month, name)), cfg_a.bucket)
+        pipeline._process_rows(cfg_a, rows, [])
+
+      def stream():
+        pipeline.run_pipeline_streaming(cfg_b, raw_rows=synthetic_raw_rows(n, args.rows_per_month, name), cc_rows=[])
+
+      def spill():
+        with tempfile.TemporaryDirectory() as d:
+          parts = MonthPartitions(Path(d))
+          for r in iter_normalized(synthetic_raw_rows(n, args.rows_per_month, name), cfg_a.bucket):
+            parts.add(r["month"], "s", r)
+          parts.flush()
+          for month in parts.months("s"):
+            [rec for _, rec in parts.read(month)]
+
+      import contextlib, io
+      with contextlib.redirect_stdout(io.StringIO()):
+        t_a, p_a = _measure(batch)
+        t_b, p_b = _measure(stream)
+        _, p_c = _measure(spill)
+    spill_peaks.append(p_c)
+    print(f"{n:>7} {n * args.rows_per_month:>8} | {t_a:>8.2f} {p_a / 2**20:>15.2f} | {t_b:>8.2f} {p_b / 2**20:>16.2f}"
+          f" | {p_c / 2**20:>15.2f}")
+
+  if spill_peaks[-1] > FLAT_FACTOR * spill_peaks[0] + FLAT_SLACK:
+    print(f"FAIL: spill peak grew from {spill_peaks[0] / 2**20:.2f} to {spill_peaks[-1] / 2**20:.2f} MiB")
+    sys.exit(1)
+
+if __name__ == "__main__":
+  main()
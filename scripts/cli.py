@@ -1,4 +1,5 @@
 from pathlib import Path
+import argparse
 import sys
 
 REPO = Path(__file__).resolve().parents[1]
@@ -7,11 +8,52 @@ if str(SRC) not in sys.path:
   sys.path.insert(0, str(SRC))
 
 from config.loader import load_unified_config
-from pipeline import run_pipeline
+from pipeline import run_pipeline, run_pipeline_dag, run_pipeline_streaming, run_what_if, member_cfg
 
 def main():
+  ap = argparse.ArgumentParser(description="Build Splid budget reports.")
+  ap.add_argument(
+    "--members",
+    default=None,
+    help='Household mode: "all" (auto-detect) or comma-separated names from the Splid header. '
+         "Writes data/members/<name>/ and reports/members/<name>/.",
+  )
+  ap.add_argument("--stream", action="store_true",
+                  help="Month-at-a-time streaming run with bounded memory (single user only).")
+  ap.add_argument("--dag", action="store_true",
+                  help="Run as concurrent stages and print per-stage timings / critical path (single user only).")
+  ap.add_argument("--processes", action="store_true",
+                  help="With --dag: parse Splid and card statements in separate processes.")
+  ap.add_argument("--serve", action="store_true",
+                  help="Don't run the pipeline; serve its outputs as a local read-only JSON API.")
+  ap.add_argument("--host", default="127.0.0.1")
+  ap.add_argument("--port", type=int, default=8765)
+  ap.add_argument("--member", default=None, help="With --serve: serve this household member's outputs.")
+  ap.add_argument("--what-if", action="store_true",
+                  help="Don't run the pipeline; compare the what_if scenarios from settings.yaml (reports/what_if.md).")
+  ap.add_argument("--month", default=None, help="With --what-if: month to plan (YYYY-MM); default what_if.target_month.")
+  args = ap.parse_args()
+
   cfg = load_unified_config(REPO)
-  run_pipeline(cfg=cfg)
+  if args.serve:
+    from server import serve
+    serve(member_cfg(cfg, args.member) if args.member else cfg, host=args.host, port=args.port)
+    return
+  if args.what_if:
+    print(run_what_if(cfg, month=args.month))
+    return
+  members = [m.strip() for m in args.members.split(",") if m.strip()] if args.members else None
+  if args.stream:
+    if members:
+      ap.error("--stream and --members can't be combined")
+    run_pipeline_streaming(cfg=cfg)
+    return
+  if args.dag:
+    if members:
+      ap.error("--dag and --members can't be combined")
+    run_pipeline_dag(cfg=cfg, use_processes=args.processes)
+    return
+  run_pipeline(cfg=cfg, members=members)
 
 if __name__ == "__main__":
   main()
@@ -0,0 +1,56 @@
+"""
+Differential check of alternative engines against the reference functions
+(parse_splid_xls, normalize_rows, exact_match, forecast_monthly_spend, summarize_month):
+outputs diffed to the cent, with the per-engine speedup.
+
+  python scripts/verify_engines.py [--datasets 16] [--rows 3000] [--workers 4]
+  python scripts/verify_engines.py --real
+  python scripts/verify_engines.py --engine match=my_engines:fast_match
+
+An engine is any function taking a verify.Dataset and returning the same shape as the
+stage's reference (see verify.STAGES). Exits 1 when any engine disagrees.
+"""
+from pathlib import Path
+import argparse
+import sys
+import tempfile
+
+REPO = Path(__file__).resolve().parents[1]
+SRC = REPO / "src"
+if str(SRC) not in sys.path:
+  sys.path.insert(0, str(SRC))
+
+from config.loader import load_unified_config
+from verify import STAGES, format_report, real_dataset, verify_dataset, verify_synthetic
+
+def main():
+  ap = argparse.ArgumentParser()
+  ap.add_argument("--datasets", type=int, default=16, help="synthetic datasets to generate")
+  ap.add_argument("--rows", type=int, default=3000, help="Splid rows per synthetic dataset")
+  ap.add_argument("--seed", type=int, default=0, help="first dataset seed (datasets use seed..seed+N-1)")
+  ap.add_argument("--workers", type=int, default=0, help="check datasets on this many processes")
+  ap.add_argument("--repeat", type=int, default=3, help="best-of timing per engine")
+  ap.add_argument("--stages", default=",".join(STAGES))
+  ap.add_argument("--engine", action="append", default=[], metavar="STAGE=MODULE:FUNC",
+                  help="extra engine to check (repeatable)")
+  ap.add_argument("--real", action="store_true", help="check on the configured inputs instead")
+  args = ap.parse_args()
+
+  cfg = load_unified_config(REPO)
+  stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+  unknown = [s for s in stages if s not in STAGES]
+  if unknown:
+    ap.error(f"unknown stage(s): {', '.join(unknown)}")
+
+  if args.real:
+    with tempfile.TemporaryDirectory(prefix="splid-verify-") as tmp:
+      outcomes = verify_dataset(real_dataset(cfg, Path(tmp)), stages, args.engine, args.repeat)
+  else:
+    seeds = list(range(args.seed, args.seed + args.datasets))
+    outcomes = verify_synthetic(cfg, seeds, args.rows, stages, args.engine, args.repeat, args.workers)
+
+  print(format_report(outcomes))
+  sys.exit(1 if any(o.mismatches for o in outcomes) else 0)
+
+if __name__ == "__main__":
+  main()
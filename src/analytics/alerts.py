@@ -0,0 +1,187 @@
+from __future__ import annotations
+import hashlib
+import json
+import operator
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from core.models import MonthKey, WeekBalance
+from analytics.trends import shift_month
+
+# Budget alert rules over monthly aggregates.
+# A rule reads one metric -- a monthly_summary.csv column (income, living_total, a bucket,
+# personal_spend_card, card_<bucket>, ...) or a weekly-plan metric -- either as is or as
+# its change vs the previous month / same month last year, and fires above or below a
+# threshold. Rules are compiled once into (inputs, evaluator); an index from metric to
+# rules means a run only re-evaluates the (rule, month) pairs whose inputs changed.
+# Inputs, rule fingerprints and fired alerts persist in one JSON file.
+
+COMPARES = {"value": None, "mom": 1, "yoy": 12}   # compare -> months back of the baseline
+WEEK_METRICS = ("weeks_over_allowance", "week_remaining_min")
+
+def week_metrics(balances: Iterable[WeekBalance]) -> Dict[str, float]:
+    """Weekly-plan metrics for a month that has one: weeks overspent, lowest remaining."""
+    remaining = [b.remaining for b in balances]
+    if not remaining:
+        return {}
+    return {
+        "weeks_over_allowance": float(sum(1 for r in remaining if r < 0)),
+        "week_remaining_min": round(min(remaining), 2),
+    }
+
+def summary_metrics(row: dict) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for k, v in row.items():
+        if k == "month":
+            continue
+        try:
+            out[k] = float(v or 0.0)
+        except (TypeError, ValueError):
+            continue
+    return out
+
+@dataclass
+class Alert:
+    rule: str
+    month: MonthKey
+    metric: str
+    value: float        # the metric, or its change (in % when the rule is a percent rule)
+    threshold: str      # e.g. "above 600.00", "below 0.00"
+    message: str
+
+@dataclass
+class CompiledRule:
+    id: str                                  # fingerprint of the rule definition
+    name: str
+    metric: str
+    inputs: Tuple[Tuple[int, str], ...]      # (months back, metric) pairs it reads
+    evaluate: Callable[[MonthKey, Callable[[MonthKey, str], Optional[float]]], Optional[Alert]]
+
+def _describe(metric: str, compare: str, percent: bool) -> str:
+    if compare == "value":
+        return metric
+    what = "month over month" if compare == "mom" else "year over year"
+    return f"{metric} change {what}{' (%)' if percent else ''}"
+
+def compile_rule(raw: dict) -> CompiledRule:
+    metric = raw["metric"].strip()
+    compare = raw.get("compare", "value")
+    percent = bool(raw.get("percent", False)) and compare != "value"
+    back = COMPARES[compare]
+    name = str(raw.get("name") or _describe(metric, compare, percent))
+    tests = [(operator.gt, "above", float(raw["above"]))] if "above" in raw else []
+    tests += [(operator.lt, "below", float(raw["below"]))] if "below" in raw else []
+    label = _describe(metric, compare, percent)
+
+    def measure(month: MonthKey, get) -> Optional[float]:
+        cur = get(month, metric)
+        if cur is None or back is None:
+            return cur
+        base = get(shift_month(month, -back), metric)
+        if base is None:
+            return None
+        if percent:
+            return (cur - base) / abs(base) * 100.0 if base else None
+        return cur - base
+
+    def evaluate(month: MonthKey, get) -> Optional[Alert]:
+        v = measure(month, get)
+        if v is None:
+            return None
+        for op, word, limit in tests:
+            if op(v, limit):
+                shown = f"{v:+.1f}%" if percent else f"{v:,.2f}"
+                return Alert(rule=name, month=month, metric=metric, value=round(v, 2),
+                             threshold=f"{word} {limit:,.2f}", message=f"{label} is {shown} ({word} {limit:,.2f})")
+        return None
+
+    fingerprint = hashlib.blake2b(json.dumps(raw, sort_keys=True, default=str).encode("utf-8"), digest_size=8).hexdigest()
+    inputs = ((0, metric),) if back is None else ((0, metric), (back, metric))
+    return CompiledRule(id=fingerprint, name=name, metric=metric, inputs=inputs, evaluate=evaluate)
+
+class AlertEngine:
+    """Compiled rules + the inputs / results of the last run; `run` re-evaluates only what changed."""
+
+    VERSION = 1
+
+    def __init__(self, rules: List[dict]):
+        self.rules = [compile_rule(r) for r in rules]
+        self._by_metric: Dict[str, List[Tuple[int, CompiledRule]]] = defaultdict(list)
+        for rule in self.rules:
+            for back, metric in rule.inputs:
+                self._by_metric[metric].append((back, rule))
+        self._inputs: Dict[MonthKey, Dict[str, float]] = {}
+        self._results: Dict[Tuple[str, MonthKey], Alert] = {}
+        self._known_rules: Set[str] = set()
+        self.evaluated = 0           # (rule, month) pairs evaluated by the last run
+
+    @classmethod
+    def load(cls, path: Path, rules: List[dict]) -> "AlertEngine":
+        e = cls(rules)
+        if not path.exists():
+            return e
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        if raw.get("version") != cls.VERSION:
+            return e
+        e._inputs = {m: dict(v) for m, v in raw.get("inputs", {}).items()}
+        e._known_rules = set(raw.get("rules", []))
+        for a in raw.get("alerts", []):
+            rule_id = a.pop("rule_id")
+            e._results[(rule_id, a["month"])] = Alert(**a)
+        return e
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        raw = {
+            "version": self.VERSION,
+            "rules": sorted(r.id for r in self.rules),
+            "inputs": {m: dict(sorted(v.items())) for m, v in sorted(self._inputs.items())},
+            "alerts": [{"rule_id": rid, **asdict(a)} for (rid, _), a in sorted(self._results.items(), key=lambda kv: (kv[0][1], kv[1].rule))],
+        }
+        path.write_text(json.dumps(raw, indent=1), encoding="utf-8")
+
+    def run(self, aggregates: Dict[MonthKey, Dict[str, float]]) -> List[Alert]:
+        """
+        `aggregates` = {month: {metric: value}} as of this run (months missing from it keep
+        their stored inputs). Returns every alert currently firing, oldest month first.
+        """
+        wanted = set(self._by_metric)
+        new_inputs = {m: {k: x for k, x in v.items() if k in wanted} for m, v in self._inputs.items()}
+        for m, metrics in aggregates.items():
+            new_inputs[m] = {**new_inputs.get(m, {}), **{k: v for k, v in metrics.items() if k in wanted}}
+
+        # (rule, month) pairs to evaluate: every month for new/changed rules, else the months reading a changed input
+        todo: Set[Tuple[str, MonthKey]] = set()
+        rules = {r.id: r for r in self.rules}
+        fresh = [r for r in self.rules if r.id not in self._known_rules]
+        for r in fresh:
+            todo.update((r.id, m) for m in new_inputs)
+        for m in set(new_inputs) | set(self._inputs):
+            old, new = self._inputs.get(m, {}), new_inputs.get(m, {})
+            for k in (set(old) | set(new)) & wanted:
+                if old.get(k) == new.get(k):
+                    continue
+                for back, rule in self._by_metric[k]:
+                    target = shift_month(m, back) if back else m
+                    if target in new_inputs:
+                        todo.add((rule.id, target))
+
+        def get(month: MonthKey, metric: str) -> Optional[float]:
+            return new_inputs.get(month, {}).get(metric)
+
+        self._results = {key: a for key, a in self._results.items() if key[0] in rules}
+        for rule_id, month in todo:
+            self._results.pop((rule_id, month), None)
+            alert = rules[rule_id].evaluate(month, get)
+            if alert is not None:
+                self._results[(rule_id, month)] = alert
+        self.evaluated = len(todo)
+        self._inputs = new_inputs
+        self._known_rules = set(rules)
+        return self.alerts()
+
+    def alerts(self, month: MonthKey | None = None) -> List[Alert]:
+        out = [a for (_, m), a in self._results.items() if month is None or m == month]
+        return sorted(out, key=lambda a: (a.month, a.rule))
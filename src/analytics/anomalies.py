@@ -0,0 +1,129 @@
+from __future__ import annotations
+import hashlib
+import json
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Set
+
+from core.models import MonthKey
+from analytics.outliers import RobustStream
+from analytics.recurring import canonical_name
+
+# Unusual individual expenses. Every living Splid row is scored against an online robust
+# state (EW median/MAD) for its title, or its bucket while the title is still new, then
+# folded into both. Only a title's first row falls back to the bucket (a title still
+# warming up is judged by nothing rather than by a blend of other titles), and a bucket
+# only judges once it has history from an earlier month, so a fresh install's first
+# months aren't flagged against a mix of titles that are all still new.
+# Rows are identified by a content key, so a rerun only feeds rows it hasn't seen;
+# state, seen keys and flags persist in one JSON file.
+
+@dataclass
+class AnomalyFlag:
+    date: str
+    title: str
+    bucket: str
+    amount: float
+    typical: float     # median of the stream that flagged it
+    score: float       # robust z-score
+    stream: str        # "bucket" | "title"
+
+def _row_keys(rows: Iterable[dict]) -> List[str]:
+    seen: Dict[str, int] = defaultdict(int)
+    out: List[str] = []
+    for r in rows:
+        base = f"{r['date']}|{r['title']}|{r['payer']}|{float(r['amount_total']):.2f}"
+        seen[base] += 1
+        out.append(hashlib.blake2b(f"{base}|{seen[base]}".encode("utf-8"), digest_size=8).hexdigest())
+    return out
+
+class AnomalyDetector:
+    VERSION = 1
+
+    def __init__(self, k: float = 4.0, alpha: float = 0.1, min_history: int = 5, min_delta: float = 20.0):
+        self.k = k
+        self.alpha = alpha
+        self.min_history = min_history
+        self.min_delta = min_delta
+        self._streams: Dict[str, RobustStream] = {}
+        self._seen: Set[str] = set()
+        self._since: Dict[str, MonthKey] = {}   # bucket stream -> first month it saw
+        self._flags: Dict[MonthKey, List[AnomalyFlag]] = defaultdict(list)
+
+    @classmethod
+    def from_config(cls, cfg) -> "AnomalyDetector":
+        return cls(k=cfg.k, alpha=cfg.alpha, min_history=cfg.min_history, min_delta=cfg.min_delta)
+
+    def _stream(self, key: str) -> RobustStream:
+        s = self._streams.get(key)
+        if s is None:
+            s = self._streams[key] = RobustStream(self.alpha, self.min_history)
+        return s
+
+    def observe_month(self, month: MonthKey, month_rows: List[dict]) -> List[AnomalyFlag]:
+        """Score + fold in this month's unseen living rows (date order); returns the new flags."""
+        rows = sorted(
+            (r for r in month_rows if not r["is_payment"]),
+            key=lambda r: (r["date"], r["title"], r["payer"], float(r["amount_total"])),
+        )
+        new: List[AnomalyFlag] = []
+        for r, key in zip(rows, _row_keys(rows)):
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            x = float(r["amount_total"])
+            if x <= 0:
+                continue
+            bkey = f"b|{r['bucket']}"
+            by_bucket = self._stream(bkey)
+            by_title = self._stream(f"t|{canonical_name(r['title'], 's')}")
+            self._since[bkey] = min(self._since.get(bkey, month), month)
+            # judge against the title's own history once it has one ("Costco" is normal for
+            # Costco even if it's large for groceries); unseen titles fall back to their bucket
+            if by_title.ready:
+                kind, s = "title", by_title
+            elif by_title.n == 0 and by_bucket.ready and self._since[bkey] < month:
+                kind, s = "bucket", by_bucket
+            else:
+                kind, s = "", None
+            if s is not None:
+                z = s.score(x)
+                if z > self.k and x - s.med >= self.min_delta:
+                    new.append(AnomalyFlag(r["date"], r["title"], r["bucket"], round(x, 2), round(s.med, 2), round(z, 1), kind))
+            by_bucket.update(x)
+            by_title.update(x)
+        self._flags[month].extend(new)
+        return new
+
+    def flags(self, month: MonthKey) -> List[AnomalyFlag]:
+        return sorted(self._flags.get(month, []), key=lambda f: (f.date, f.title))
+
+    # ---- persistence ----
+
+    @classmethod
+    def load(cls, path: Path, **params) -> "AnomalyDetector":
+        d = cls(**params)
+        if not path.exists():
+            return d
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        if raw.get("version") != cls.VERSION:
+            return d
+        d._streams = {k: RobustStream.from_state(v, d.alpha, d.min_history) for k, v in raw["streams"].items()}
+        d._seen = set(raw["seen"])
+        # files written before first months were kept: their buckets already have history
+        d._since = {k: raw.get("since", {}).get(k, "") for k in d._streams if k.startswith("b|")}
+        for m, flags in raw["flags"].items():
+            d._flags[m] = [AnomalyFlag(**f) for f in flags]
+        return d
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        raw = {
+            "version": self.VERSION,
+            "streams": {k: s.to_state() for k, s in sorted(self._streams.items())},
+            "seen": sorted(self._seen),
+            "since": dict(sorted(self._since.items())),
+            "flags": {m: [asdict(f) for f in fl] for m, fl in sorted(self._flags.items()) if fl},
+        }
+        path.write_text(json.dumps(raw, indent=1), encoding="utf-8")
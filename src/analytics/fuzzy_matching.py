@@ -0,0 +1,213 @@
+from __future__ import annotations
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Set, Tuple
+
+from core.models import CreditCardTransaction
+from analytics.merchants import normalize_merchant
+
+# Scoring matcher: each (card charge, Splid row) pair inside the amount/date bounds gets
+#   score = w_amount * amount_closeness + w_date * date_closeness + w_text * title_similarity
+# and charges are assigned to rows one-to-one maximizing the total score (Hungarian
+# algorithm per connected group of candidates). Title similarity is the Dice coefficient
+# over character trigrams, looked up through an inverted index of Splid titles.
+
+W_AMOUNT, W_DATE, W_TEXT = 0.45, 0.2, 0.35
+
+@dataclass
+class CardMatch:
+    txn: CreditCardTransaction
+    row: dict
+    score: float        # 0..1, the match confidence
+    amount_diff: float
+    days_apart: int
+    similarity: float
+
+def _clean(s: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", (s or "").lower()).strip()
+
+def trigrams(s: str) -> Set[str]:
+    out: Set[str] = set()
+    for w in _clean(s).split():
+        w = f"  {w} "
+        out.update(w[i:i + 3] for i in range(len(w) - 2))
+    return out
+
+class TrigramIndex:
+    """Inverted index trigram -> Splid row ids; similarity() only touches rows sharing a trigram."""
+
+    def __init__(self, titles: List[str]):
+        self.sizes: List[int] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        for i, t in enumerate(titles):
+            grams = trigrams(t)
+            self.sizes.append(len(grams))
+            for g in grams:
+                self.postings[g].append(i)
+
+    def similarity(self, text: str) -> Dict[int, float]:
+        """{row id: Dice similarity} for every title sharing at least one trigram with `text`."""
+        grams = trigrams(text)
+        if not grams:
+            return {}
+        shared: Dict[int, int] = defaultdict(int)
+        for g in grams:
+            for i in self.postings.get(g, ()):
+                shared[i] += 1
+        n = len(grams)
+        return {i: 2.0 * k / (n + self.sizes[i]) for i, k in shared.items()}
+
+def _hungarian_max(weights: List[List[float]]) -> List[int]:
+    """
+    Max-weight assignment for an n x m matrix (n <= m); returns the column for each row.
+    Classic O(n^2 m) shortest augmenting path with potentials, on cost = -weight.
+    """
+    n, m = len(weights), len(weights[0])
+    INF = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    p = [0] * (m + 1)       # p[j] = row assigned to column j (1-based, 0 = free)
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [INF] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0, delta, j1 = p[j0], INF, 0
+            row = weights[i0 - 1]
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = -row[j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j], way[j] = cur, j0
+                    if minv[j] < delta:
+                        delta, j1 = minv[j], j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while True:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+    out = [-1] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            out[p[j] - 1] = j - 1
+    return out
+
+def _components(edges: Dict[Tuple[int, int], float]) -> List[Tuple[List[int], List[int]]]:
+    # connected groups of the bipartite candidate graph, so each assignment stays small
+    parent: Dict[Tuple[str, int], Tuple[str, int]] = {}
+
+    def find(x):
+        while parent.setdefault(x, x) != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for ci, ri in edges:
+        a, b = find(("c", ci)), find(("r", ri))
+        if a != b:
+            parent[a] = b
+    groups: Dict[Tuple[str, int], Tuple[List[int], List[int]]] = {}
+    for node in list(parent):
+        cs, rs = groups.setdefault(find(node), ([], []))
+        (cs if node[0] == "c" else rs).append(node[1])
+    return [(sorted(cs), sorted(rs)) for cs, rs in groups.values()]
+
+def scored_match(
+    cc_rows_m: List[CreditCardTransaction],
+    splid_rows_m: List[dict],
+    your_name: str,
+    amount_tol_cents: int = 0,
+    amount_tol_pct: float = 0.0,
+    date_window_days: int = 3,
+    only_if_payer_is_you: bool = True,
+    min_score: float = 0.5,
+) -> Tuple[List[CreditCardTransaction], List[CreditCardTransaction], List[CardMatch]]:
+    """
+    Returns (matched_house_on_card, unmatched_fun, matches-with-confidence).
+    A pair is a candidate when |amount diff| <= max(amount_tol_cents, amount_tol_pct * charge)
+    and |post_date - splid_date| <= date_window_days; pairs scoring below `min_score` never match.
+    Like exact_match, only "purchases_adjustments" charges are considered.
+    """
+    rows = [
+        r for r in splid_rows_m
+        if not r["is_payment"]
+        and not (only_if_payer_is_you and r.get("payer", "").strip().lower() != your_name.strip().lower())
+    ]
+    charges = [c for c in cc_rows_m if c.section == "purchases_adjustments"]
+    if not charges:
+        return [], [], []
+
+    index = TrigramIndex([r.get("title", "") for r in rows])
+    cents = [int(round(float(r["amount_total"]) * 100)) for r in rows]
+    by_cents = sorted(range(len(rows)), key=lambda i: cents[i])
+    sorted_cents = [cents[i] for i in by_cents]
+    days = [datetime.strptime(r["date"], "%Y-%m-%d").date() for r in rows]
+
+    edges: Dict[Tuple[int, int], float] = {}
+    detail: Dict[Tuple[int, int], Tuple[float, int, float]] = {}
+    for ci, c in enumerate(charges):
+        cc = int(round(c.amount * 100))
+        tol = max(amount_tol_cents, int(abs(cc) * amount_tol_pct))
+        lo, hi = bisect_left(sorted_cents, cc - tol), bisect_right(sorted_cents, cc + tol)
+        if lo == hi:
+            continue
+        post = datetime.strptime(c.post_date, "%Y-%m-%d").date()
+        sims = index.similarity(normalize_merchant(c.description) or c.description)
+        for k in range(lo, hi):
+            ri = by_cents[k]
+            dd = abs((post - days[ri]).days)
+            if dd > date_window_days:
+                continue
+            da = abs(cc - cents[ri])
+            sim = sims.get(ri, 0.0)
+            score = (W_AMOUNT * (1.0 - da / (tol + 1))
+                     + W_DATE * (1.0 - dd / (date_window_days + 1))
+                     + W_TEXT * sim)
+            if score >= min_score:
+                edges[(ci, ri)] = score
+                detail[(ci, ri)] = (da / 100.0, dd, sim)
+
+    taken: Dict[int, int] = {}
+    for cs, rs in _components(edges):
+        if len(cs) == 1 and len(rs) == 1:
+            taken[cs[0]] = rs[0]
+            continue
+        # rows of the assignment = the smaller side; missing pairs weigh 0 (= leave unmatched)
+        flip = len(cs) > len(rs)
+        a, b = (rs, cs) if flip else (cs, rs)
+        w = [[edges.get((y, x) if flip else (x, y), 0.0) for y in b] for x in a]
+        for x, j in zip(a, _hungarian_max(w)):
+            if j < 0:
+                continue
+            ci, ri = (b[j], x) if flip else (x, b[j])
+            if (ci, ri) in edges:
+                taken[ci] = ri
+
+    matched: List[CreditCardTransaction] = []
+    unmatched: List[CreditCardTransaction] = []
+    matches: List[CardMatch] = []
+    for ci, c in enumerate(charges):
+        ri = taken.get(ci)
+        if ri is None:
+            unmatched.append(c)
+            continue
+        matched.append(c)
+        da, dd, sim = detail[(ci, ri)]
+        matches.append(CardMatch(c, rows[ri], round(edges[(ci, ri)], 3), round(da, 2), dd, round(sim, 3)))
+    return matched, unmatched, matches
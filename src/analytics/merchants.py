@@ -0,0 +1,104 @@
+from __future__ import annotations
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+from core.models import CreditCardTransaction
+
+# BofA descriptions look like
+#   "SQ *BLUE BOTTLE COFFEE 0123 OAKLAND CA"
+#   "AMAZON MKTPL*2K3AB1C2 Amzn.com/bill WA"
+#   "STARBUCKS STORE 12345    SEATTLE      WA"
+# normalize_merchant() reduces them to a stable merchant name ("Blue Bottle Coffee",
+# "Amazon Mktpl", "Starbucks") for grouping and bucket rules.
+
+# payment-processor / POS prefixes that precede the real merchant ("SQ *", "TST* ", "PAYPAL *")
+_PROCESSOR_RE = re.compile(
+    r"^(?:(?:SQ|SQU|TST|SP|PY|PP|PAYPAL|GOOGLE|GGL|APLPAY|CKE|DD|IC|IN|LS|BT|EB|FS)\s*\*|(?:CHECKCARD|PURCHASE|POS)\s)\s*",
+    re.IGNORECASE,
+)
+_US_STATES = frozenset(
+    "AL AK AZ AR CA CO CT DE DC FL GA HI ID IL IN IA KS KY LA ME MD MA MI MN MS MO MT NE NV NH NJ NM NY "
+    "NC ND OH OK OR PA RI SC SD TN TX UT VT VA WA WV WI WY PR".split()
+)
+_PHONE_RE = re.compile(r"\b(?:\d{3}[-.\s]?)?\d{3}[-.\s]\d{4}\b")
+_URLISH_RE = re.compile(r"\S+\.(?:com|net|org|co|io)(?:/\S*)?$", re.IGNORECASE)
+# words that only describe the location/store, not the merchant
+_NOISE_WORDS = frozenset({"STORE", "STORES", "STR", "#", "NO", "LOC", "LOCATION", "INC", "LLC"})
+
+def _has_digit(tok: str) -> bool:
+    return any(ch.isdigit() for ch in tok)
+
+@lru_cache(maxsize=16384)
+def normalize_merchant(description: str) -> str:
+    """Merchant name from a raw card description (cached per raw description)."""
+    s = (description or "").strip()
+    if not s:
+        return ""
+    # fixed-width statements pad merchant / city / state with runs of spaces: the
+    # first run ends the merchant field
+    head = re.split(r"\s{3,}", s, maxsplit=1)[0]
+    s = _PROCESSOR_RE.sub("", head, count=1)
+    s = _PHONE_RE.sub(" ", s)
+
+    toks = s.replace("*", " ").split()
+    if toks and toks[-1].upper() in _US_STATES and len(toks) > 1:
+        toks.pop()
+    out: List[str] = []
+    for tok in toks:
+        if _URLISH_RE.match(tok) and out:
+            break                       # "Amzn.com/bill", "HELP.UBER.COM": rest is location/reference
+        if _has_digit(tok) or tok.startswith("#"):
+            if out:
+                break                   # store number / reference: everything after is location
+            if not any(ch.isalpha() for ch in tok):
+                continue                # leading date/ref ("CHECKCARD 0712 ...")
+        if tok.upper() in _NOISE_WORDS:
+            continue
+        out.append(tok)
+    if not out:
+        out = toks[:1] or [head]
+    return " ".join(w.capitalize() for w in out)
+
+class CardClassifier:
+    """
+    Bucket for a card charge: card-specific rules first, then the Splid title_to_bucket
+    rules, matched against the normalized merchant (the raw description if that is empty).
+    Results are memoized per merchant.
+    """
+
+    def __init__(self, title_rules: Iterable[Tuple[Pattern, str]], card_rules: Iterable[Tuple[Pattern, str]] = (),
+                 default: str = "uncategorized"):
+        self.rules: List[Tuple[Pattern, str]] = list(card_rules) + list(title_rules)
+        self.default = default
+        self._memo: Dict[str, str] = {}
+
+    @classmethod
+    def from_config(cls, bucket_cfg) -> "CardClassifier":
+        title_rules = list(getattr(bucket_cfg, "compiled_title_rules", None) or [])
+        if not title_rules:
+            title_rules = [(re.compile(p, re.IGNORECASE), b) for p, b in bucket_cfg.title_to_bucket.items()]
+        card_rules = list(getattr(bucket_cfg, "compiled_card_rules", None) or [])
+        if not card_rules:
+            card_rules = [(re.compile(p, re.IGNORECASE), b)
+                          for p, b in (getattr(bucket_cfg, "card_title_to_bucket", None) or {}).items()]
+        return cls(title_rules, card_rules)
+
+    def bucket(self, description: str) -> str:
+        key = normalize_merchant(description) or (description or "")
+        hit = self._memo.get(key)
+        if hit is None:
+            hit = next((b for rx, b in self.rules if rx.search(key)), self.default)
+            self._memo[key] = hit
+        return hit
+
+def spend_by_bucket(txns: Iterable[CreditCardTransaction], classifier: Optional[CardClassifier]) -> Dict[str, float]:
+    """{bucket: total} over positive charges (returns/credits are not spend), rounded to cents."""
+    if classifier is None:
+        return {}
+    out: Dict[str, float] = defaultdict(float)
+    for c in txns:
+        if c.amount > 0:
+            out[classifier.bucket(c.description)] += c.amount
+    return {b: round(v, 2) for b, v in sorted(out.items())}
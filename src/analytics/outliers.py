@@ -32,3 +32,61 @@ def winsorize(xs: List[float], k: float) -> List[float]:
     lo = med - k * mad
     hi = med + k * mad
     return [min(max(x, lo), hi) for x in xs]
+
+def treat_outliers(xs: List[float], method: str, k: float) -> List[float]:
+    """Budgeting outlier treatment: "winsor" clamps, anything else drops MAD outliers (all dropped -> xs)."""
+    if method == "winsor":
+        return winsorize(xs, k)
+    return remove_outliers_mad(xs, k) or xs
+
+class RobustStream:
+    """
+    Online exponentially weighted median / MAD (stochastic quantile tracking), O(1) per point.
+    The first `warmup` points are buffered and seed the state with their exact median/MAD.
+    """
+
+    __slots__ = ("alpha", "warmup", "n", "med", "mad", "buf")
+
+    def __init__(self, alpha: float = 0.1, warmup: int = 5):
+        self.alpha = alpha
+        self.warmup = warmup
+        self.n = 0
+        self.med = 0.0
+        self.mad = 0.0
+        self.buf: List[float] = []
+
+    @property
+    def ready(self) -> bool:
+        return self.n >= self.warmup
+
+    def score(self, x: float) -> float:
+        """Robust z-score of x against the current state (0.0 until warmed up)."""
+        if not self.ready:
+            return 0.0
+        scale = 1.4826 * max(self.mad, 0.01 * abs(self.med), 1e-9)
+        return (x - self.med) / scale
+
+    def update(self, x: float) -> None:
+        self.n += 1
+        if self.n <= self.warmup:
+            self.buf.append(x)
+            self.med = _median(self.buf)
+            self.mad = _mad(self.buf, self.med)
+            if self.n == self.warmup:
+                self.buf = []
+            return
+        # step size scales with the spread so the tracker works in the data's units
+        step = self.alpha * max(self.mad, 0.01 * abs(self.med), 1e-9)
+        self.med += step if x > self.med else (-step if x < self.med else 0.0)
+        dev = abs(x - self.med)
+        self.mad += step * (1.0 if dev > self.mad else (-1.0 if dev < self.mad else 0.0))
+        self.mad = max(self.mad, 0.0)
+
+    def to_state(self) -> list:
+        return [self.n, round(self.med, 6), round(self.mad, 6), self.buf]
+
+    @classmethod
+    def from_state(cls, state: list, alpha: float = 0.1, warmup: int = 5) -> "RobustStream":
+        s = cls(alpha, warmup)
+        s.n, s.med, s.mad, s.buf = int(state[0]), float(state[1]), float(state[2]), list(state[3])
+        return s
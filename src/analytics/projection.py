@@ -0,0 +1,66 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from core.models import MonthKey
+
+# Monte Carlo savings projection.
+# Each simulated month draws a living total from history (bootstrap, with replacement),
+# takes the income the pay schedule gives that month, and saves SAVINGS_SHARE of any
+# excess -- the same split the month reports use. Paths are simulated as one
+# (paths x months) array per chunk; chunks have their own seed spawned from `seed`,
+# so results are identical whether chunks run in-process or on a process pool.
+
+SAVINGS_SHARE = 0.5
+PERCENTILES = (10, 25, 50, 75, 90)
+CHUNK_PATHS = 25_000
+
+@dataclass
+class SavingsProjection:
+    months: List[MonthKey]                 # projected months, in order
+    n_paths: int
+    history_months: int                    # living totals resampled from
+    bands: Dict[int, List[float]] = field(default_factory=dict)   # percentile -> cumulative savings per month
+
+def _simulate_chunk(living: np.ndarray, income: np.ndarray, n_paths: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """(n_paths, months) cumulative savings."""
+    rng = np.random.default_rng(seed)
+    spend = living[rng.integers(0, living.size, size=(n_paths, income.size))]
+    saved = SAVINGS_SHARE * np.maximum(income - spend, 0.0)
+    return np.cumsum(saved, axis=1, out=saved)
+
+def simulate_savings(living: Sequence[float], income: Sequence[float], n_paths: int,
+                     seed: int = 0, workers: int = 0) -> np.ndarray:
+    """
+    (n_paths, len(income)) cumulative savings paths. `workers` > 1 spreads the chunks over
+    a process pool; otherwise they run here.
+    """
+    living_a = np.asarray(living, dtype=np.float64)
+    income_a = np.asarray(income, dtype=np.float64)
+    if living_a.size == 0 or income_a.size == 0 or n_paths <= 0:
+        return np.zeros((max(n_paths, 0), income_a.size))
+    sizes = [min(CHUNK_PATHS, n_paths - i) for i in range(0, n_paths, CHUNK_PATHS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as pool:
+            parts = list(pool.map(_simulate_chunk, [living_a] * len(sizes), [income_a] * len(sizes), sizes, seeds))
+    else:
+        parts = [_simulate_chunk(living_a, income_a, n, s) for n, s in zip(sizes, seeds)]
+    return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+def project_savings(living: Sequence[float], months: List[MonthKey], income: Sequence[float],
+                    n_paths: int, seed: int = 0, workers: int = 0) -> SavingsProjection | None:
+    """Percentile bands of cumulative savings over `months` (None without history or months)."""
+    if not living or not months:
+        return None
+    paths = simulate_savings(living, income, n_paths, seed, workers)
+    bands = np.percentile(paths, PERCENTILES, axis=0)
+    return SavingsProjection(
+        months=list(months),
+        n_paths=n_paths,
+        history_months=len(living),
+        bands={p: [round(float(v), 2) for v in row] for p, row in zip(PERCENTILES, bands)},
+    )
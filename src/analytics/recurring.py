@@ -0,0 +1,273 @@
+from __future__ import annotations
+import hashlib
+import json
+import re
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from statistics import median
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.dates import month_end
+from core.models import CreditCardTransaction, MonthKey
+from analytics.merchants import normalize_merchant
+
+# Recurring costs (rent, utilities, subscriptions, repeat card merchants).
+# Splid rows and unmatched card charges are grouped by a hash of their canonical name;
+# each group's sorted dates are scanned once for a weekly / monthly / annual cadence.
+# Observations are persisted per (month, source) so a run only replaces the months it
+# processed, and only groups whose observations changed are re-detected.
+
+# cadence -> (period in days, allowed deviation of a gap in days, min occurrences)
+CADENCES: Dict[str, Tuple[float, float, int]] = {
+    "weekly": (7.0, 1.5, 4),
+    "monthly": (30.44, 4.0, 3),
+    "annual": (365.25, 20.0, 2),
+}
+_MIN_REGULAR = 0.7      # share of gaps that must fit the cadence
+_MAX_STEP = 0.25        # max relative amount change between occurrences (allows slow drift)
+
+Observation = Tuple[str, float]   # (ISO date, amount)
+
+def canonical_name(text: str, source: str) -> str:
+    """Grouping name: normalized merchant for card charges, digit-free lowercased title for Splid rows."""
+    if source == "c":
+        text = normalize_merchant(text) or text
+    return re.sub(r"\s+", " ", re.sub(r"[^a-z ]+", " ", (text or "").lower())).strip()
+
+def series_key(canon: str) -> str:
+    return hashlib.blake2b(canon.encode("utf-8"), digest_size=8).hexdigest()
+
+def splid_observations(month_rows: Iterable[dict], exclude_buckets: List[str] | None = None,
+                       use_your_share: bool = True) -> Dict[str, Tuple[str, List[Observation]]]:
+    """{key: (label, [(date, amount)])} over living rows (payments and excluded buckets skipped)."""
+    ex = set(exclude_buckets or [])
+    out: Dict[str, Tuple[str, List[Observation]]] = {}
+    for r in month_rows:
+        if r["is_payment"] or r["bucket"] in ex:
+            continue
+        amt = float(r["your_share"] if use_your_share else r["amount_total"])
+        canon = canonical_name(r["title"], "s")
+        if not canon or amt <= 0:
+            continue
+        out.setdefault(series_key(canon), (r["title"].strip(), []))[1].append((r["date"], amt))
+    return out
+
+def card_observations(unmatched: Iterable[CreditCardTransaction],
+                      use_post_date: bool = True) -> Dict[str, Tuple[str, List[Observation]]]:
+    out: Dict[str, Tuple[str, List[Observation]]] = {}
+    for c in unmatched:
+        if c.amount <= 0:
+            continue
+        canon = canonical_name(c.description, "c")
+        if not canon:
+            continue
+        label = normalize_merchant(c.description) or c.description
+        out.setdefault(series_key(canon), (label, []))[1].append(
+            (c.post_date if use_post_date else c.trans_date, float(c.amount))
+        )
+    return out
+
+def _add_months(d: date, n: int) -> date:
+    y, m = divmod(d.month - 1 + n, 12)
+    y, m = d.year + y, m + 1
+    return date(y, m, min(d.day, month_end(y, m).day))
+
+def _step(d: date, cadence: str) -> date:
+    if cadence == "monthly":
+        return _add_months(d, 1)
+    if cadence == "annual":
+        return _add_months(d, 12)
+    return d + timedelta(days=7)
+
+@dataclass
+class RecurringSeries:
+    key: str
+    label: str
+    cadence: str              # "weekly" | "monthly" | "annual"
+    occurrences: int
+    first_date: str
+    last_date: str
+    typical_amount: float     # median
+    last_amount: float
+    drift_per_period: float   # least-squares amount change per occurrence
+    next_date: str
+    next_amount: float
+
+    @property
+    def monthly_equivalent(self) -> float:
+        return self.next_amount * 30.44 / CADENCES[self.cadence][0]
+
+    def active(self, asof: date) -> bool:
+        # lapsed once two periods pass without a charge
+        return (asof - date.fromisoformat(self.last_date)).days <= 2 * CADENCES[self.cadence][0] + CADENCES[self.cadence][1]
+
+    def expected_between(self, first: date, last: date) -> List[Tuple[date, float]]:
+        out: List[Tuple[date, float]] = []
+        d = date.fromisoformat(self.next_date)
+        while d < first:
+            d = _step(d, self.cadence)
+        while d <= last:
+            out.append((d, self.next_amount))
+            d = _step(d, self.cadence)
+        return out
+
+def detect_series(key: str, label: str, obs: List[Observation]) -> Optional[RecurringSeries]:
+    """One pass over date-sorted observations (same-day charges merged); None if not periodic."""
+    if len(obs) < 2:
+        return None
+    hits: Dict[str, int] = defaultdict(int)
+    gaps = steady = n = 0
+    sx = sy = sxx = sxy = 0.0
+    amounts: List[float] = []
+    prev_day: Optional[date] = None
+    prev_amt = 0.0
+    day_amt = 0.0
+
+    def close(amt: float) -> None:
+        nonlocal n, sx, sy, sxx, sxy, steady, prev_amt
+        if n and prev_amt > 0 and abs(amt - prev_amt) / prev_amt <= _MAX_STEP:
+            steady += 1
+        sx += n; sy += amt; sxx += n * n; sxy += n * amt
+        amounts.append(amt)
+        prev_amt = amt
+        n += 1
+
+    for day_iso, amt in obs:
+        d = date.fromisoformat(day_iso)
+        if prev_day is not None and d == prev_day:
+            day_amt += amt
+            continue
+        if prev_day is not None:
+            close(day_amt)
+            gap = (d - prev_day).days
+            gaps += 1
+            for cad, (period, tol, _) in CADENCES.items():
+                if abs(gap - period) <= tol:
+                    hits[cad] += 1
+                    break
+        prev_day, day_amt = d, amt
+    close(day_amt)
+
+    if not gaps or not hits:
+        return None
+    cadence = max(hits, key=hits.get)
+    if n < CADENCES[cadence][2] or hits[cadence] < _MIN_REGULAR * gaps or steady < _MIN_REGULAR * (n - 1):
+        return None
+
+    denom = n * sxx - sx * sx
+    slope = (n * sxy - sx * sy) / denom if denom else 0.0
+    last_day = prev_day
+    return RecurringSeries(
+        key=key,
+        label=label,
+        cadence=cadence,
+        occurrences=n,
+        first_date=obs[0][0],
+        last_date=last_day.isoformat(),
+        typical_amount=round(median(amounts), 2),
+        last_amount=round(amounts[-1], 2),
+        drift_per_period=round(slope, 2),
+        next_date=_step(last_day, cadence).isoformat(),
+        next_amount=round(max(0.0, amounts[-1] + slope), 2),
+    )
+
+class RecurringTracker:
+    """Observations per (month, source) + detected series, persisted as one JSON file."""
+
+    VERSION = 1
+
+    def __init__(self) -> None:
+        self._obs: Dict[str, Dict[Tuple[MonthKey, str], List[Observation]]] = defaultdict(dict)
+        self._labels: Dict[str, str] = {}
+        self._by_month: Dict[Tuple[MonthKey, str], Set[str]] = defaultdict(set)
+        self._series: Dict[str, RecurringSeries] = {}
+        self._changed: Set[str] = set()
+
+    @classmethod
+    def load(cls, path: Path) -> "RecurringTracker":
+        t = cls()
+        if not path.exists():
+            return t
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        if raw.get("version") != cls.VERSION:
+            return t
+        for key, g in raw["groups"].items():
+            t._labels[key] = g["label"]
+            for slot, obs in g["obs"].items():
+                month, source = slot.split("|")
+                t._obs[key][(month, source)] = [(d, float(a)) for d, a in obs]
+                t._by_month[(month, source)].add(key)
+        t._series = {k: RecurringSeries(**s) for k, s in raw["series"].items()}
+        return t
+
+    def save(self, path: Path) -> None:
+        self.refresh()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        raw = {
+            "version": self.VERSION,
+            "groups": {
+                key: {
+                    "label": self._labels[key],
+                    "obs": {f"{m}|{s}": [[d, a] for d, a in obs] for (m, s), obs in sorted(slots.items())},
+                }
+                for key, slots in sorted(self._obs.items())
+            },
+            "series": {k: asdict(s) for k, s in sorted(self._series.items())},
+        }
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(raw, f, indent=1)
+
+    def update(self, month: MonthKey, source: str, groups: Dict[str, Tuple[str, List[Observation]]]) -> int:
+        """Replace what `source` ("s" Splid, "c" card) observed in `month`; returns how many groups changed."""
+        slot = (month, source)
+        before = self._by_month[slot]
+        changed = 0
+        for key in before - groups.keys():
+            del self._obs[key][slot]
+            self._changed.add(key)
+            changed += 1
+        for key, (label, obs) in groups.items():
+            obs = sorted(obs)
+            if self._obs[key].get(slot) != obs:
+                self._obs[key][slot] = obs
+                self._changed.add(key)
+                changed += 1
+            self._labels.setdefault(key, label)
+        self._by_month[slot] = set(groups)
+        return changed
+
+    def refresh(self) -> None:
+        """Re-detect only groups whose observations changed since the last refresh."""
+        for key in self._changed:
+            slots = self._obs.get(key) or {}
+            merged = sorted(o for obs in slots.values() for o in obs)
+            hit = detect_series(key, self._labels.get(key, key), merged) if merged else None
+            if hit is None:
+                self._series.pop(key, None)
+            else:
+                self._series[key] = hit
+            if not slots:
+                self._obs.pop(key, None)
+                self._labels.pop(key, None)
+        self._changed.clear()
+
+    def series(self, asof: date | None = None) -> List[RecurringSeries]:
+        self.refresh()
+        out = sorted(self._series.values(), key=lambda s: (-s.monthly_equivalent, s.label))
+        return [s for s in out if asof is None or s.active(asof)]
+
+    def amounts_by_month(self, source: str = "s") -> Dict[MonthKey, float]:
+        """{month: total of recurring charges from `source`} — what the forecaster can subtract."""
+        self.refresh()
+        out: Dict[MonthKey, float] = defaultdict(float)
+        for key in self._series:
+            for (month, src), obs in self._obs[key].items():
+                if src == source:
+                    out[month] += sum(a for _, a in obs)
+        return dict(out)
+
+def discretionary_totals(totals: Dict[MonthKey, float], recurring: Dict[MonthKey, float]) -> Dict[MonthKey, float]:
+    """Monthly living totals minus the recurring part (never below zero)."""
+    return {m: max(0.0, v - recurring.get(m, 0.0)) for m, v in totals.items()}
@@ -0,0 +1,108 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.models import MonthKey
+
+# Trends over monthly_summary.csv rows. Every numeric column is parsed once into a
+# cumulative-sum array laid over the contiguous calendar range first..last month (months
+# without a row contribute 0 and are not counted), so any window total, average or share
+# is two array lookups regardless of how many months, buckets or windows are asked for.
+
+def _ordinal(month: MonthKey) -> int:
+    return int(month[:4]) * 12 + int(month[5:7]) - 1
+
+def shift_month(month: MonthKey, n: int) -> MonthKey:
+    y, m = divmod(_ordinal(month) + n, 12)
+    return f"{y:04d}-{m + 1:02d}"
+
+def _num(v) -> float:
+    try:
+        return float(v or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+class PrefixTrends:
+    """
+    Cumulative sums per summary column. Windows are `window` calendar months ending at
+    `last` (inclusive); means divide by the months in the window that have a row, or by
+    the months with income for `over_income=True` (income / excess are only meaningful there).
+    """
+
+    def __init__(self, rows: Iterable[dict], aliases: Dict[str, str] | None = None):
+        aliases = aliases or {}
+        by_pos: Dict[int, dict] = {}
+        for r in rows:
+            by_pos[_ordinal(r["month"])] = r
+        self.first = min(by_pos) if by_pos else 0
+        self.n = (max(by_pos) - self.first + 1) if by_pos else 0
+        self.months: List[MonthKey] = sorted(r["month"] for r in by_pos.values())
+
+        keys = sorted({aliases.get(k, k) for r in by_pos.values() for k in r if k != "month"})
+        self._cum: Dict[str, List[float]] = {k: [0.0] * (self.n + 1) for k in keys}
+        self._present = [0] * (self.n + 1)
+        self._with_income = [0] * (self.n + 1)
+        for i in range(self.n):
+            r = by_pos.get(self.first + i)
+            vals: Dict[str, float] = {}
+            if r is not None:
+                for k, v in r.items():
+                    if k != "month":
+                        k = aliases.get(k, k)
+                        vals[k] = vals.get(k, 0.0) + _num(v)
+            for k, cum in self._cum.items():
+                cum[i + 1] = cum[i] + vals.get(k, 0.0)
+            self._present[i + 1] = self._present[i] + (r is not None)
+            self._with_income[i + 1] = self._with_income[i] + (vals.get("income", 0.0) > 0.0)
+
+    @property
+    def keys(self) -> List[str]:
+        return list(self._cum)
+
+    @property
+    def latest(self) -> Optional[MonthKey]:
+        return self.months[-1] if self.months else None
+
+    def _span(self, last: Optional[MonthKey], window: Optional[int]) -> Tuple[int, int]:
+        if not self.n:
+            return 0, 0
+        end = self.n if last is None else _ordinal(last) - self.first + 1
+        start = 0 if window is None else end - window
+        return min(self.n, max(0, start)), min(self.n, max(0, end))
+
+    def total(self, key: str, last: Optional[MonthKey] = None, window: Optional[int] = None) -> float:
+        cum = self._cum.get(key)
+        if cum is None:
+            return 0.0
+        lo, hi = self._span(last, window)
+        return cum[hi] - cum[lo]
+
+    def count(self, last: Optional[MonthKey] = None, window: Optional[int] = None, over_income: bool = False) -> int:
+        lo, hi = self._span(last, window)
+        c = self._with_income if over_income else self._present
+        return c[hi] - c[lo]
+
+    def mean(self, key: str, last: Optional[MonthKey] = None, window: Optional[int] = None,
+             over_income: bool = False) -> Optional[float]:
+        n = self.count(last, window, over_income)
+        return self.total(key, last, window) / n if n else None
+
+    def value(self, key: str, month: MonthKey) -> Optional[float]:
+        """The month's value, None when the month has no row."""
+        if self.count(month, 1) == 0:
+            return None
+        return self.total(key, month, 1)
+
+    def yoy(self, key: str, month: MonthKey, window: int = 1) -> Optional[Tuple[float, float]]:
+        """
+        (this period, same period a year earlier) for `window` months ending at `month`;
+        None unless both periods have a row for every month (totals would not compare).
+        """
+        before = shift_month(month, -12)
+        if self.count(month, window) < window or self.count(before, window) < window:
+            return None
+        return self.total(key, month, window), self.total(key, before, window)
+
+    def share(self, key: str, of: str = "living_total", last: Optional[MonthKey] = None,
+              window: Optional[int] = None) -> Optional[float]:
+        denom = self.total(of, last, window)
+        return self.total(key, last, window) / denom if denom > 0 else None
@@ -0,0 +1,193 @@
+from __future__ import annotations
+import hashlib
+import heapq
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from core.models import MonthKey
+
+# Household settle-up.
+# Every Splid row moves money the same way: the payer is owed `amount`, each member with
+# a share owes that share. Settle-up "Payment" rows follow the rule too (the payer is owed,
+# the recipient's share is the amount received), so no special case is needed.
+# Balances are kept in cents; + means the member is owed money, - that they owe.
+
+# (date, payer, amount, {member: share})
+SharedEntry = Tuple[str, str, float, Dict[str, float]]
+# (from, to, amount)
+Transfer = Tuple[str, str, float]
+
+EXACT_MAX_MEMBERS = 12   # exact min-transfer search is exponential; greedy above this
+
+def _cents(x: float) -> int:
+    return int(round(x * 100))
+
+class BalanceBook:
+    """Net balance per member, updated in O(members on the row) per row."""
+
+    def __init__(self) -> None:
+        self.net: Dict[str, int] = defaultdict(int)
+
+    def add(self, payer: str, amount: float, shares: Dict[str, float]) -> None:
+        if not payer:
+            return
+        self.net[payer] += _cents(amount)
+        for m, s in shares.items():
+            if s:
+                self.net[m] -= _cents(s)
+
+    def balances(self) -> Dict[str, float]:
+        return {m: c / 100 for m, c in sorted(self.net.items()) if c}
+
+def settle_greedy(net: Dict[str, int]) -> List[Transfer]:
+    """Largest debtor pays largest creditor until one side is even; at most n-1 transfers, O(n log n)."""
+    debtors = [(c, m) for m, c in net.items() if c < 0]            # most negative first
+    creditors = [(-c, m) for m, c in net.items() if c > 0]         # most positive first
+    heapq.heapify(debtors)
+    heapq.heapify(creditors)
+    out: List[Transfer] = []
+    while debtors and creditors:
+        d, dm = heapq.heappop(debtors)
+        c, cm = heapq.heappop(creditors)
+        amt = min(-d, -c)
+        out.append((dm, cm, amt / 100))
+        if d + amt < 0:
+            heapq.heappush(debtors, (d + amt, dm))
+        if c + amt < 0:
+            heapq.heappush(creditors, (c + amt, cm))
+    return out
+
+def _zero_sum_groups(members: List[str], cents: List[int]) -> List[List[str]]:
+    """
+    Split members into the most groups that each net to zero (every group of k then
+    settles in k-1 transfers, which makes the total minimal). DP over subsets.
+    """
+    n = len(members)
+    full = (1 << n) - 1
+    total = [0] * (full + 1)
+    best = [0] * (full + 1)
+    drop = [0] * (full + 1)
+    for mask in range(1, full + 1):
+        low = (mask & -mask).bit_length() - 1
+        total[mask] = total[mask & (mask - 1)] + cents[low]
+        b, arg = -1, 0
+        m = mask
+        while m:
+            i = (m & -m).bit_length() - 1
+            if best[mask ^ (1 << i)] > b:
+                b, arg = best[mask ^ (1 << i)], i
+            m &= m - 1
+        best[mask] = b + (total[mask] == 0)
+        drop[mask] = arg
+    groups, group, mask = [], [], full
+    while mask:
+        i = drop[mask]
+        group.append(members[i])
+        mask ^= 1 << i
+        if total[mask] == 0:
+            groups.append(group)
+            group = []
+    return groups
+
+def settle_up(net: Dict[str, int], exact_max: int = EXACT_MAX_MEMBERS) -> List[Transfer]:
+    """
+    Settle-up transfers for cent balances. Exact minimum number of transfers for up to
+    `exact_max` unsettled members, greedy beyond that or when balances don't sum to zero.
+    """
+    open_ = {m: c for m, c in net.items() if c}
+    if len(open_) > exact_max or sum(open_.values()) != 0:
+        return settle_greedy(open_)
+    members = sorted(open_)
+    out: List[Transfer] = []
+    for group in _zero_sum_groups(members, [open_[m] for m in members]):
+        out += settle_greedy({m: open_[m] for m in group})
+    return out
+
+def entries_by_month(entries: Iterable[SharedEntry]) -> Iterator[Tuple[MonthKey, List[SharedEntry]]]:
+    """(month, that month's entries in date order), oldest month first."""
+    by_month: Dict[MonthKey, List[SharedEntry]] = defaultdict(list)
+    for e in entries:
+        by_month[e[0][:7]].append(e)
+    for month in sorted(by_month):
+        yield month, sorted(by_month[month], key=lambda e: e[0])
+
+def _digest(entries: List[SharedEntry]) -> str:
+    raw = json.dumps([[d, p, a, sorted(s.items())] for d, p, a, s in entries], separators=(",", ":"))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+class BalanceHistory:
+    """
+    Month-end balance snapshots, replayed from shared entries in date order. Snapshots and a
+    fingerprint of each month's entries persist, so `update` only re-applies the months from
+    the first one whose entries changed.
+    """
+
+    VERSION = 1
+
+    def __init__(self) -> None:
+        self._months: List[MonthKey] = []
+        self._digests: List[str] = []
+        self._snaps: List[Dict[str, int]] = []
+        self.replayed = 0            # months re-applied by the last update
+
+    @classmethod
+    def load(cls, path: Path) -> "BalanceHistory":
+        h = cls()
+        if not path.exists():
+            return h
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        if raw.get("version") != cls.VERSION:
+            return h
+        for month, digest, snap in raw.get("months", []):
+            h._months.append(month)
+            h._digests.append(digest)
+            h._snaps.append({m: int(c) for m, c in snap.items()})
+        return h
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        raw = {"version": self.VERSION, "months": [list(t) for t in zip(self._months, self._digests, self._snaps)]}
+        path.write_text(json.dumps(raw, separators=(",", ":")), encoding="utf-8")
+
+    def update(self, months: Iterable[Tuple[MonthKey, List[SharedEntry]]]) -> None:
+        """`months` = entries_by_month(...) of the full history; unchanged leading months are kept."""
+        old = list(zip(self._months, self._digests))
+        keep = 0
+        book: BalanceBook | None = None
+        self._months, self._digests, snaps, self._snaps = [], [], self._snaps, []
+        self.replayed = 0
+        for month, entries in months:
+            digest = _digest(entries)
+            if book is None and keep < len(old) and old[keep] == (month, digest):
+                self._months.append(month)
+                self._digests.append(digest)
+                self._snaps.append(snaps[keep])
+                keep += 1
+                continue
+            if book is None:
+                book = BalanceBook()
+                book.net.update(self._snaps[-1] if self._snaps else {})
+            for _, payer, amount, shares in entries:
+                book.add(payer, amount, shares)
+            self._months.append(month)
+            self._digests.append(digest)
+            self._snaps.append({m: c for m, c in book.net.items() if c})
+            self.replayed += 1
+
+    def net_at(self, month: MonthKey) -> Dict[str, int]:
+        """Cent balances through the end of `month` (empty before the first row)."""
+        lo, hi = 0, len(self._months)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._months[mid] <= month:
+                lo = mid + 1
+            else:
+                hi = mid
+        return dict(self._snaps[lo - 1]) if lo else {}
+
+    def at(self, month: MonthKey) -> Tuple[Dict[str, float], List[Transfer]]:
+        """(balances, settle-up transfers) through the end of `month`."""
+        net = self.net_at(month)
+        return {m: c / 100 for m, c in sorted(net.items())}, settle_up(net)
@@ -1,26 +1,134 @@
 from __future__ import annotations
-from datetime import datetime
-from typing import Dict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List
 
-from core.dates import count_mondays_in_month
+from core.dates import iter_months, month_end, parse_month
+
+# Pay schedules we know how to lay out. Each pay date earns a fixed number of
+# default-hours "weeks": 1 for weekly, 2 for biweekly, 52/24 for semi-monthly.
+PAY_SCHEDULES = ("weekly", "biweekly", "semi_monthly")
+_WEEKS_PER_PAY = {"weekly": 1.0, "biweekly": 2.0, "semi_monthly": 52.0 / 24.0}
 
 def month_to_ym(month_str: str) -> tuple[int,int]:
-  y, m = month_str.split("-")
-  return int(y), int(m)
+  return parse_month(month_str)
+
+@dataclass
+class IncomeTimeline:
+  """Month -> income (USD) for a contiguous month range, built in one pass."""
+  first: str
+  last: str
+  income: Dict[str, float] = field(default_factory=dict)
+  hours: Dict[str, float] = field(default_factory=dict)
+  pay_dates: Dict[str, List[date]] = field(default_factory=dict)
+  # weeks of default_weekly_hours the pay schedule pays per month (0 for overridden / pre-start months)
+  schedule_weeks: Dict[str, float] = field(default_factory=dict)
+
+  def __getitem__(self, month: str) -> float:
+    return self.income[month]
+
+  def __contains__(self, month: str) -> bool:
+    return month in self.income
+
+  def get(self, month: str, default: float = 0.0) -> float:
+    return self.income.get(month, default)
+
+  def months(self) -> List[str]:
+    return list(self.income.keys())
+
+  def values(self) -> List[float]:
+    return list(self.income.values())
+
+def _parse_iso(s: str) -> date:
+  return datetime.strptime(s, "%Y-%m-%d").date()
+
+def _first_on_or_after(d: date, weekday: int) -> date:
+  return d + timedelta(days=(weekday - d.weekday()) % 7)
+
+def _stepped_pay_dates(anchor: date, step_days: int, lo: date, hi: date) -> List[date]:
+  # anchor may sit anywhere relative to [lo, hi]; jump straight to the first hit
+  offset = (lo - anchor).days
+  k = -(-offset // step_days) if offset > 0 else -((-offset) // step_days)
+  d = anchor + timedelta(days=k * step_days)
+  out: List[date] = []
+  step = timedelta(days=step_days)
+  while d <= hi:
+    if d >= lo:
+      out.append(d)
+    d += step
+  return out
+
+def _semi_monthly_pay_dates(anchor_day: int, months: Iterable[str]) -> List[date]:
+  # two pay days per month, 15 days apart, clamped to month end (15th + 30th/last by default)
+  d1 = min(max(anchor_day, 1), 31)
+  d2 = d1 + 15 if d1 <= 15 else d1 - 15
+  out: List[date] = []
+  for month in months:
+    y, m = parse_month(month)
+    last = month_end(y, m).day
+    for d in sorted({min(d1, last), min(d2, last)}):
+      out.append(date(y, m, d))
+  return out
+
+def build_income_timeline(first_month: str, last_month: str, cfg_income) -> IncomeTimeline:
+  """
+  Lay out every pay date in [first_month, last_month] once, then bucket by month.
+    - pay dates before start_date earn nothing
+    - hours_overrides (total hours per month) replace the schedule for that month
+    - weekly pay anchored on a Monday reproduces the old "weekly hours x Mondays" rule
+  """
+  schedule = (getattr(cfg_income, "pay_schedule", "") or "weekly").lower()
+  if schedule not in _WEEKS_PER_PAY:
+    raise ValueError(f"Unknown income.pay_schedule '{schedule}'. Use one of: {', '.join(PAY_SCHEDULES)}")
+
+  months = iter_months(first_month, last_month)
+  tl = IncomeTimeline(first=first_month, last=last_month)
+  if not months:
+    return tl
+
+  start = getattr(cfg_income, "start", None) or _parse_iso(cfg_income.start_date)
+  anchor = getattr(cfg_income, "pay_anchor", None)
+  anchor_raw = getattr(cfg_income, "pay_anchor_date", "") or ""
+  if anchor is None and anchor_raw:
+    anchor = _parse_iso(anchor_raw)
+
+  y0, m0 = parse_month(months[0])
+  y1, m1 = parse_month(months[-1])
+  lo = max(date(y0, m0, 1), start)
+  hi = month_end(y1, m1)
+
+  if schedule == "semi_monthly":
+    dates = [d for d in _semi_monthly_pay_dates(anchor.day if anchor else 15, months) if lo <= d <= hi]
+  else:
+    step = 7 if schedule == "weekly" else 14
+    if anchor is None:
+      anchor = _first_on_or_after(start, 0)  # first Monday on/after start_date
+    dates = _stepped_pay_dates(anchor, step, lo, hi)
+
+  for month in months:
+    tl.pay_dates[month] = []
+  for d in dates:
+    tl.pay_dates[f"{d.year:04d}-{d.month:02d}"].append(d)
+
+  weekly_hours = float(cfg_income.default_weekly_hours)
+  per_pay_hours = weekly_hours * _WEEKS_PER_PAY[schedule]
+  start_key = (start.year, start.month)
+  overrides = cfg_income.hours_overrides
+  rate = float(cfg_income.hourly_rate)
+
+  for month in months:
+    weeks = 0.0
+    if parse_month(month) < start_key:
+      hours = 0.0
+    elif month in overrides:
+      hours = float(overrides[month])
+    else:
+      weeks = _WEEKS_PER_PAY[schedule] * len(tl.pay_dates[month])
+      hours = per_pay_hours * len(tl.pay_dates[month])
+    tl.schedule_weeks[month] = weeks
+    tl.hours[month] = hours
+    tl.income[month] = rate * hours
+  return tl
 
 def monthly_income(month: str, cfg_income) -> float:
-  # 0 before startDate's month
-  start = datetime.strptime(cfg_income.start_date, "%Y-%m-%d").date()
-  y, m = month_to_ym(month)
-  if (y, m) < (start.year, start.month):
-    return 0.0
-
-  # explicit override in hoursOverrides?
-  if month in cfg_income.hours_overrides:
-    hours = float(cfg_income.hours_overrides[month])
-    return cfg_income.hourly_rate * hours
-
-  # otherwise: defaultWeeklyHours * (# Mondays in month on/after startDate)
-  mondays = count_mondays_in_month(y, m, start_date=start)
-  hours = cfg_income.default_weekly_hours * mondays
-  return cfg_income.hourly_rate * hours
+  return build_income_timeline(month, month, cfg_income)[month]
@@ -0,0 +1,181 @@
+from __future__ import annotations
+import json
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+from core.dates import month_end, parse_month
+from core.models import CreditCardTransaction, MonthKey, WeekBalance, WeeklyAllowance
+
+CARRYOVER_MODES = ("none", "weekly", "monthly")
+
+# (key, day, amount) — key must be stable across runs for the same transaction
+LedgerEntry = Tuple[str, date, float]
+
+def splid_ledger_entries(month_rows: Iterable[dict], exclude_buckets: List[str] | None = None,
+                         use_your_share: bool = True) -> List[LedgerEntry]:
+    """Your-share spend from normalized Splid rows (payments and excluded buckets skipped)."""
+    ex = set(exclude_buckets or [])
+    seen: Dict[str, int] = defaultdict(int)
+    out: List[LedgerEntry] = []
+    for r in month_rows:
+        if r["is_payment"] or r["bucket"] in ex:
+            continue
+        amt = float(r["your_share"] if use_your_share else r["amount_total"])
+        base = f"s|{r['date']}|{r['title']}|{r['payer']}|{amt:.2f}"
+        seen[base] += 1
+        out.append((f"{base}|{seen[base]}", date.fromisoformat(r["date"]), amt))
+    return out
+
+def card_ledger_entries(unmatched: Iterable[CreditCardTransaction], use_post_date: bool = True) -> List[LedgerEntry]:
+    """Personal card spend: unmatched purchases only (credits/returns don't refund the allowance)."""
+    seen: Dict[str, int] = defaultdict(int)
+    out: List[LedgerEntry] = []
+    for c in unmatched:
+        if c.amount <= 0:
+            continue
+        d = c.post_date if use_post_date else c.trans_date
+        if c.txn_id:
+            out.append((f"c|{c.txn_id}", date.fromisoformat(d), float(c.amount)))
+            continue
+        base = f"c|{d}|{c.description}|{c.amount:.2f}"
+        seen[base] += 1
+        out.append((f"{base}|{seen[base]}", date.fromisoformat(d), float(c.amount)))
+    return out
+
+class SpendLedger:
+    """
+    Daily spend totals keyed by stable transaction keys.
+    sync() only touches entries that were added/removed since the last run, so a
+    month with a handful of new rows costs a handful of updates.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[date, float]] = {}
+        self._keys_by_month: Dict[MonthKey, Set[str]] = defaultdict(set)
+        self._daily: Dict[date, float] = defaultdict(float)
+        self._dirty: Set[MonthKey] = set()
+
+    # ---- persistence ----
+    # One <YYYY-MM>.json per month under the ledger directory, so a run can load and
+    # rewrite just the months it touches.
+
+    @classmethod
+    def load(cls, path: Path, months: Iterable[MonthKey] | None = None) -> "SpendLedger":
+        """Load every persisted month, or only `months`."""
+        led = cls()
+        if not path.is_dir():
+            return led
+        files = [path / f"{m}.json" for m in months] if months is not None else sorted(path.glob("*.json"))
+        for f in files:
+            if not f.exists():
+                continue
+            for key, (day_iso, amt) in json.loads(f.read_text(encoding="utf-8")).items():
+                led._add(f.stem, key, date.fromisoformat(day_iso), float(amt))
+        led._dirty.clear()
+        return led
+
+    def save(self, path: Path) -> None:
+        """Write only months changed since load()."""
+        path.mkdir(parents=True, exist_ok=True)
+        for m in sorted(self._dirty):
+            keys = self._keys_by_month.get(m)
+            f = path / f"{m}.json"
+            if not keys:
+                f.unlink(missing_ok=True)
+                continue
+            entries = {k: [self._entries[k][0].isoformat(), self._entries[k][1]] for k in sorted(keys)}
+            f.write_text(json.dumps(entries, indent=1), encoding="utf-8")
+        self._dirty.clear()
+
+    # ---- updates ----
+
+    def _add(self, month: MonthKey, key: str, day: date, amount: float) -> None:
+        self._entries[key] = (day, amount)
+        self._keys_by_month[month].add(key)
+        self._dirty.add(month)
+        self._daily[day] += amount
+
+    def _remove(self, month: MonthKey, key: str) -> None:
+        day, amount = self._entries.pop(key)
+        self._keys_by_month[month].discard(key)
+        self._dirty.add(month)
+        self._daily[day] -= amount
+
+    def sync(self, month: MonthKey, entries: Iterable[LedgerEntry]) -> int:
+        """Make `month` hold exactly `entries`. Returns the number of entries added or removed."""
+        incoming = {k: (d, a) for k, d, a in entries}
+        current = self._keys_by_month[month]
+        stale = current - incoming.keys()
+        fresh = incoming.keys() - current
+        for k in stale:
+            self._remove(month, k)
+        for k in fresh:
+            d, a = incoming[k]
+            self._add(month, k, d, a)
+        return len(stale) + len(fresh)
+
+    # ---- queries ----
+
+    def spent_on(self, day: date) -> float:
+        return self._daily.get(day, 0.0)
+
+    def spent_between(self, first: date, last: date) -> float:
+        total = 0.0
+        d = first
+        while d <= last:
+            total += self._daily.get(d, 0.0)
+            d += timedelta(days=1)
+        return round(total, 2)
+
+    def spent_in_month(self, month: MonthKey) -> float:
+        return round(sum(self._entries[k][1] for k in self._keys_by_month.get(month, ())), 2)
+
+    def month_carry(self, month: MonthKey, budget: float) -> float:
+        """Under- (+) or over-spend (-) of `month` against `budget`."""
+        return round(budget - self.spent_in_month(month), 2)
+
+    def week_balances(
+        self,
+        month: MonthKey,
+        schedule: List[WeeklyAllowance],
+        mode: str = "none",
+        carry_in: float = 0.0,
+    ) -> List[WeekBalance]:
+        """
+        Remaining allowance per week of `schedule`.
+          - "none": every week starts from its own allowance
+          - "weekly": leftover/overspend rolls into the next week of the month
+          - "monthly": as "weekly", plus `carry_in` from the previous month lands on week 1
+        Spend on days before the first week start (month doesn't begin on week_start) counts toward week 1.
+        """
+        if mode not in CARRYOVER_MODES:
+            raise ValueError(f"Unknown options.carryover_mode '{mode}'. Use one of: {', '.join(CARRYOVER_MODES)}")
+        y, m = parse_month(month)
+        out: List[WeekBalance] = []
+        carry = carry_in if mode == "monthly" else 0.0
+        for i, w in enumerate(schedule):
+            first = date(y, m, 1) if i == 0 else w.week_start
+            spent = self.spent_between(first, w.week_end)
+            remaining = round(w.allowance + carry - spent, 2)
+            out.append(WeekBalance(w.week_start, w.week_end, w.allowance, round(carry, 2), spent, remaining))
+            carry = remaining if mode != "none" else 0.0
+        return out
+
+    def daily_running_balance(self, month: MonthKey, schedule: List[WeeklyAllowance],
+                              carry_in: float = 0.0) -> List[Tuple[date, float, float]]:
+        """[(day, spent, balance)] for the month; each week's allowance is released on its start day (week 1 on the 1st)."""
+        y, m = parse_month(month)
+        release = {w.week_start: w.allowance for w in schedule[1:]}
+        if schedule:
+            release[date(y, m, 1)] = release.get(date(y, m, 1), 0.0) + schedule[0].allowance
+        bal = carry_in
+        out: List[Tuple[date, float, float]] = []
+        d, last = date(y, m, 1), month_end(y, m)
+        while d <= last:
+            spent = self._daily.get(d, 0.0)
+            bal += release.get(d, 0.0) - spent
+            out.append((d, round(spent, 2), round(bal, 2)))
+            d += timedelta(days=1)
+        return out
@@ -0,0 +1,157 @@
+from __future__ import annotations
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from core.dates import month_end, parse_month
+from core.models import MonthKey
+
+# Mid-month nowcast of living spend.
+# For every bucket, each month's spend is turned into a cumulative day-of-month curve
+# (share of that month's bucket total spent by day d). The curves of all months are kept
+# summed, so the typical curve of a bucket is sum / count — and replacing one month's rows
+# only subtracts that month's old curve and adds the new one. For a month in progress:
+#   estimate_b = spent_b(through today) + (1 - curve_b(today)) * baseline * share_b
+# where `baseline` is the regular forecast and share_b the bucket's share of recent spend.
+
+DAYS = 31
+
+def living_by_bucket_day(month_rows: Iterable[dict], exclude_buckets: List[str] | None = None,
+                         use_your_share: bool = True) -> Dict[str, Dict[int, float]]:
+    """{bucket: {day of month: spend}} over living rows (payments and excluded buckets skipped)."""
+    ex = set(exclude_buckets or [])
+    out: Dict[str, Dict[int, float]] = defaultdict(lambda: defaultdict(float))
+    for r in month_rows:
+        if r["is_payment"] or r["bucket"] in ex:
+            continue
+        out[r["bucket"]][int(r["date"][8:10])] += float(r["your_share"] if use_your_share else r["amount_total"])
+    return {b: dict(days) for b, days in out.items()}
+
+def _cumulative_fractions(days: Dict[int, float]) -> Optional[List[float]]:
+    total = sum(days.values())
+    if total <= 0:
+        return None
+    out, run = [0.0] * (DAYS + 1), 0.0
+    for d in range(1, DAYS + 1):
+        run += days.get(d, 0.0)
+        out[d] = min(1.0, run / total)
+    return out
+
+@dataclass
+class Nowcast:
+    month: MonthKey
+    asof: date
+    baseline: float                   # forecast from months before this one
+    spent: float                      # month to date
+    estimate: float                   # spent + expected rest of the month
+    by_bucket: Dict[str, float] = field(default_factory=dict)   # estimate per bucket
+
+class IntraMonthCurves:
+    """Per-bucket daily spend per month + summed cumulative curves, persisted as one JSON file."""
+
+    VERSION = 1
+
+    def __init__(self) -> None:
+        self._days: Dict[MonthKey, Dict[str, Dict[int, float]]] = {}
+        self._curve_sum: Dict[str, List[float]] = {}
+        self._curve_n: Dict[str, int] = defaultdict(int)
+
+    @classmethod
+    def load(cls, path: Path) -> "IntraMonthCurves":
+        c = cls()
+        if not path.exists():
+            return c
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        if raw.get("version") != cls.VERSION:
+            return c
+        for month, buckets in raw["months"].items():
+            c.update(month, {b: {int(d): float(v) for d, v in days.items()} for b, days in buckets.items()})
+        return c
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        raw = {
+            "version": self.VERSION,
+            "months": {
+                m: {b: {str(d): round(v, 2) for d, v in sorted(days.items())} for b, days in sorted(buckets.items())}
+                for m, buckets in sorted(self._days.items())
+            },
+        }
+        path.write_text(json.dumps(raw, indent=1), encoding="utf-8")
+
+    def _apply(self, buckets: Dict[str, Dict[int, float]], sign: int) -> None:
+        for b, days in buckets.items():
+            fr = _cumulative_fractions(days)
+            if fr is None:
+                continue
+            acc = self._curve_sum.setdefault(b, [0.0] * (DAYS + 1))
+            for d in range(1, DAYS + 1):
+                acc[d] += sign * fr[d]
+            self._curve_n[b] += sign
+
+    def update(self, month: MonthKey, buckets: Dict[str, Dict[int, float]]) -> bool:
+        """Replace `month`'s daily spend; O(buckets x 31). Returns False when nothing changed."""
+        old = self._days.get(month)
+        if old == buckets:
+            return False
+        if old is not None:
+            self._apply(old, -1)
+        self._apply(buckets, +1)
+        self._days[month] = buckets
+        return True
+
+    def curve(self, bucket: str, day: int, exclude: MonthKey | None = None) -> Optional[float]:
+        """Typical share of the bucket's month spent by `day` (None without history)."""
+        acc, n = self._curve_sum.get(bucket), self._curve_n.get(bucket, 0)
+        if acc is None:
+            return None
+        s = acc[min(day, DAYS)]
+        own = self._days.get(exclude, {}).get(bucket) if exclude else None
+        if own:
+            fr = _cumulative_fractions(own)
+            if fr is not None:
+                s -= fr[min(day, DAYS)]
+                n -= 1
+        return min(1.0, max(0.0, s / n)) if n > 0 else None
+
+    def bucket_shares(self, before: MonthKey, window: int = 12) -> Dict[str, float]:
+        """Each bucket's share of living spend over the last `window` months before `before`."""
+        months = sorted(m for m in self._days if m < before)
+        if window > 0:
+            months = months[-window:]
+        totals: Dict[str, float] = defaultdict(float)
+        for m in months:
+            for b, days in self._days[m].items():
+                totals[b] += sum(days.values())
+        grand = sum(v for v in totals.values() if v > 0)
+        return {b: v / grand for b, v in totals.items() if v > 0} if grand > 0 else {}
+
+    def nowcast(self, month: MonthKey, asof: date, baseline: float, window: int = 12) -> Nowcast:
+        """Estimate of the month's living spend as of `asof` (spend dated after `asof` is not counted yet)."""
+        y, m = parse_month(month)
+        end = month_end(y, m)
+        last_day = end.day
+        if asof > end:
+            day = last_day
+        elif (asof.year, asof.month) == (y, m):
+            day = asof.day
+        else:
+            day = 0
+        mtd = {b: sum(v for d, v in days.items() if d <= day)
+               for b, days in self._days.get(month, {}).items()}
+
+        shares = self.bucket_shares(month, window)
+        by_bucket: Dict[str, float] = {}
+        for b in sorted(set(shares) | set(mtd)):
+            done = self.curve(b, day, exclude=month)
+            if done is None:
+                done = day / last_day           # no history: assume spend spread evenly
+            if day >= last_day:
+                done = 1.0
+            by_bucket[b] = round(mtd.get(b, 0.0) + (1.0 - done) * baseline * shares.get(b, 0.0), 2)
+        spent = round(sum(mtd.values()), 2)
+        return Nowcast(month=month, asof=asof, baseline=round(baseline, 2), spent=spent,
+                       estimate=round(max(spent, sum(by_bucket.values())), 2), by_bucket=by_bucket)
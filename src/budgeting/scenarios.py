@@ -0,0 +1,211 @@
+from __future__ import annotations
+import warnings
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from core.models import BudgetingCfg, MonthKey
+from analytics.projection import SAVINGS_SHARE
+from analytics.trends import shift_month
+from budgeting.income import build_income_timeline
+from budgeting.weekly_budget import compute_weeks_in_month
+
+# What-if scenarios over the history.
+# Normalized rows are reduced once to a (months x buckets) matrix of living spend, plus
+# row counts (a month only exists for the forecast if a non-excluded bucket has rows).
+# Each scenario becomes one row of parameter arrays -- bucket scale / adjustment, included
+# buckets, forecast knobs, hours and rate -- and month totals, the forecast, the income
+# split and the weekly plan are computed for every scenario at once as (scenarios x months)
+# arrays. The forecast mirrors forecast_from_totals step for step (window, min_months,
+# outlier treatment, EWMA, seasonal anchor); only the EWMA walks the months, for all
+# scenarios together.
+
+BUDGETING_KNOBS = ("window_months", "min_months", "seasonal_weight", "ewma_alpha", "outlier_method", "outlier_k")
+
+@dataclass
+class Scenario:
+    name: str
+    weekly_hours: Optional[float] = None                    # replaces income.default_weekly_hours
+    hourly_rate: Optional[float] = None                     # replaces income.hourly_rate
+    adjust: Dict[str, float] = field(default_factory=dict)  # bucket -> $ added to every month
+    scale: Dict[str, float] = field(default_factory=dict)   # bucket -> multiplier (applied before adjust)
+    exclude_buckets: Optional[List[str]] = None             # replaces budgeting.exclude_buckets
+    # budgeting knobs; None = as configured
+    window_months: Optional[int] = None
+    min_months: Optional[int] = None
+    seasonal_weight: Optional[float] = None
+    ewma_alpha: Optional[float] = None
+    outlier_method: Optional[str] = None
+    outlier_k: Optional[float] = None
+
+@dataclass
+class ScenarioResult:
+    name: str
+    month: MonthKey
+    income: float
+    forecast: float               # forecast living spend = the weekly plan's monthly budget
+    excess: float                 # income - forecast, floored at 0
+    savings: float
+    spending: float
+    weekly: List[float]           # weekly allowances, one per week of `month`
+    history_months: int           # months before `month` with rows
+    history_income: float         # totals over those months
+    history_living: float
+    history_savings: float
+
+@dataclass
+class BucketTotals:
+    """Living spend (payments excluded) and row counts per (month, bucket)."""
+    months: List[MonthKey]
+    buckets: List[str]
+    amounts: np.ndarray           # (months, buckets)
+    counts: np.ndarray            # (months, buckets)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict], use_your_share: bool = True) -> "BucketTotals":
+        sums: Dict[Tuple[MonthKey, str], float] = defaultdict(float)
+        n: Dict[Tuple[MonthKey, str], int] = defaultdict(int)
+        for r in rows:
+            if r.get("is_payment"):
+                continue
+            key = (r["month"], r["bucket"])
+            sums[key] += float(r["your_share"] if use_your_share else r["amount_total"])
+            n[key] += 1
+        months = sorted({m for m, _ in sums})
+        buckets = sorted({b for _, b in sums})
+        mi = {m: i for i, m in enumerate(months)}
+        bi = {b: i for i, b in enumerate(buckets)}
+        amounts = np.zeros((len(months), len(buckets)))
+        counts = np.zeros((len(months), len(buckets)), dtype=np.int64)
+        for (m, b), v in sums.items():
+            amounts[mi[m], bi[b]] = v
+            counts[mi[m], bi[b]] = n[(m, b)]
+        return cls(months=months, buckets=buckets, amounts=amounts, counts=counts)
+
+def _forecast(totals: np.ndarray, present: np.ndarray, anchor: Optional[int], knobs: Dict[str, np.ndarray]) -> np.ndarray:
+    """forecast_from_totals for every scenario: (scenarios, months) history -> (scenarios,)."""
+    n_scen = totals.shape[0]
+    window = knobs["window_months"][:, None]
+    from_newest = np.cumsum(present[:, ::-1], axis=1)[:, ::-1]
+    use = present & ((window <= 0) | (from_newest <= window))
+    n = use.sum(axis=1)
+    x = np.where(use, totals, np.nan)
+
+    # not enough history: plain mean of the window
+    mean = np.where(use, totals, 0.0).sum(axis=1) / np.maximum(n, 1)
+    short = (n > 0) & (n < np.maximum(knobs["min_months"], 1))
+
+    # outlier treatment: drop (all dropped -> the series) or clamp, by MAD
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)   # all-NaN rows = no history
+        med = np.nanmedian(x, axis=1)[:, None]
+        mad = np.nanmedian(np.abs(x - med), axis=1)[:, None]
+    mad = np.where(np.isnan(mad) | (mad == 0), 1e-9, mad)
+    k = knobs["outlier_k"][:, None]
+    winsor = (knobs["outlier_method"] == "winsor")[:, None]
+    keep = use & (np.abs(x - med) / mad <= k)
+    keep = np.where(winsor | ~keep.any(axis=1, keepdims=True), use, keep)
+    x = np.where(winsor, np.clip(x, med - k * mad, med + k * mad), x)
+
+    # EWMA in time order over the kept months
+    alpha = knobs["ewma_alpha"]
+    ewma = np.zeros(n_scen)
+    started = np.zeros(n_scen, dtype=bool)
+    for t in range(totals.shape[1]):
+        kt = keep[:, t]
+        ewma = np.where(kt & started, alpha * x[:, t] + (1.0 - alpha) * ewma, np.where(kt, x[:, t], ewma))
+        started |= kt
+
+    # seasonal anchor (same month last year)
+    w = knobs["seasonal_weight"]
+    if anchor is not None:
+        seasonal = present[:, anchor] & (w > 0.0)
+        baseline = np.where(seasonal, (1.0 - w) * ewma + w * totals[:, anchor], ewma)
+    else:
+        baseline = ewma
+    return np.where(short, mean, np.maximum(baseline, 0.0))
+
+def evaluate_scenarios(base: BucketTotals, scenarios: Iterable[Scenario], month: MonthKey,
+                       income_cfg, budgeting: BudgetingCfg) -> List[ScenarioResult]:
+    """Forecast, income split and weekly plan for `month`, plus history totals, per scenario."""
+    scenarios = list(scenarios)
+    if not scenarios:
+        return []
+    n_scen = len(scenarios)
+
+    # history: the months before `month`, with columns for buckets only a scenario names
+    hist = [m for m in base.months if m < month]
+    buckets = base.buckets + sorted({b for s in scenarios for b in (*s.adjust, *s.scale)} - set(base.buckets))
+    col = {b: i for i, b in enumerate(buckets)}
+    amounts = np.zeros((len(hist), len(buckets)))
+    counts = np.zeros((len(hist), len(buckets)), dtype=np.int64)
+    amounts[:, :len(base.buckets)] = base.amounts[:len(hist)]
+    counts[:, :len(base.buckets)] = base.counts[:len(hist)]
+
+    scale = np.ones((n_scen, len(buckets)))
+    adjust = np.zeros((n_scen, len(buckets)))
+    include = np.ones((n_scen, len(buckets)), dtype=bool)
+    for i, s in enumerate(scenarios):
+        for b, v in s.scale.items():
+            scale[i, col[b]] = v
+        for b, v in s.adjust.items():
+            adjust[i, col[b]] = v
+        excluded = s.exclude_buckets if s.exclude_buckets is not None else (budgeting.exclude_buckets or [])
+        for b in excluded:
+            if b in col:
+                include[i, col[b]] = False
+    knobs = {
+        k: np.array([getattr(s, k) if getattr(s, k) is not None else getattr(budgeting, k) for s in scenarios])
+        for k in BUDGETING_KNOBS
+    }
+
+    spend = amounts[None, :, :] * scale[:, None, :] + adjust[:, None, :]     # (scenarios, months, buckets)
+    living = spend.sum(axis=2)
+    totals = np.einsum("smb,sb->sm", spend, include)
+    present = (np.einsum("mb,sb->sm", counts, include) > 0) | ((adjust * include) != 0).any(axis=1)[:, None]
+    anchor_key = shift_month(month, -12)
+    fc = _forecast(totals, present, hist.index(anchor_key) if anchor_key in hist else None, knobs)
+
+    # income: scenario hours replace the default weekly hours wherever the pay schedule applies
+    tl = build_income_timeline(hist[0] if hist else month, month, income_cfg)
+    span = hist + [month]
+    hours0 = np.array([tl.hours[m] for m in span])
+    weeks = np.array([tl.schedule_weeks[m] for m in span])
+    default_hours = float(income_cfg.default_weekly_hours)
+    wh = np.array([s.weekly_hours if s.weekly_hours is not None else default_hours for s in scenarios])
+    rate = np.array([s.hourly_rate if s.hourly_rate is not None else float(income_cfg.hourly_rate) for s in scenarios])
+    income = rate[:, None] * (hours0[None, :] + (wh - default_hours)[:, None] * weeks[None, :])
+
+    # the month: same split as the month reports, weekly plan = the forecast split evenly (pennies to early weeks)
+    excess = np.maximum(income[:, -1] - fc, 0.0)
+    savings = np.round(SAVINGS_SHARE * excess, 2)
+    n_weeks = len(compute_weeks_in_month(month, budgeting.week_start))
+    if n_weeks:
+        per = np.round(fc / n_weeks, 2)
+        pennies = np.maximum(np.round((fc - per * n_weeks) * 100.0), 0.0)
+        weekly = np.round(per[:, None] + 0.01 * (np.arange(n_weeks)[None, :] < pennies[:, None]), 2)
+    else:
+        weekly = np.zeros((n_scen, 0))
+
+    hist_excess = np.maximum(income[:, :-1] - living, 0.0)
+    hist_savings = np.round(SAVINGS_SHARE * hist_excess, 2).sum(axis=1)
+
+    return [
+        ScenarioResult(
+            name=s.name,
+            month=month,
+            income=round(float(income[i, -1]), 2),
+            forecast=round(float(fc[i]), 2),
+            excess=round(float(excess[i]), 2),
+            savings=float(savings[i]),
+            spending=round(float(excess[i] - savings[i]), 2),
+            weekly=[float(v) for v in weekly[i]],
+            history_months=len(hist),
+            history_income=round(float(income[i, :-1].sum()), 2),
+            history_living=round(float(living[i].sum()), 2),
+            history_savings=round(float(hist_savings[i]), 2),
+        )
+        for i, s in enumerate(scenarios)
+    ]
@@ -1,10 +1,12 @@
 from __future__ import annotations
 from datetime import date, timedelta
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 
 from core.models import BudgetingCfg, WeekRange, WeeklyAllowance, MonthKey
 from analytics.monthly_aggregates import monthly_living_totals
-from analytics.outliers import remove_outliers_mad, winsorize
+from analytics.outliers import treat_outliers
+from analytics.recurring import RecurringTracker, discretionary_totals
+from budgeting.nowcast import IntraMonthCurves, Nowcast
 
 _DAY_OF_WEEK = {"MON":0, "TUE":1, "WED":2, "THU":3, "FRI":4, "SAT":5, "SUN":6}
 
@@ -67,7 +69,14 @@ def forecast_monthly_spend(
         use_your_share=cfg.use_your_share,
         exclude_buckets=cfg.exclude_buckets,
     )
+    return forecast_from_totals(totals, target_month, cfg)
 
+def forecast_from_totals(
+    totals: Dict[MonthKey, float],
+    target_month: MonthKey,
+    cfg: BudgetingCfg,
+) -> float:
+    """Same forecast as forecast_monthly_spend, from precomputed { 'YYYY-MM': living total }."""
     # months strictly before target_month within window
     all_months = _sort_month_keys([m for m in totals.keys() if m < target_month])
     if cfg.window_months > 0:
@@ -78,14 +87,8 @@ def forecast_monthly_spend(
         # not enough history; just use mean
         return sum(series) / len(series) if series else 0.0
 
-    # outlier treatment
-    cleaned: List[float]
-    if cfg.outlier_method == "winsor":
-        cleaned = winsorize(series, cfg.outlier_k)
-    else:
-        # default MAD filter (drop outliers)
-        keep = remove_outliers_mad(series, cfg.outlier_k)
-        cleaned = keep if keep else series  # fallback if all dropped
+    # outlier treatment (default: MAD filter, falling back to the series if all dropped)
+    cleaned = treat_outliers(series, cfg.outlier_method, cfg.outlier_k)
 
     # EWMA on time-order
     ewma = _ewma(cleaned, cfg.ewma_alpha)
@@ -101,6 +104,43 @@ def forecast_monthly_spend(
 
     return max(baseline, 0.0)
 
+def month_forecaster(
+    totals: Dict[MonthKey, float],
+    cfg: BudgetingCfg,
+    recurring: Optional[RecurringTracker] = None,
+) -> Callable[[MonthKey], float]:
+    """
+    The month reports' forecast: forecast_from_totals, over discretionary totals when
+    `subtract_recurring` is on. Reads `totals` / `recurring` at call time, so streaming
+    callers can keep filling them.
+    """
+    if not cfg.subtract_recurring or recurring is None:
+        return lambda m: forecast_from_totals(totals, m, cfg)
+    return lambda m: forecast_from_totals(discretionary_totals(totals, recurring.amounts_by_month("s")), m, cfg)
+
+def month_nowcaster(
+    totals: Dict[MonthKey, float],
+    cfg: BudgetingCfg,
+    curves: Optional[IntraMonthCurves],
+) -> Optional[Callable[[MonthKey, date], Nowcast]]:
+    """(month, as of) -> mid-month estimate, or None when the nowcast is off (no curves)."""
+    # baseline over the full living totals: the month-to-date side counts recurring charges too
+    if curves is None:
+        return None
+    return lambda m, asof: curves.nowcast(m, asof, forecast_from_totals(totals, m, cfg), cfg.window_months)
+
+def planned_monthly_spend(
+    month: MonthKey,
+    asof: date,
+    forecast: Callable[[MonthKey], float],
+    nowcast: Optional[Callable[[MonthKey, date], Nowcast]] = None,
+) -> Tuple[float, Optional[Nowcast]]:
+    """Budget the weekly plan splits: the nowcast estimate during `asof`'s month, else the forecast."""
+    if nowcast is not None and month == asof.strftime("%Y-%m"):
+        nc = nowcast(month, asof)
+        return nc.estimate, nc
+    return forecast(month), None
+
 def compute_weekly_spending_schedule(
     month: MonthKey,
     monthly_spend_budget: float,
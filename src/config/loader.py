@@ -1,9 +1,17 @@
 from __future__ import annotations
-from dataclasses import dataclass
+import hashlib
+import pickle
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 from core.models import BudgetingCfg
+from config.schema import ConfigError, validate_settings
+
+# Bump when the shape of UnifiedConfig changes without a matching source change below.
+_SNAPSHOT_VERSION = 1
 
 @dataclass
 class YouCfg:
@@ -15,6 +23,10 @@ class IncomeCfg:
   default_weekly_hours: float
   start_date: str
   hours_overrides: Dict[str, float]
+  pay_schedule: str = "weekly"       # "weekly" | "biweekly" | "semi_monthly"
+  pay_anchor_date: str = ""          # YYYY-MM-DD of any real pay date; "" = derive from start_date
+  start: Optional[date] = None       # parsed start_date (filled by the loader)
+  pay_anchor: Optional[date] = None  # parsed pay_anchor_date (filled by the loader)
 
 @dataclass
 class OptionsCfg:
@@ -22,23 +34,73 @@ class OptionsCfg:
   override_month: str
   backfill_all: bool
   carryover_mode: str
+  settle_up: bool = False   # household balances + settle-up transfers in each month report
 
 @dataclass
 class BucketMapCfg:
   title_to_bucket: Dict[str, str]
   category_to_bucket: Dict[str, str]
   payment_title_exact: list[str]
+  # (compiled regex, bucket) for title_to_bucket, in config order; filled by the loader
+  compiled_title_rules: List[Tuple[re.Pattern, str]] = field(default_factory=list, repr=False)
+  # card-only rules, tried on normalized card merchants before title_to_bucket
+  card_title_to_bucket: Dict[str, str] = field(default_factory=dict)
+  compiled_card_rules: List[Tuple[re.Pattern, str]] = field(default_factory=list, repr=False)
 
 @dataclass
 class CCSourcesCfg:
   pdf_statements_glob: str
   use_posting_date_for_month: bool
+  statement_globs: List[str] = field(default_factory=list)   # CSV / OFX / QFX / PDF, any mix
+
+  @property
+  def globs(self) -> List[str]:
+    return list(self.statement_globs) + ([self.pdf_statements_glob] if self.pdf_statements_glob else [])
 
 @dataclass
 class CCMatchCfg:
   amount_tolerance_cents: int
   date_window_days: int
   only_if_payer_is_you: bool
+  method: str = "exact"              # "exact" | "scored"
+  amount_tolerance_pct: float = 0.0  # scored: extra slack as a fraction of the charge (tips, FX)
+  min_score: float = 0.5             # scored: pairs below this confidence never match
+
+@dataclass
+class CurrencyCfg:
+  base: str = "USD"
+  rates_csv: Optional[Path] = None   # local daily rates (date,currency,rate); None = no conversion
+
+@dataclass
+class StorageCfg:
+  sqlite_path: Optional[Path] = None   # transaction store; None = disabled
+  write_month_csv: bool = True         # keep the per-month CSV exports
+
+@dataclass
+class AnomalyCfg:
+  enabled: bool = True
+  k: float = 4.0            # flag when the robust z-score exceeds k ...
+  min_delta: float = 20.0   # ... and the amount is at least this much above typical
+  alpha: float = 0.1        # EW step for the running median/MAD
+  min_history: int = 5      # rows a bucket/title needs before it can flag
+
+@dataclass
+class AlertsCfg:
+  enabled: bool = True
+  rules: List[dict] = field(default_factory=list)   # compiled by analytics.alerts
+
+@dataclass
+class WhatIfCfg:
+  target_month: str = ""    # "" = the current month
+  scenarios: List[dict] = field(default_factory=list)   # budgeting.scenarios.Scenario fields
+
+@dataclass
+class ProjectionCfg:
+  enabled: bool = True
+  horizon_months: int = 24  # months projected past the latest summary month
+  paths: int = 20000        # simulated savings paths
+  workers: int = 0          # > 1: simulate on a process pool
+  seed: int = 0             # fixed so the trends page is reproducible
 
 @dataclass
 class PathsCfg:
@@ -57,39 +119,36 @@ class UnifiedConfig:
   cc_match: CCMatchCfg
   paths: PathsCfg
   budgeting: BudgetingCfg
+  currency: CurrencyCfg = field(default_factory=CurrencyCfg)
+  storage: StorageCfg = field(default_factory=StorageCfg)
+  anomalies: AnomalyCfg = field(default_factory=AnomalyCfg)
+  projection: ProjectionCfg = field(default_factory=ProjectionCfg)
+  alerts: AlertsCfg = field(default_factory=AlertsCfg)
+  what_if: WhatIfCfg = field(default_factory=WhatIfCfg)
 
-def load_unified_config(repo_root: Path) -> UnifiedConfig:
-    """Load config/settings.yaml only. No JSON fallbacks."""
-    cfg_dir = repo_root / "config"
-    yaml_cfg = cfg_dir / "settings.yaml"
-
-    # Require PyYAML
-    try:
-        import yaml  # type: ignore
-    except Exception as e:
-        raise ImportError(
-            "PyYAML is required to read config/settings.yaml. Install with: pip install pyyaml"
-        ) from e
-
-    if not yaml_cfg.exists():
-        raise FileNotFoundError(
-            f"Missing {yaml_cfg}. Create it (see the settings.yaml template you set up)."
-        )
-
-    y: Dict[str, Any] = yaml.safe_load(yaml_cfg.read_text(encoding="utf-8")) or {}
-
-    # minimal structure checks (fail fast with clear messages)
-    for section in ["user", "paths", "options", "income", "buckets", "credit_card"]:
-        if section not in y:
-            raise KeyError(f"settings.yaml is missing the '{section}' section")
+def _parse_date(v: Any) -> Optional[date]:
+    if v in ("", None):
+        return None
+    if isinstance(v, date):
+        return v
+    return datetime.strptime(str(v), "%Y-%m-%d").date()
 
+def _build_config(y: Dict[str, Any], repo_root: Path, cfg_dir: Path) -> UnifiedConfig:
     user = y["user"]
     paths = y["paths"]
     options = y["options"]
     income = y["income"]
     buckets = y["buckets"]
     cc = y["credit_card"]
-    budgeting = y.get("budgeting", {})
+    budgeting = y.get("budgeting") or {}
+    currency = y.get("currency") or {}
+    storage = y.get("storage") or {}
+    anomalies = y.get("anomalies") or {}
+    projection = y.get("projection") or {}
+    alerts = y.get("alerts") or {}
+    what_if = y.get("what_if") or {}
+    title_to_bucket = buckets.get("title_to_bucket") or {}
+    card_title_to_bucket = {str(k): str(v) for k, v in (buckets.get("card_title_to_bucket") or {}).items()}
 
     return UnifiedConfig(
         you=YouCfg(name=user["name"]),
@@ -97,27 +156,39 @@ def load_unified_config(repo_root: Path) -> UnifiedConfig:
             hourly_rate=float(income["hourly_rate"]),
             default_weekly_hours=float(income["default_weekly_hours"]),
             start_date=str(income["start_date"]),
-            hours_overrides={str(k): float(v) for k, v in income.get("hours_overrides", {}).items()},
+            hours_overrides={str(k): float(v) for k, v in (income.get("hours_overrides") or {}).items()},
+            pay_schedule=str(income.get("pay_schedule", "weekly")),
+            pay_anchor_date=str(income.get("pay_anchor_date", "") or ""),
+            start=_parse_date(income["start_date"]),
+            pay_anchor=_parse_date(income.get("pay_anchor_date")),
         ),
         options=OptionsCfg(
             month_selection=str(options["month_selection"]),
-            override_month=str(options.get("override_month", "")),
+            override_month=str(options.get("override_month") or ""),
             backfill_all=bool(options["backfill_all"]),
             carryover_mode=str(options["carryover_mode"]),
+            settle_up=bool(options.get("settle_up", False)),
         ),
         bucket=BucketMapCfg(
-            title_to_bucket=buckets.get("title_to_bucket", {}),
-            category_to_bucket=buckets.get("category_to_bucket", {}),
+            title_to_bucket=title_to_bucket,
+            category_to_bucket=buckets.get("category_to_bucket") or {},
             payment_title_exact=buckets.get("payment_title_exact", ["Payment"]),
+            compiled_title_rules=[(re.compile(p, re.IGNORECASE), b) for p, b in title_to_bucket.items()],
+            card_title_to_bucket=card_title_to_bucket,
+            compiled_card_rules=[(re.compile(p, re.IGNORECASE), b) for p, b in card_title_to_bucket.items()],
         ),
         cc_sources=CCSourcesCfg(
-            pdf_statements_glob=str(cc["sources"]["pdf_statements_glob"]),
+            pdf_statements_glob=str(cc["sources"].get("pdf_statements_glob") or ""),
             use_posting_date_for_month=bool(cc["sources"]["use_posting_date_for_month"]),
+            statement_globs=[str(g) for g in cc["sources"].get("statement_globs") or []],
         ),
         cc_match=CCMatchCfg(
             amount_tolerance_cents=int(cc["matching"]["amount_tolerance_cents"]),
             date_window_days=int(cc["matching"]["date_window_days"]),
             only_if_payer_is_you=bool(cc["matching"]["only_if_payer_is_you"]),
+            method=str(cc["matching"].get("method", "exact")),
+            amount_tolerance_pct=float(cc["matching"].get("amount_tolerance_pct", 0.0)),
+            min_score=float(cc["matching"].get("min_score", 0.5)),
         ),
         paths=PathsCfg(
             inputs_dir=(repo_root / paths["inputs_dir"]).resolve(),
@@ -126,4 +197,114 @@ def load_unified_config(repo_root: Path) -> UnifiedConfig:
             config_dir=cfg_dir.resolve(),
         ),
         budgeting=BudgetingCfg(**budgeting),
-    )
\ No newline at end of file
+        currency=CurrencyCfg(
+            base=str(currency.get("base") or "USD").upper(),
+            rates_csv=(repo_root / currency["rates_csv"]).resolve() if currency.get("rates_csv") else None,
+        ),
+        storage=StorageCfg(
+            sqlite_path=(repo_root / storage["sqlite_path"]).resolve() if storage.get("sqlite_path") else None,
+            write_month_csv=bool(storage.get("write_month_csv", True)),
+        ),
+        anomalies=AnomalyCfg(
+            enabled=bool(anomalies.get("enabled", True)),
+            k=float(anomalies.get("k", 4.0)),
+            min_delta=float(anomalies.get("min_delta", 20.0)),
+            alpha=float(anomalies.get("alpha", 0.1)),
+            min_history=int(anomalies.get("min_history", 5)),
+        ),
+        projection=ProjectionCfg(
+            enabled=bool(projection.get("enabled", True)),
+            horizon_months=int(projection.get("horizon_months", 24)),
+            paths=int(projection.get("paths", 20000)),
+            workers=int(projection.get("workers", 0)),
+            seed=int(projection.get("seed", 0)),
+        ),
+        alerts=AlertsCfg(
+            enabled=bool(alerts.get("enabled", True)),
+            rules=[dict(r) for r in alerts.get("rules") or []],
+        ),
+        what_if=WhatIfCfg(
+            target_month=str(what_if.get("target_month") or ""),
+            scenarios=[dict(s) for s in what_if.get("scenarios") or []],
+        ),
+    )
+
+def _snapshot_key(yaml_bytes: bytes, repo_root: Path) -> str:
+    # content hash of the YAML + the code that shapes the snapshot + where paths resolve from
+    h = hashlib.sha256(yaml_bytes)
+    h.update(f"|v{_SNAPSHOT_VERSION}|{repo_root.resolve()}|".encode("utf-8"))
+    here = Path(__file__).resolve()
+    for src in (here, here.with_name("schema.py"), here.parents[1] / "core" / "models.py"):
+        h.update(src.read_bytes())
+    return h.hexdigest()[:20]
+
+def compile_config(yaml_bytes: bytes, repo_root: Path) -> UnifiedConfig:
+    """Parse + validate settings.yaml contents. Raises ConfigError with path-based messages."""
+    try:
+        import yaml  # type: ignore
+    except Exception as e:
+        raise ImportError(
+            "PyYAML is required to read config/settings.yaml. Install with: pip install pyyaml"
+        ) from e
+
+    try:
+        y = yaml.safe_load(yaml_bytes.decode("utf-8")) or {}
+    except yaml.YAMLError as e:
+        raise ConfigError([f"<yaml>: {e}"]) from e
+    validate_settings(y)
+    cfg = _build_config(y, repo_root, repo_root / "config")
+    _check_files(cfg)
+    return cfg
+
+def _check_files(cfg: UnifiedConfig) -> None:
+    """Files the settings point at must exist; also checked on snapshot hits (the YAML can be unchanged)."""
+    errors: List[str] = []
+    if cfg.currency.rates_csv is not None and not cfg.currency.rates_csv.is_file():
+        errors.append(f"currency.rates_csv: file not found: {cfg.currency.rates_csv}")
+    if errors:
+        raise ConfigError(errors)
+
+def load_unified_config(repo_root: Path, use_snapshot: bool = True) -> UnifiedConfig:
+    """
+    Load config/settings.yaml only. No JSON fallbacks.
+    A validated, compiled snapshot is cached under config/.cache keyed by the YAML's
+    content hash; when it matches, PyYAML isn't imported at all.
+    """
+    cfg_dir = repo_root / "config"
+    yaml_cfg = cfg_dir / "settings.yaml"
+
+    if not yaml_cfg.exists():
+        raise FileNotFoundError(
+            f"Missing {yaml_cfg}. Create it (see the settings.yaml template you set up)."
+        )
+
+    yaml_bytes = yaml_cfg.read_bytes()
+    if not use_snapshot:
+        return compile_config(yaml_bytes, repo_root)
+
+    cache_dir = cfg_dir / ".cache"
+    snap = cache_dir / f"settings-{_snapshot_key(yaml_bytes, repo_root)}.pickle"
+    if snap.exists():
+        try:
+            with snap.open("rb") as f:
+                cfg = pickle.load(f)
+            if not isinstance(cfg, UnifiedConfig):
+                cfg = None
+        except Exception:
+            cfg = None  # stale/corrupt snapshot: rebuild below
+        if cfg is not None:
+            _check_files(cfg)
+            return cfg
+
+    cfg = compile_config(yaml_bytes, repo_root)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for old in cache_dir.glob("settings-*.pickle"):
+            old.unlink()
+        tmp = snap.with_suffix(".tmp")
+        with tmp.open("wb") as f:
+            pickle.dump(cfg, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(snap)
+    except OSError as e:
+        print(f"[WARN] Could not write config snapshot {snap}: {e}")
+    return cfg
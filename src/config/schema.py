@@ -0,0 +1,304 @@
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+# Declarative shape of settings.yaml. Validation collects *every* problem with its
+# dotted path (e.g. "credit_card.matching.amount_tolerance_cents") before failing.
+
+class ConfigError(ValueError):
+  def __init__(self, errors: List[str]):
+    self.errors = errors
+    super().__init__("Invalid config/settings.yaml:\n  - " + "\n  - ".join(errors))
+
+@dataclass
+class Field:
+  types: Tuple[type, ...]
+  required: bool = True
+  choices: Optional[Tuple[Any, ...]] = None
+  nullable: bool = False
+  # returns an error message or None; list checks return one "[i]..." message per bad item
+  check: Optional[Callable[[Any], Union[None, str, List[str]]]] = None
+
+@dataclass
+class MapOf:
+  key: Tuple[type, ...]
+  value: Tuple[type, ...]
+  required: bool = False
+  check_key: Optional[Callable[[Any], Optional[str]]] = None
+
+@dataclass
+class ListOf:
+  item: Tuple[type, ...]
+  required: bool = False
+  nullable: bool = True
+
+@dataclass
+class Section:
+  fields: Dict[str, Any] = field(default_factory=dict)
+  required: bool = True
+
+_NUM = (int, float)
+
+def _iso_date(v: Any) -> Optional[str]:
+  if isinstance(v, date):
+    return None
+  try:
+    datetime.strptime(str(v), "%Y-%m-%d")
+  except ValueError:
+    return f"expected a YYYY-MM-DD date, got {v!r}"
+  return None
+
+def _iso_date_or_empty(v: Any) -> Optional[str]:
+  return None if v in ("", None) else _iso_date(v)
+
+def _month_or_empty(v: Any) -> Optional[str]:
+  if v in ("", None):
+    return None
+  return None if re.fullmatch(r"\d{4}-\d{2}", str(v)) else f"expected YYYY-MM or \"\", got {v!r}"
+
+def _month_key(v: Any) -> Optional[str]:
+  return None if re.fullmatch(r"\d{4}-\d{2}", str(v)) else f"expected a YYYY-MM key, got {v!r}"
+
+def _regex(v: Any) -> Optional[str]:
+  try:
+    re.compile(str(v), re.IGNORECASE)
+  except re.error as e:
+    return f"invalid regex ({e})"
+  return None
+
+def _non_negative(v: Any) -> Optional[str]:
+  return None if v >= 0 else f"must be >= 0, got {v!r}"
+
+def _unit_interval(v: Any) -> Optional[str]:
+  return None if 0.0 <= v <= 1.0 else f"must be between 0 and 1, got {v!r}"
+
+def _alert_rules(rules: Any) -> List[str]:
+  allowed = {"name", "metric", "compare", "percent", "above", "below"}
+  errors: List[str] = []
+  for i, r in enumerate(rules):
+    if not isinstance(r, dict):
+      errors.append(f"[{i}]: expected a mapping, got {type(r).__name__}")
+      continue
+    extra = set(r) - allowed
+    if extra:
+      errors.append(f"[{i}]: unknown key(s) {', '.join(sorted(map(str, extra)))}")
+    if not isinstance(r.get("metric"), str) or not r["metric"].strip():
+      errors.append(f"[{i}].metric: required (a monthly_summary.csv column, weeks_over_allowance or week_remaining_min)")
+    if r.get("compare", "value") not in ("value", "mom", "yoy"):
+      errors.append(f"[{i}].compare: must be one of value, mom, yoy; got {r.get('compare')!r}")
+    if "percent" in r and not isinstance(r["percent"], bool):
+      errors.append(f"[{i}].percent: expected true/false, got {r['percent']!r}")
+    bounds = [k for k in ("above", "below") if k in r]
+    if not bounds:
+      errors.append(f"[{i}]: needs `above` and/or `below`")
+    for k in bounds:
+      if not _type_ok(r[k], _NUM):
+        errors.append(f"[{i}].{k}: expected a number, got {r[k]!r}")
+  return errors
+
+_SCENARIO_NUMBERS = ("weekly_hours", "hourly_rate", "seasonal_weight", "ewma_alpha", "outlier_k")
+
+def _scenarios(scenarios: Any) -> List[str]:
+  allowed = {"name", "adjust", "scale", "exclude_buckets", "window_months", "min_months", "outlier_method", *_SCENARIO_NUMBERS}
+  errors: List[str] = []
+  names = set()
+  for i, s in enumerate(scenarios):
+    if not isinstance(s, dict):
+      errors.append(f"[{i}]: expected a mapping, got {type(s).__name__}")
+      continue
+    extra = set(s) - allowed
+    if extra:
+      errors.append(f"[{i}]: unknown key(s) {', '.join(sorted(map(str, extra)))}")
+    if not isinstance(s.get("name"), str) or not s["name"].strip():
+      errors.append(f"[{i}].name: required")
+    elif s["name"] in names or s["name"] == "baseline":
+      errors.append(f"[{i}].name: {s['name']!r} is already used")
+    else:
+      names.add(s["name"])
+    for k in _SCENARIO_NUMBERS:
+      if k in s and (not _type_ok(s[k], _NUM) or s[k] < 0):
+        errors.append(f"[{i}].{k}: expected a non-negative number, got {s[k]!r}")
+      elif k in ("seasonal_weight", "ewma_alpha") and k in s and s[k] > 1:
+        errors.append(f"[{i}].{k}: must be between 0 and 1, got {s[k]!r}")
+    for k in ("window_months", "min_months"):
+      if k in s and (not isinstance(s[k], int) or isinstance(s[k], bool) or s[k] < 0):
+        errors.append(f"[{i}].{k}: expected a non-negative integer, got {s[k]!r}")
+    if s.get("outlier_method", "mad") not in ("mad", "winsor"):
+      errors.append(f"[{i}].outlier_method: must be one of mad, winsor; got {s['outlier_method']!r}")
+    for k in ("adjust", "scale"):
+      m = s.get(k, {})
+      if not isinstance(m, dict) or not all(isinstance(b, str) and _type_ok(v, _NUM) for b, v in m.items()):
+        errors.append(f"[{i}].{k}: expected a mapping of bucket -> number")
+    ex = s.get("exclude_buckets", [])
+    if not isinstance(ex, list) or not all(isinstance(b, str) for b in ex):
+      errors.append(f"[{i}].exclude_buckets: expected a list of bucket names")
+  return errors
+
+SCHEMA: Dict[str, Section] = {
+  "user": Section({
+    "name": Field((str,)),
+  }),
+  "paths": Section({
+    "inputs_dir": Field((str,)),
+    "data_dir": Field((str,)),
+    "reports_dir": Field((str,)),
+    "config_dir": Field((str,), required=False),
+  }),
+  "options": Section({
+    "month_selection": Field((str,), choices=("previous_complete", "latest_any")),
+    "override_month": Field((str,), required=False, nullable=True, check=_month_or_empty),
+    "backfill_all": Field((bool,)),
+    "carryover_mode": Field((str,), choices=("none", "weekly", "monthly")),
+    "settle_up": Field((bool,), required=False),
+  }),
+  "income": Section({
+    "hourly_rate": Field(_NUM, check=_non_negative),
+    "default_weekly_hours": Field(_NUM, check=_non_negative),
+    "start_date": Field((str, date), check=_iso_date),
+    "hours_overrides": MapOf((str,), _NUM, check_key=_month_key),
+    "pay_schedule": Field((str,), required=False, choices=("weekly", "biweekly", "semi_monthly")),
+    "pay_anchor_date": Field((str, date), required=False, nullable=True, check=_iso_date_or_empty),
+  }),
+  "buckets": Section({
+    "title_to_bucket": MapOf((str,), (str,), check_key=_regex),
+    "category_to_bucket": MapOf((str,), (str,)),
+    "payment_title_exact": ListOf((str,)),
+    "card_title_to_bucket": MapOf((str,), (str,), check_key=_regex),
+  }),
+  "credit_card": Section({
+    "sources": Section({
+      "pdf_statements_glob": Field((str,), required=False, nullable=True),
+      "statement_globs": ListOf((str,)),
+      "use_posting_date_for_month": Field((bool,)),
+    }),
+    "matching": Section({
+      "amount_tolerance_cents": Field((int,), check=_non_negative),
+      "date_window_days": Field((int,), check=_non_negative),
+      "only_if_payer_is_you": Field((bool,)),
+      "method": Field((str,), required=False, choices=("exact", "scored")),
+      "amount_tolerance_pct": Field(_NUM, required=False, check=_unit_interval),
+      "min_score": Field(_NUM, required=False, check=_unit_interval),
+    }),
+  }),
+  "budgeting": Section({
+    "week_start": Field((str,), required=False, choices=("MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN")),
+    "use_your_share": Field((bool,), required=False),
+    "exclude_buckets": ListOf((str,)),
+    "window_months": Field((int,), required=False, check=_non_negative),
+    "min_months": Field((int,), required=False, check=_non_negative),
+    "seasonal_weight": Field(_NUM, required=False, check=_unit_interval),
+    "ewma_alpha": Field(_NUM, required=False, check=_unit_interval),
+    "outlier_method": Field((str,), required=False, choices=("mad", "winsor")),
+    "outlier_k": Field(_NUM, required=False, check=_non_negative),
+    "subtract_recurring": Field((bool,), required=False),
+    "nowcast": Field((bool,), required=False),
+  }, required=False),
+  "currency": Section({
+    "base": Field((str,), required=False, check=lambda v: None if re.fullmatch(r"[A-Za-z]{3}", v) else f"expected a 3-letter code, got {v!r}"),
+    "rates_csv": Field((str,), required=False, nullable=True),
+  }, required=False),
+  "storage": Section({
+    "sqlite_path": Field((str,), required=False, nullable=True),
+    "write_month_csv": Field((bool,), required=False),
+  }, required=False),
+  "anomalies": Section({
+    "enabled": Field((bool,), required=False),
+    "k": Field(_NUM, required=False, check=_non_negative),
+    "min_delta": Field(_NUM, required=False, check=_non_negative),
+    "alpha": Field(_NUM, required=False, check=_unit_interval),
+    "min_history": Field((int,), required=False, check=_non_negative),
+  }, required=False),
+  "alerts": Section({
+    "enabled": Field((bool,), required=False),
+    "rules": Field((list,), required=False, nullable=True, check=_alert_rules),
+  }, required=False),
+  "what_if": Section({
+    "target_month": Field((str,), required=False, nullable=True, check=_month_or_empty),
+    "scenarios": Field((list,), required=False, nullable=True, check=_scenarios),
+  }, required=False),
+  "projection": Section({
+    "enabled": Field((bool,), required=False),
+    "horizon_months": Field((int,), required=False, check=lambda v: None if 1 <= v <= 120 else f"must be between 1 and 120, got {v!r}"),
+    "paths": Field((int,), required=False, check=_non_negative),
+    "workers": Field((int,), required=False, check=_non_negative),
+    "seed": Field((int,), required=False),
+  }, required=False),
+}
+
+def _type_ok(v: Any, types: Tuple[type, ...]) -> bool:
+  # YAML booleans are ints in Python; don't let `true` pass as a number
+  if isinstance(v, bool) and bool not in types:
+    return False
+  return isinstance(v, types)
+
+def _tname(types: Tuple[type, ...]) -> str:
+  return " | ".join(t.__name__ for t in types)
+
+def _validate(spec: Any, value: Any, path: str, errors: List[str]) -> None:
+  if isinstance(spec, Section):
+    if not isinstance(value, dict):
+      errors.append(f"{path}: expected a mapping, got {type(value).__name__}")
+      return
+    for k in value:
+      if k not in spec.fields:
+        errors.append(f"{path}.{k}: unknown key" if path else f"{k}: unknown section")
+    for k, sub in spec.fields.items():
+      sub_path = f"{path}.{k}" if path else k
+      if k not in value:
+        if getattr(sub, "required", False):
+          errors.append(f"{sub_path}: missing")
+        continue
+      _validate(sub, value[k], sub_path, errors)
+  elif isinstance(spec, Field):
+    if value is None:
+      if not spec.nullable:
+        errors.append(f"{path}: must not be empty")
+      return
+    if not _type_ok(value, spec.types):
+      errors.append(f"{path}: expected {_tname(spec.types)}, got {type(value).__name__} ({value!r})")
+      return
+    if spec.choices is not None and value not in spec.choices:
+      errors.append(f"{path}: must be one of {', '.join(map(str, spec.choices))}; got {value!r}")
+      return
+    if spec.check is not None:
+      msg = spec.check(value)
+      if isinstance(msg, list):
+        errors.extend(f"{path}{m}" for m in msg)
+      elif msg:
+        errors.append(f"{path}: {msg}")
+  elif isinstance(spec, MapOf):
+    if value is None:
+      return
+    if not isinstance(value, dict):
+      errors.append(f"{path}: expected a mapping, got {type(value).__name__}")
+      return
+    for k, v in value.items():
+      item_path = f"{path}[{k!r}]"
+      if not _type_ok(k, spec.key):
+        errors.append(f"{item_path}: key must be {_tname(spec.key)}")
+      elif spec.check_key is not None:
+        msg = spec.check_key(k)
+        if msg:
+          errors.append(f"{item_path}: {msg}")
+      if not _type_ok(v, spec.value):
+        errors.append(f"{item_path}: expected {_tname(spec.value)}, got {type(v).__name__} ({v!r})")
+  elif isinstance(spec, ListOf):
+    if value is None:
+      if not spec.nullable:
+        errors.append(f"{path}: must not be empty")
+      return
+    if not isinstance(value, list):
+      errors.append(f"{path}: expected a list, got {type(value).__name__}")
+      return
+    for i, v in enumerate(value):
+      if not _type_ok(v, spec.item):
+        errors.append(f"{path}[{i}]: expected {_tname(spec.item)}, got {type(v).__name__} ({v!r})")
+
+def validate_settings(y: Any) -> None:
+  """Raise ConfigError listing every schema violation (by dotted path) in the parsed YAML."""
+  errors: List[str] = []
+  _validate(Section(SCHEMA), y, "", errors)
+  if errors:
+    raise ConfigError(errors)
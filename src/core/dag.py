@@ -0,0 +1,145 @@
+from __future__ import annotations
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# A tiny stage scheduler: every stage starts as soon as all of its dependencies have
+# finished, so independent stages overlap. Stages run on a thread pool; stages marked
+# `process=True` (top-level function, picklable inputs/outputs) go to `process_pool`
+# instead when one is given.
+
+@dataclass
+class Stage:
+  name: str
+  fn: Callable[..., Any]                 # called as fn(*results_of_deps), in `deps` order
+  deps: Tuple[str, ...] = ()
+  process: bool = False
+
+@dataclass
+class StageTiming:
+  start: float   # seconds since the run started
+  end: float
+
+  @property
+  def seconds(self) -> float:
+    return self.end - self.start
+
+@dataclass
+class DagRun:
+  results: Dict[str, Any] = field(default_factory=dict)
+  timings: Dict[str, StageTiming] = field(default_factory=dict)
+  wall_s: float = 0.0
+
+def _check(stages: List[Stage]) -> Dict[str, Stage]:
+  by_name: Dict[str, Stage] = {}
+  for s in stages:
+    if s.name in by_name:
+      raise ValueError(f"duplicate stage '{s.name}'")
+    by_name[s.name] = s
+  for s in stages:
+    for d in s.deps:
+      if d not in by_name:
+        raise ValueError(f"stage '{s.name}' depends on unknown stage '{d}'")
+  # reject cycles up front instead of deadlocking
+  state: Dict[str, int] = {}
+  def visit(n: str, trail: Tuple[str, ...]) -> None:
+    if state.get(n) == 2:
+      return
+    if state.get(n) == 1:
+      raise ValueError(f"stage cycle: {' -> '.join(trail + (n,))}")
+    state[n] = 1
+    for d in by_name[n].deps:
+      visit(d, trail + (n,))
+    state[n] = 2
+  for s in stages:
+    visit(s.name, ())
+  return by_name
+
+def _timed(fn: Callable[..., Any], args: tuple) -> Tuple[Any, float, float]:
+  t0 = time.perf_counter()
+  out = fn(*args)
+  return out, t0, time.perf_counter()
+
+def run_stages(stages: List[Stage], max_workers: int = 4, process_pool: Optional[Executor] = None) -> DagRun:
+  """Run `stages` respecting deps; re-raises the first stage failure (pending stages are cancelled)."""
+  by_name = _check(stages)
+  run = DagRun()
+  waiting = {s.name: set(s.deps) for s in stages}
+  running: Dict[Future, str] = {}
+  proc_t0: Dict[Future, float] = {}  # process stages are timed from the parent (incl. pickling)
+  t_run = time.perf_counter()
+
+  with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage") as threads:
+    def submit_ready() -> None:
+      for name in [n for n, deps in waiting.items() if not deps]:
+        del waiting[name]
+        s = by_name[name]
+        args = tuple(run.results[d] for d in s.deps)
+        if s.process and process_pool is not None:
+          fut = process_pool.submit(s.fn, *args)
+          proc_t0[fut] = time.perf_counter()
+        else:
+          fut = threads.submit(_timed, s.fn, args)
+        running[fut] = name
+
+    submit_ready()
+    while running:
+      done, _ = wait(running, return_when=FIRST_COMPLETED)
+      for fut in done:
+        name = running.pop(fut)
+        try:
+          if fut in proc_t0:
+            out, t0, t1 = fut.result(), proc_t0.pop(fut), time.perf_counter()
+          else:
+            out, t0, t1 = fut.result()
+        except BaseException:
+          for f in running:
+            f.cancel()
+          raise
+        run.results[name] = out
+        run.timings[name] = StageTiming(t0 - t_run, t1 - t_run)
+        for deps in waiting.values():
+          deps.discard(name)
+      submit_ready()
+
+  run.wall_s = time.perf_counter() - t_run
+  return run
+
+def critical_path(stages: List[Stage], timings: Dict[str, StageTiming]) -> Tuple[List[str], float]:
+  """
+  Longest dependency chain by stage duration: (stage names in order, summed seconds).
+  That chain bounds end-to-end latency however much the rest overlaps.
+  """
+  by_name = {s.name: s for s in stages}
+  finish: Dict[str, float] = {}
+  via: Dict[str, Optional[str]] = {}
+
+  def ef(n: str) -> float:
+    if n not in finish:
+      best, prev = 0.0, None
+      for d in by_name[n].deps:
+        if ef(d) > best:
+          best, prev = ef(d), d
+      finish[n] = best + timings[n].seconds
+      via[n] = prev
+    return finish[n]
+
+  end = max(by_name, key=ef)
+  path: List[str] = []
+  n: Optional[str] = end
+  while n is not None:
+    path.append(n)
+    n = via[n]
+  return path[::-1], finish[end]
+
+def format_timings(stages: List[Stage], run: DagRun) -> str:
+  path, total = critical_path(stages, run.timings)
+  on_path = set(path)
+  lines = [f"{'stage':<14} {'start':>8} {'end':>8} {'secs':>8}  critical"]
+  for s in sorted(stages, key=lambda s: run.timings[s.name].start):
+    t = run.timings[s.name]
+    lines.append(f"{s.name:<14} {t.start:>8.3f} {t.end:>8.3f} {t.seconds:>8.3f}  {'*' if s.name in on_path else ''}")
+  busy = sum(t.seconds for t in run.timings.values())
+  lines.append(f"critical path: {' -> '.join(path)} = {total:.3f}s; wall {run.wall_s:.3f}s; stage-seconds {busy:.3f}s")
+  return "\n".join(lines)
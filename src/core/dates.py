@@ -17,3 +17,22 @@ def count_mondays_in_month(year: int, month: int, start_date: date | None = None
         mondays += 1
     d += timedelta(days=1)
   return mondays
+
+def parse_month(month: str) -> tuple[int, int]:
+  y, m = month.split("-")
+  return int(y), int(m)
+
+def month_end(year: int, month: int) -> date:
+  if month == 12:
+    return date(year, 12, 31)
+  return date(year, month + 1, 1) - timedelta(days=1)
+
+def iter_months(first: str, last: str) -> List[str]:
+  # inclusive "YYYY-MM" range; empty if first > last
+  y, m = parse_month(first)
+  ly, lm = parse_month(last)
+  out: List[str] = []
+  while (y, m) <= (ly, lm):
+    out.append(f"{y:04d}-{m:02d}")
+    y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+  return out
@@ -16,6 +16,15 @@ class WeeklyAllowance:
   week_end: date
   allowance: float
 
+@dataclass
+class WeekBalance:
+  week_start: date
+  week_end: date
+  allowance: float     # planned allowance for the week
+  carry_in: float      # under- (+) / over-spend (-) rolled in per carryover_mode
+  spent: float         # your-share Splid + unmatched card spend in the week
+  remaining: float     # allowance + carry_in - spent
+
 @dataclass
 class BudgetingCfg:
   week_start: str = "MON"              # "MON".."SUN"
@@ -29,6 +38,8 @@ class BudgetingCfg:
   ewma_alpha: float = 0.5              # higher = favor recent months more
   outlier_method: str = "mad"          # "mad" | "winsor"
   outlier_k: float = 3.5               # aggressiveness for outlier detection
+  subtract_recurring: bool = False     # forecast only the non-recurring (discretionary) part
+  nowcast: bool = False                # current month: month-to-date spend + rest at each bucket's usual pace
   
 @dataclass
 class CreditCardTransaction:
@@ -37,3 +48,5 @@ class CreditCardTransaction:
   description: str
   amount: float       # +charges, -credits
   section: str        # "payments_credits" | "purchases_adjustments"
+  account: str = ""   # last 4 digits of the card account, when the statement shows it
+  txn_id: str = ""    # content hash, see ingest.cards.ids
@@ -0,0 +1,69 @@
+from __future__ import annotations
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+class MonthPartitions:
+  """
+  Route records to one JSON-lines spill file per month so a month can be read back
+  on its own later. A month's buffer is written once it holds `buffer_rows` records,
+  and every buffer is written once `max_buffered` records are held in total, so memory
+  stays bounded however many months are streamed through.
+  """
+
+  def __init__(self, spill_dir: Path, buffer_rows: int = 256, max_buffered: int = 2048):
+    self.spill_dir = Path(spill_dir)
+    self.spill_dir.mkdir(parents=True, exist_ok=True)
+    self.buffer_rows = buffer_rows
+    self.max_buffered = max_buffered
+    self._buf: Dict[str, List[str]] = defaultdict(list)
+    self._buffered = 0
+    self._counts: Dict[Tuple[str, str], int] = defaultdict(int)
+
+  def _path(self, month: str) -> Path:
+    return self.spill_dir / f"{month}.jsonl"
+
+  def add(self, month: str, kind: str, record: Dict[str, Any]) -> None:
+    buf = self._buf[month]
+    buf.append(json.dumps([kind, record], separators=(",", ":")))
+    self._counts[(month, kind)] += 1
+    self._buffered += 1
+    if len(buf) >= self.buffer_rows:
+      self._flush_month(month)
+    elif self._buffered >= self.max_buffered:
+      self.flush()
+
+  def _flush_month(self, month: str) -> None:
+    buf = self._buf.get(month)
+    if not buf:
+      return
+    with self._path(month).open("a", encoding="utf-8") as f:
+      f.write("\n".join(buf))
+      f.write("\n")
+    self._buffered -= len(buf)
+    buf.clear()
+
+  def flush(self) -> None:
+    for month in list(self._buf):
+      self._flush_month(month)
+    self._buf.clear()
+    self._buffered = 0
+
+  def months(self, kind: str | None = None) -> List[str]:
+    """Months that received any record (or any record of `kind`)."""
+    return sorted({m for (m, k) in self._counts if kind is None or k == kind})
+
+  def count(self, month: str, kind: str) -> int:
+    return self._counts.get((month, kind), 0)
+
+  def read(self, month: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (kind, record) for `month` in insertion order. Call flush() first."""
+    path = self._path(month)
+    if not path.exists():
+      return
+    with path.open("r", encoding="utf-8") as f:
+      for line in f:
+        if line.strip():
+          kind, rec = json.loads(line)
+          yield kind, rec
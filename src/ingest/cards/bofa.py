@@ -10,6 +10,8 @@ from core.models import CreditCardTransaction
 _DATE = r"(?:\d{1,2}/\d{1,2})"
 _AMT  = r"[-]?\$?\d{1,3}(?:,\d{3})*(?:\.\d{2})"
 _LINE_RE = re.compile(rf"^\s*({_DATE})\s+({_DATE})\s+(.*\S)\s+({_AMT})\s*$")
+# "Account# XXXX XXXX XXXX 1234" / "Account Number: ... 1234"
+_ACCOUNT_RE = re.compile(r"Account\s*(?:#|Number)[:\s]*[\dXx*\s-]*(\d{4})\b")
 
 def _to_iso(monthday: str, fallback_year: int) -> str:
     # monthday like "07/28" → use fallback_year to resolve
@@ -47,6 +49,13 @@ def parse_statement_pdf(pdf_path: Path) -> List[CreditCardTransaction]:
         m = re.search(r"(\d{4})", " ".join(lines))
         year = int(m.group(1)) if m else dup.parse("2000-01-01").year
 
+    account = ""
+    for ln in lines:
+        m = _ACCOUNT_RE.search(ln)
+        if m:
+            account = m.group(1)
+            break
+
     rows: List[CreditCardTransaction] = []
     in_transactions = False
     in_section = None  # None | "payments_credits" | "purchases_adjustments"
@@ -78,7 +87,7 @@ def parse_statement_pdf(pdf_path: Path) -> List[CreditCardTransaction]:
                     pr = _to_iso(post_m, year)
                     amt = _to_amount(amt_s)
                     # normalize sign: in BoA PDF amounts are already signed appropriately per section
-                    rows.append(CreditCardTransaction(tr, pr, desc.strip(), amt, in_section))
+                    rows.append(CreditCardTransaction(tr, pr, desc.strip(), amt, in_section, account))
                 except Exception:
                     # tolerate weird lines
                     pass
@@ -0,0 +1,120 @@
+from __future__ import annotations
+import csv
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core.models import CreditCardTransaction
+
+# Card CSV exports. Issuers differ in column names and sign convention, so each one gets a
+# CsvLayout; the layout is picked from the header row (first of the leading lines that
+# fits a layout) and rows are then streamed one at a time with csv.reader.
+
+@dataclass(frozen=True)
+class CsvLayout:
+    issuer: str
+    identify: frozenset            # lowercased header names that must all be present
+    trans_date: Tuple[str, ...]
+    post_date: Tuple[str, ...]
+    description: Tuple[str, ...]
+    amount: Tuple[str, ...] = ()
+    debit: Tuple[str, ...] = ()    # used when there is no signed amount column
+    credit: Tuple[str, ...] = ()
+    account: Tuple[str, ...] = ()
+    charges_negative: bool = False
+
+CSV_LAYOUTS: List[CsvLayout] = [
+    # Posted Date,Reference Number,Payee,Address,Amount
+    CsvLayout("bofa", frozenset({"posted date", "payee", "amount"}),
+              ("posted date",), ("posted date",), ("payee",), amount=("amount",), charges_negative=True),
+    # Transaction Date,Post Date,Description,Category,Type,Amount,Memo
+    CsvLayout("chase", frozenset({"transaction date", "post date", "description", "amount"}),
+              ("transaction date",), ("post date",), ("description",), amount=("amount",), charges_negative=True),
+    # Transaction Date,Posted Date,Card No.,Description,Category,Debit,Credit
+    CsvLayout("capitalone", frozenset({"transaction date", "posted date", "description", "debit", "credit"}),
+              ("transaction date",), ("posted date",), ("description",),
+              debit=("debit",), credit=("credit",), account=("card no.",)),
+    # anything else with a date, a description and a signed amount (charges positive)
+    CsvLayout("generic", frozenset({"description", "amount"}),
+              ("transaction date", "trans date", "date"), ("post date", "posted date", "posting date", "date"),
+              ("description",), amount=("amount",)),
+]
+
+_HEADER_SCAN = 10
+
+def _col(header: Dict[str, int], names: Sequence[str]) -> Optional[int]:
+    for n in names:
+        if n in header:
+            return header[n]
+    return None
+
+def detect_layout(header_row: Sequence[str]) -> Optional[CsvLayout]:
+    cols = {c.strip().lower() for c in header_row if c}
+    for layout in CSV_LAYOUTS:
+        if layout.identify <= cols and any(n in cols for n in layout.post_date):
+            return layout
+    return None
+
+@lru_cache(maxsize=4096)
+def _iso(s: str) -> str:
+    s = s.strip()
+    if len(s) == 10 and s[4] == "-":
+        return s
+    for fmt in ("%m/%d/%Y", "%m/%d/%y", "%Y/%m/%d"):
+        try:
+            return datetime.strptime(s, fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognized date {s!r}")
+
+def _money(s: str) -> float:
+    s = (s or "").strip().replace(",", "").replace("$", "")
+    if not s:
+        return 0.0
+    if s.startswith("(") and s.endswith(")"):
+        return -float(s[1:-1])
+    return float(s)
+
+def iter_csv_statement(csv_path: Path) -> Iterator[CreditCardTransaction]:
+    """Stream transactions from a card CSV export; ValueError if no layout fits its header."""
+    with open(csv_path, newline="", encoding="utf-8-sig") as fh:
+        reader = csv.reader(fh)
+        layout, row = None, []
+        for n, row in enumerate(reader):
+            layout = detect_layout(row)
+            if layout is not None or n + 1 >= _HEADER_SCAN:
+                break
+        if layout is None:
+            raise ValueError(f"no known card CSV layout in the first {_HEADER_SCAN} rows")
+
+        header = {c.strip().lower(): i for i, c in enumerate(row)}
+        i_trans = _col(header, layout.trans_date)
+        i_post = _col(header, layout.post_date)
+        i_desc = _col(header, layout.description)
+        i_amt = _col(header, layout.amount)
+        i_debit, i_credit = _col(header, layout.debit), _col(header, layout.credit)
+        i_acct = _col(header, layout.account)
+        if i_trans is None:
+            i_trans = i_post
+        sign = -1.0 if layout.charges_negative else 1.0
+        width = max(i for i in (i_trans, i_post, i_desc, i_amt, i_debit, i_credit, i_acct) if i is not None) + 1
+
+        for row in reader:
+            if len(row) < width or not row[i_post].strip():
+                continue                # blank / summary lines
+            try:
+                post = _iso(row[i_post])
+                trans = _iso(row[i_trans]) if row[i_trans].strip() else post
+                if i_amt is not None:
+                    amt = sign * _money(row[i_amt])
+                else:
+                    amt = _money(row[i_debit]) - _money(row[i_credit])
+            except ValueError:
+                continue                # tolerate footer / malformed lines like the PDF parser does
+            account = row[i_acct].strip()[-4:] if i_acct is not None else ""
+            yield CreditCardTransaction(
+                trans, post, " ".join(row[i_desc].split()), round(amt, 2),
+                "purchases_adjustments" if amt > 0 else "payments_credits", account,
+            )
@@ -0,0 +1,56 @@
+from __future__ import annotations
+import hashlib
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from core.models import CreditCardTransaction
+
+# Card transaction identity.
+# txn_id = blake2b(account | trans date | post date | amount | normalized description | n)
+# where n counts identical charges within one statement, so two same-day coffees keep
+# distinct IDs while the same charge seen again in an overlapping or re-downloaded
+# statement hashes to the ID it already has and is dropped.
+
+def normalize_description(description: str) -> str:
+    """Case- and whitespace-insensitive description (PDF extraction varies in both)."""
+    return " ".join((description or "").upper().split())
+
+def txn_base(c: CreditCardTransaction) -> str:
+    return f"{c.account}|{c.trans_date}|{c.post_date}|{c.amount:.2f}|{normalize_description(c.description)}"
+
+def make_txn_id(base: str, occurrence: int) -> str:
+    return hashlib.blake2b(f"{base}|{occurrence}".encode("utf-8"), digest_size=10).hexdigest()
+
+def assign_ids(txns: Iterable[CreditCardTransaction]) -> Iterator[CreditCardTransaction]:
+    """Set txn_id on one statement's transactions (in place) as they stream past."""
+    seen: Dict[str, int] = defaultdict(int)
+    for c in txns:
+        base = txn_base(c)
+        seen[base] += 1
+        c.txn_id = make_txn_id(base, seen[base])
+        yield c
+
+class CardDeduper:
+    """Single pass over statements: assigns IDs and drops transactions whose ID was already seen."""
+
+    def __init__(self) -> None:
+        self.seen: Set[str] = set()
+        self.duplicates = 0
+
+    def add_statement(self, txns: Iterable[CreditCardTransaction]) -> Iterator[CreditCardTransaction]:
+        for c in assign_ids(txns):
+            if c.txn_id in self.seen:
+                self.duplicates += 1
+                continue
+            self.seen.add(c.txn_id)
+            yield c
+
+    def stream(self, statements: Iterable[Iterable[CreditCardTransaction]]) -> Iterator[CreditCardTransaction]:
+        for txns in statements:
+            yield from self.add_statement(txns)
+
+def dedup_statements(statements: Iterable[Iterable[CreditCardTransaction]]) -> Tuple[List[CreditCardTransaction], int]:
+    """(unique transactions in statement order, number of duplicates dropped)."""
+    d = CardDeduper()
+    out = list(d.stream(statements))
+    return out, d.duplicates
@@ -0,0 +1,65 @@
+from __future__ import annotations
+import html
+import re
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+from core.models import CreditCardTransaction
+
+# OFX / QFX (Quicken's OFX) exports. Both the SGML flavour (OFX 1.x, unclosed leaf tags,
+# often one transaction per line or everything on one line) and XML (OFX 2.x) are read
+# with the same tokenizer over fixed-size chunks, so memory stays flat for any file size.
+# On credit card statements TRNAMT is negative for charges; it is flipped to the
+# +charges / -credits convention of CreditCardTransaction.
+
+_TAG_RE = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+_CHUNK = 1 << 16
+
+def _tokens(fh) -> Iterator[Tuple[bool, str, str]]:
+    """(closing?, TAG, text after the tag) for every tag in the file."""
+    buf = ""
+    while True:
+        chunk = fh.read(_CHUNK)
+        if not chunk:
+            break
+        buf += chunk
+        cut = buf.rfind("<")       # the last tag may continue in the next chunk
+        for m in _TAG_RE.finditer(buf, 0, cut):
+            yield m.group(1) == "/", m.group(2).upper(), m.group(3)
+        buf = buf[cut:] if cut >= 0 else ""
+    for m in _TAG_RE.finditer(buf):
+        yield m.group(1) == "/", m.group(2).upper(), m.group(3)
+
+def _iso(dt: str) -> str:
+    # 20250801, 20250801120000, 20250801120000.000[-5:EST]
+    return f"{dt[0:4]}-{dt[4:6]}-{dt[6:8]}"
+
+def _txn(t: Dict[str, str], account: str) -> CreditCardTransaction:
+    post = _iso(t["DTPOSTED"])
+    trans = _iso(t["DTUSER"]) if t.get("DTUSER") else post
+    amt = round(-float(t["TRNAMT"].replace(",", "")), 2)
+    desc = " ".join(html.unescape(t.get("NAME") or t.get("MEMO") or t.get("PAYEE") or "").split())
+    return CreditCardTransaction(trans, post, desc, amt,
+                                 "purchases_adjustments" if amt > 0 else "payments_credits", account)
+
+def iter_ofx_statement(ofx_path: Path) -> Iterator[CreditCardTransaction]:
+    """Stream transactions from an OFX/QFX download (one STMTTRN block at a time)."""
+    account = ""
+    cur: Dict[str, str] | None = None
+    with open(ofx_path, encoding="utf-8", errors="replace") as fh:
+        for closing, tag, text in _tokens(fh):
+            if tag == "STMTTRN":
+                if closing and cur is not None:
+                    if "DTPOSTED" in cur and "TRNAMT" in cur:
+                        yield _txn(cur, account)
+                    cur = None
+                elif not closing:
+                    cur = {}
+                continue
+            if closing:
+                continue
+            text = text.strip()
+            if tag == "ACCTID" and text:
+                account = re.sub(r"\D", "", text)[-4:]
+            elif cur is not None and text:
+                cur[tag] = text
@@ -0,0 +1,46 @@
+from __future__ import annotations
+from glob import glob
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from core.models import CreditCardTransaction
+from ingest.cards.bofa import parse_statement_pdf
+from ingest.cards.csv_export import iter_csv_statement
+from ingest.cards.ofx import iter_ofx_statement
+
+# Card statement sources, dispatched on file extension. Each parser takes a path and
+# yields CreditCardTransaction objects; the CSV parser further picks the issuer layout
+# from the header and the OFX parser works for any issuer. PDFs (BofA only, via
+# pdfplumber) are by far the slowest and remain as the fallback when no export exists.
+
+StatementParser = Callable[[Path], Iterable[CreditCardTransaction]]
+
+PARSERS: Dict[str, StatementParser] = {
+    ".csv": iter_csv_statement,
+    ".ofx": iter_ofx_statement,
+    ".qfx": iter_ofx_statement,
+    ".pdf": parse_statement_pdf,
+}
+
+def register_parser(suffix: str, parser: StatementParser) -> None:
+    """Add or replace the parser for a file extension (e.g. ".qbo")."""
+    PARSERS[suffix.lower()] = parser
+
+def parser_for(path: Path) -> StatementParser | None:
+    return PARSERS.get(Path(path).suffix.lower())
+
+def iter_statement(path: Path) -> Iterator[CreditCardTransaction]:
+    parser = parser_for(path)
+    if parser is None:
+        raise ValueError(f"no card statement parser for {Path(path).suffix or 'files without an extension'}")
+    yield from parser(Path(path))
+
+def statement_paths(globs: Iterable[str], root: Path) -> List[Path]:
+    """Files matched by any of `globs` (relative to `root` unless absolute), sorted, each once."""
+    seen: Dict[Path, None] = {}
+    for g in globs:
+        for s in sorted(glob(str(root / g), recursive=True)):
+            p = Path(s)
+            if p.is_file() and parser_for(p) is not None:
+                seen.setdefault(p, None)
+    return list(seen)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+import csv
+from bisect import bisect_right
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Local daily FX rates, no network. CSV columns (header required, extra columns ignored):
+#   date,currency,rate
+#   2025-07-01,EUR,1.0712
+# `rate` = units of the base currency per 1 unit of `currency`.
+
+class RateTable:
+    """Per-currency date-sorted rates with nearest-previous-day lookup, memoized per (currency, day)."""
+
+    def __init__(self, base: str = "USD"):
+        self.base = base.upper()
+        self._days: Dict[str, List[int]] = {}     # currency -> sorted date ordinals
+        self._rates: Dict[str, List[float]] = {}  # currency -> rates aligned with _days
+        self._memo: Dict[Tuple[str, int], Optional[float]] = {}
+
+    @classmethod
+    def from_points(cls, points: Dict[str, Dict[date, float]], base: str = "USD") -> "RateTable":
+        t = cls(base)
+        for cur, by_day in points.items():
+            days = sorted(by_day)
+            t._days[cur.upper()] = [d.toordinal() for d in days]
+            t._rates[cur.upper()] = [float(by_day[d]) for d in days]
+        return t
+
+    def currencies(self) -> List[str]:
+        return sorted(self._days)
+
+    def rate(self, currency: str, day: date) -> Optional[float]:
+        """Base units per 1 `currency` on `day` (latest quote on/before it), or None if unknown."""
+        cur = (currency or self.base).upper()
+        if cur == self.base:
+            return 1.0
+        key = (cur, day.toordinal())
+        if key in self._memo:
+            return self._memo[key]
+        days = self._days.get(cur)
+        hit: Optional[float] = None
+        if days:
+            i = bisect_right(days, key[1]) - 1
+            if i >= 0:
+                hit = self._rates[cur][i]
+        self._memo[key] = hit
+        return hit
+
+_CACHE: Dict[Tuple[str, float, str], RateTable] = {}
+
+def load_rate_table(path: Path, base: str = "USD") -> RateTable:
+    """Read the rates CSV once per process (re-read only if the file changes)."""
+    path = Path(path)
+    key = (str(path.resolve()), path.stat().st_mtime, base.upper())
+    if key in _CACHE:
+        return _CACHE[key]
+
+    points: Dict[str, Dict[date, float]] = {}
+    with path.open("r", newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        cols = {c.strip().lower(): c for c in (reader.fieldnames or [])}
+        missing = {"date", "currency", "rate"} - cols.keys()
+        if missing:
+            raise ValueError(f"{path.name}: missing column(s) {', '.join(sorted(missing))}")
+        dc, cc, rc = cols["date"], cols["currency"], cols["rate"]
+        for i, r in enumerate(reader, start=2):
+            try:
+                d = date.fromisoformat((r[dc] or "").strip())
+                v = float((r[rc] or "").strip())
+            except ValueError:
+                print(f"[WARN] {path.name}:{i}: skipping unparseable rate row")
+                continue
+            points.setdefault((r[cc] or "").strip().upper(), {})[d] = v
+
+    table = RateTable.from_points(points, base=base)
+    _CACHE.clear()
+    _CACHE[key] = table
+    return table
@@ -1,6 +1,9 @@
 from __future__ import annotations
+import csv
+import json
+from itertools import chain, islice
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Iterable, Iterator, Tuple
 import pandas as pd
 
 _REQ = {"title", "amount", "by", "category"}  # plus date/created on
@@ -13,7 +16,16 @@ def _to_str(x) -> str:
 def _to_num(x) -> float:
     if pd.isna(x) or x == "":
         return 0.0
-    s = str(x)
+    return _text_num(str(x))
+
+def _text_num(s: str) -> float:
+    """_to_num for text cells: '$1,234.50' -> 1234.5, '(12.00)' -> -12.0, junk -> 0."""
+    if not s:
+        return 0.0
+    try:
+        return float(s)             # plain numbers (most cells) skip the cleanup below
+    except ValueError:
+        pass
     neg = "(" in s and ")" in s
     s2 = s.replace("$", "").replace(",", "").replace("(", "").replace(")", "").strip()
     try:
@@ -22,11 +34,17 @@ def _to_num(x) -> float:
         v = 0.0
     return -abs(v) if neg else v
 
+_HEADER_SCAN = 10
+
 def _find_header_idx(df_raw: pd.DataFrame) -> int:
-    scan = min(10, len(df_raw))
+    scan = min(_HEADER_SCAN, len(df_raw))
+    return _pick_header_idx([df_raw.iloc[i].map(_to_str).tolist() for i in range(scan)])
+
+def _pick_header_idx(rows: List[List[str]]) -> int:
+    """Index of the header among the first rows of a sheet (cells as strings)."""
     best_i, best_nonempty = 0, -1
-    for i in range(scan):
-        row = df_raw.iloc[i].map(_to_str).str.strip().str.lower().tolist()
+    for i, raw in enumerate(rows[:_HEADER_SCAN]):
+        row = [c.strip().lower() for c in raw]
         cols = {c for c in row if c}
         has_req = _REQ.issubset(cols) and ("created on" in cols or "date" in cols)
         if has_req:
@@ -37,14 +55,19 @@ def _find_header_idx(df_raw: pd.DataFrame) -> int:
     return best_i  # fallback: “most filled” among first rows
 
 def _find_col(df: pd.DataFrame, names: list[str]) -> str | None:
-    low = {c.strip().lower(): c for c in df.columns if isinstance(c, str)}
+    return _match_col(list(df.columns), names)
+
+def _match_col(columns: list, names: list[str]) -> str | None:
+    low = {c.strip().lower(): c for c in columns if isinstance(c, str)}
     for n in names:
         if n in low:
             return low[n]
     return None
 
 def _find_name_col(df: pd.DataFrame, your_name: str) -> int:
-    cols = list(df.columns)
+    return _name_col_idx(list(df.columns), your_name)
+
+def _name_col_idx(cols: list, your_name: str) -> int:
     # exact first, then case-insensitive
     try:
         return cols.index(your_name)
@@ -55,6 +78,10 @@ def _find_name_col(df: pd.DataFrame, your_name: str) -> int:
     raise ValueError(f"Could not find your name '{your_name}' in the header row.")
 
 def parse_splid_xls(xls_path: Path, your_name: str) -> List[Dict[str, Any]]:
+    return list(iter_splid_xls(xls_path, your_name))
+
+def iter_splid_xls(xls_path: Path, your_name: str) -> Iterator[Dict[str, Any]]:
+    """Yield raw rows one at a time (xlrd still reads the sheet whole; no row list is built)."""
     # pass 1: sniff header row
     df_raw = pd.read_excel(xls_path, header=None, dtype=object, engine="xlrd")
     header_idx = _find_header_idx(df_raw)
@@ -96,7 +123,6 @@ def parse_splid_xls(xls_path: Path, your_name: str) -> List[Dict[str, Any]]:
                 best_idx, best_sig = j, sig
         share_idx = best_idx
 
-    out: List[Dict[str, Any]] = []
     for _, row in df.iterrows():
         title = _to_str(row.get(title_col)).strip()
         amount_total = _to_num(row.get(amount_col))
@@ -118,7 +144,7 @@ def parse_splid_xls(xls_path: Path, your_name: str) -> List[Dict[str, Any]]:
         if not any([title, amount_total, your_share]):
             continue
 
-        out.append({
+        yield {
             "title": title,
             "amount_total": amount_total,
             "currency": currency,
@@ -126,5 +152,315 @@ def parse_splid_xls(xls_path: Path, your_name: str) -> List[Dict[str, Any]]:
             "date_raw": date_raw,
             "category_raw": category,
             "your_share": your_share
-        })
+        }
+
+# --- multi-member (one parse, every housemate's share column) ---
+
+_KNOWN_HEADERS = {
+    "title", "amount", "total", "value", "currency", "by", "paid by", "payer",
+    "created on", "date", "category", "exchange rate", "notes",
+}
+
+def _numeric_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Vectorized _to_num over every column: '$1,234.50' -> 1234.5, '(12.00)' -> -12.0, junk -> 0."""
+    out = {}
+    for j in range(df.shape[1]):
+        s = df.iloc[:, j].astype("string").fillna("")
+        neg = s.str.contains("(", regex=False) & s.str.contains(")", regex=False)
+        cleaned = s.str.replace(r"[$,()]", "", regex=True).str.strip()
+        v = pd.to_numeric(cleaned, errors="coerce").astype("float64").fillna(0.0)
+        out[j] = v.where(~neg, -v.abs())
+    return pd.DataFrame(out, index=df.index)
+
+def _col_signals(num: pd.DataFrame) -> list[int]:
+    # signal = how many non-zero numeric-ish values each column has (all columns at once)
+    return (num.abs() > 0.0001).sum(axis=0).astype(int).tolist()
+
+def _pick_share_idx(name_idx: int, signals: list[int], n_rows: int) -> int:
+    """Same rule as parse_splid_xls: column after the name, else the best of the next 3 if it's ~empty."""
+    share_idx = name_idx + 1
+    signal = signals[share_idx] if share_idx < len(signals) else -1
+    if signal < max(3, int(0.03 * n_rows)):
+        best_idx, best_sig = share_idx, signal
+        for j in range(share_idx + 1, min(share_idx + 4, len(signals))):
+            if signals[j] > best_sig:
+                best_idx, best_sig = j, signals[j]
+        share_idx = best_idx
+    return share_idx
+
+def _detect_members(columns: list, n_rows: int, by_values: set[str], signals: list[int]) -> list[str]:
+    members = []
+    for i, c in enumerate(columns):
+        if not isinstance(c, str) or c.startswith("Unnamed:"):
+            continue
+        low = c.strip().lower()
+        if not low or low in _KNOWN_HEADERS:
+            continue
+        share_idx = _pick_share_idx(i, signals, n_rows)
+        has_shares = share_idx < len(signals) and signals[share_idx] > 0
+        if low in by_values or has_shares:
+            members.append(c.strip())
+    return members
+
+def _with_you(members: list[str], your_name: str) -> list[str]:
+    if your_name and your_name.strip().lower() not in {m.strip().lower() for m in members}:
+        return members + [your_name]
+    return members
+
+def _collect(members: list[str], pairs: Iterator[Tuple[Dict[str, Any], Dict[str, float]]]) -> tuple[List[Dict[str, Any]], Dict[str, List[float]]]:
+    base: List[Dict[str, Any]] = []
+    shares: Dict[str, List[float]] = {name: [] for name in members}
+    for row, row_shares in pairs:
+        base.append(row)
+        for name, v in row_shares.items():
+            shares[name].append(v)
+    return base, shares
+
+def parse_splid_xls_all(xls_path: Path, members: list[str] | None = None,
+                        your_name: str = "") -> tuple[List[Dict[str, Any]], Dict[str, List[float]]]:
+    """
+    Parse the workbook once for the whole household.
+    Returns (base_rows, shares): base_rows are raw-row dicts without `your_share`, and
+    shares[member][i] is that member's share of base_rows[i]. `members=None` auto-detects
+    every member column in the header (plus `your_name`, when given).
+    """
+    return _collect(*iter_splid_xls_all(xls_path, members, your_name))
+
+def iter_splid_xls_all(xls_path: Path, members: list[str] | None = None,
+                       your_name: str = "") -> tuple[List[str], Iterator[Tuple[Dict[str, Any], Dict[str, float]]]]:
+    """
+    (members, pairs): the household parse as (base row, {member: share}) pairs, built one
+    at a time. Auto-detected members also include `your_name` when given.
+    """
+    df_raw = pd.read_excel(xls_path, header=None, dtype=object, engine="xlrd")
+    header_idx = _find_header_idx(df_raw)
+    df = pd.read_excel(xls_path, header=header_idx, dtype=object, engine="xlrd")
+
+    title_col    = _find_col(df, ["title"])
+    amount_col   = _find_col(df, ["amount", "total", "value"])
+    currency_col = _find_col(df, ["currency"])
+    by_col       = _find_col(df, ["by", "paid by", "payer"])
+    date_col     = _find_col(df, ["created on", "date"])
+    category_col = _find_col(df, ["category"])
+
+    if not title_col or not amount_col or not by_col or not date_col or not category_col:
+        raise ValueError(f"Missing expected columns. Found: {list(df.columns)}")
+
+    num = _numeric_frame(df)
+    signals = _col_signals(num)
+
+    def _strs(col) -> list[str]:
+        if col is None:
+            return [""] * len(df)
+        return df[col].map(_to_str).str.strip().tolist()
+
+    titles = _strs(title_col)
+    currencies = [c or "USD" for c in _strs(currency_col)]
+    bys = _strs(by_col)
+    dates = _strs(date_col)
+    categories = _strs(category_col)
+    amounts = num.iloc[:, df.columns.get_loc(amount_col)].tolist()
+
+    if members is None:
+        members = _with_you(_detect_members(list(df.columns), len(df), {b.lower() for b in bys if b}, signals), your_name)
+    share_cols: Dict[str, List[float]] = {}
+    for name in members:
+        share_idx = _pick_share_idx(_find_name_col(df, name), signals, len(df))
+        if share_idx < df.shape[1]:
+            share_cols[name] = num.iloc[:, share_idx].abs().tolist()
+        else:
+            share_cols[name] = [0.0] * len(df)
+
+    def pairs() -> Iterator[Tuple[Dict[str, Any], Dict[str, float]]]:
+        for i in range(len(df)):
+            row_shares = {name: col[i] for name, col in share_cols.items()}
+            # skip truly empty rows (for everyone); per-member emptiness is handled downstream
+            if not (titles[i] or amounts[i] or any(row_shares.values())):
+                continue
+            yield {
+                "title": titles[i],
+                "amount_total": amounts[i],
+                "currency": currencies[i],
+                "by": bys[i],
+                "date_raw": dates[i],
+                "category_raw": categories[i],
+            }, row_shares
+    return list(share_cols), pairs()
+
+# --- text exports (CSV / JSON), read row by row with the stdlib ---
+# The sheet layout is the same as the workbook's (preamble rows, header, one column per
+# member followed by that member's share column), so the header and share-column rules
+# above are reused on lists of cell strings. Two streaming passes: the first finds the
+# header and counts non-zero cells per candidate share column, the second yields rows.
+# CSV and JSON Lines stream; a plain .json file is parsed whole by the json module.
+# JSON rows may be arrays (cells, like the sheet) or objects (keys form the header).
+
+TEXT_SUFFIXES = (".csv", ".json", ".jsonl", ".ndjson")
+SPLID_SUFFIXES = (".xls",) + TEXT_SUFFIXES
+
+def _cell(v) -> str:
+    return "" if v is None else str(v)
+
+def _json_rows(records: Iterable[Any]) -> Iterator[List[str]]:
+    header: List[str] | None = None
+    for rec in records:
+        if isinstance(rec, dict):
+            if header is None:
+                header = list(rec)
+                yield header
+            yield [_cell(rec.get(k)) for k in header]
+        else:
+            yield [_cell(v) for v in rec]
+
+def _iter_sheet_rows(path: Path) -> Iterator[List[str]]:
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as fh:
+            try:
+                dialect = csv.Sniffer().sniff(fh.read(8192), delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            fh.seek(0)
+            yield from csv.reader(fh, dialect)
+    elif suffix in (".jsonl", ".ndjson"):
+        with open(path, encoding="utf-8") as fh:
+            yield from _json_rows(json.loads(ln) for ln in fh if ln.strip())
+    elif suffix == ".json":
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        yield from _json_rows(data.get("rows", []) if isinstance(data, dict) else data)
+    else:
+        raise ValueError(f"Not a Splid text export: {path.name}")
+
+def _text_columns(cells: List[str]) -> List[str]:
+    """Header labels the way pandas names them: blanks -> 'Unnamed: i', repeats -> 'X.1'."""
+    out: List[str] = []
+    seen: Dict[str, int] = {}
+    for i, c in enumerate(cells):
+        label = c.strip() or f"Unnamed: {i}"
+        if label in seen:
+            seen[label] += 1
+            label = f"{label}.{seen[label]}"
+        else:
+            seen[label] = 0
+        out.append(label)
     return out
+
+def _locate_columns(columns: List[str]) -> Dict[str, int | None]:
+    found = {
+        "title": _match_col(columns, ["title"]),
+        "amount": _match_col(columns, ["amount", "total", "value"]),
+        "currency": _match_col(columns, ["currency"]),
+        "by": _match_col(columns, ["by", "paid by", "payer"]),
+        "date": _match_col(columns, ["created on", "date"]),
+        "category": _match_col(columns, ["category"]),
+    }
+    if any(found[k] is None for k in ("title", "amount", "by", "date", "category")):
+        raise ValueError(f"Missing expected columns. Found: {columns}")
+    return {k: (None if c is None else columns.index(c)) for k, c in found.items()}
+
+def _scan_text(path: Path, pick: Callable[[List[str]], Iterable[int]]) -> Tuple[int, List[str], List[int], int]:
+    """Pass 1: (header index, column labels, non-zero counts per column in pick(columns), body rows)."""
+    rows = _iter_sheet_rows(path)
+    head = list(islice(rows, _HEADER_SCAN))
+    if not head:
+        raise ValueError(f"Empty Splid export: {path.name}")
+    header_idx = _pick_header_idx(head)
+    columns = _text_columns(head[header_idx])
+    cols = [j for j in pick(columns) if j < len(columns)]
+    signals = [0] * len(columns)
+    n_rows = 0
+    for row in chain(head[header_idx + 1:], rows):
+        n_rows += 1
+        for j in cols:
+            if j < len(row) and abs(_text_num(row[j])) > 0.0001:
+                signals[j] += 1
+    return header_idx, columns, signals, n_rows
+
+def _text_base_row(row: List[str], idx: Dict[str, int | None]) -> Dict[str, Any]:
+    def at(key: str) -> str:
+        j = idx[key]
+        return row[j].strip() if j is not None and j < len(row) else ""
+    return {
+        "title": at("title"),
+        "amount_total": _text_num(at("amount")),
+        "currency": at("currency") or "USD",
+        "by": at("by"),
+        "date_raw": at("date"),
+        "category_raw": at("category"),
+    }
+
+def _share_at(row: List[str], j: int) -> float:
+    return abs(_text_num(row[j])) if j < len(row) else 0.0
+
+def iter_splid_text(path: Path, your_name: str) -> Iterator[Dict[str, Any]]:
+    """Yield the same raw rows as iter_splid_xls from a CSV / JSON export, one row at a time."""
+    path = Path(path)
+
+    def candidates(columns: List[str]) -> range:
+        name_idx = _name_col_idx(columns, your_name)
+        return range(name_idx + 1, name_idx + 5)
+
+    header_idx, columns, signals, n_rows = _scan_text(path, candidates)
+    idx = _locate_columns(columns)
+    share_idx = _pick_share_idx(_name_col_idx(columns, your_name), signals, n_rows)
+
+    for row in islice(_iter_sheet_rows(path), header_idx + 1, None):
+        r = _text_base_row(row, idx)
+        r["your_share"] = _share_at(row, share_idx)
+        # skip truly empty rows
+        if not any([r["title"], r["amount_total"], r["your_share"]]):
+            continue
+        yield r
+
+def parse_splid_text_all(path: Path, members: list[str] | None = None,
+                         your_name: str = "") -> tuple[List[Dict[str, Any]], Dict[str, List[float]]]:
+    """parse_splid_xls_all for a CSV / JSON export."""
+    return _collect(*iter_splid_text_all(path, members, your_name))
+
+def iter_splid_text_all(path: Path, members: list[str] | None = None,
+                        your_name: str = "") -> tuple[List[str], Iterator[Tuple[Dict[str, Any], Dict[str, float]]]]:
+    """iter_splid_xls_all for a CSV / JSON export; the pairs are read row by row."""
+    path = Path(path)
+    header_idx, columns, signals, n_rows = _scan_text(path, lambda columns: range(len(columns)))
+    idx = _locate_columns(columns)
+
+    if members is None:
+        by_values = set()
+        for row in islice(_iter_sheet_rows(path), header_idx + 1, None):
+            j = idx["by"]
+            if j < len(row) and row[j].strip():
+                by_values.add(row[j].strip().lower())
+        members = _with_you(_detect_members(columns, n_rows, by_values, signals), your_name)
+    share_idx = {name: _pick_share_idx(_name_col_idx(columns, name), signals, n_rows) for name in members}
+
+    def pairs() -> Iterator[Tuple[Dict[str, Any], Dict[str, float]]]:
+        for row in islice(_iter_sheet_rows(path), header_idx + 1, None):
+            r = _text_base_row(row, idx)
+            row_shares = {name: _share_at(row, j) for name, j in share_idx.items()}
+            if not (r["title"] or r["amount_total"] or any(row_shares.values())):
+                continue
+            yield r, row_shares
+    return list(share_idx), pairs()
+
+# --- dispatch on file extension ---
+
+def iter_splid(path: Path, your_name: str) -> Iterator[Dict[str, Any]]:
+    if Path(path).suffix.lower() == ".xls":
+        return iter_splid_xls(path, your_name)
+    return iter_splid_text(path, your_name)
+
+def parse_splid(path: Path, your_name: str) -> List[Dict[str, Any]]:
+    return list(iter_splid(path, your_name))
+
+def parse_splid_all(path: Path, members: list[str] | None = None,
+                    your_name: str = "") -> tuple[List[Dict[str, Any]], Dict[str, List[float]]]:
+    if Path(path).suffix.lower() == ".xls":
+        return parse_splid_xls_all(path, members, your_name)
+    return parse_splid_text_all(path, members, your_name)
+
+def iter_splid_all(path: Path, members: list[str] | None = None,
+                   your_name: str = "") -> tuple[List[str], Iterator[Tuple[Dict[str, Any], Dict[str, float]]]]:
+    if Path(path).suffix.lower() == ".xls":
+        return iter_splid_xls_all(path, members, your_name)
+    return iter_splid_text_all(path, members, your_name)
@@ -2,7 +2,7 @@ from __future__ import annotations
 import re
 from datetime import datetime
 from dateutil import parser as dup
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, Iterator, List
 
 def parse_date_or_none(s: str):
   if not s: return None
@@ -20,9 +20,11 @@ def month_key(d) -> str:
 
 def build_bucket_resolvers(bucket_cfg) -> tuple:
   # Precompile regex rules for titleToBucket
-  rules = []
-  for patt, bucket in bucket_cfg.title_to_bucket.items():
-    rules.append( (re.compile(patt, re.IGNORECASE), bucket) )
+  # Loader snapshots ship these precompiled; build them here only for hand-made configs
+  rules = list(getattr(bucket_cfg, "compiled_title_rules", None) or [])
+  if not rules:
+    for patt, bucket in bucket_cfg.title_to_bucket.items():
+      rules.append( (re.compile(patt, re.IGNORECASE), bucket) )
   cat_map = bucket_cfg.category_to_bucket
   payment_titles = [t.lower() for t in bucket_cfg.payment_title_exact]
   return rules, cat_map, payment_titles
@@ -37,31 +39,157 @@ def apply_bucket(title: str, category_raw: str, rules, cat_map) -> str:
       break
   return bucket
 
-def normalize_rows(raw_rows: List[Dict[str,Any]], bucket_cfg) -> List[Dict[str,Any]]:
+def _normalize_one(r: Dict[str,Any], rules, cat_map, payment_titles) -> Dict[str,Any] | None:
+  d = parse_date_or_none(r.get("date_raw",""))
+  if d is None:
+    # skip rows without usable dates
+    return None
+  t = (r.get("title") or "").strip()
+  is_payment = t.lower() in payment_titles
+
+  bucket = apply_bucket(t, r.get("category_raw",""), rules, cat_map)
+  if bucket in {"-", "–", ""}:
+    bucket = "uncategorized"
+
+  return {
+    "date": d.isoformat(),
+    "month": month_key(d),
+    "title": t,
+    "payer": r.get("by",""),
+    "category_raw": r.get("category_raw",""),
+    "bucket": bucket,
+    "amount_total": float(r.get("amount_total",0.0)),
+    "your_share": float(r.get("your_share",0.0)),
+    "is_payment": bool(is_payment),
+    "orig_currency": (r.get("currency") or "").strip().upper(),
+  }
+
+def fx_factors(rows: List[Dict[str,Any]], rates, base_currency: str = "USD") -> List[float]:
+  """
+  Multiplier into `base_currency` for each normalized row. One rate lookup per
+  distinct (currency, date); rows with no known rate keep factor 1.0 (and warn once).
+  """
+  base = base_currency.upper()
+  factors = [1.0] * len(rows)
+  groups: Dict[tuple, List[int]] = {}
+  for i, r in enumerate(rows):
+    cur = r["orig_currency"] or base
+    if cur != base:
+      groups.setdefault((cur, r["date"]), []).append(i)
+  missing = set()
+  for (cur, day), idxs in groups.items():
+    rate = rates.rate(cur, datetime.strptime(day, "%Y-%m-%d").date()) if rates is not None else None
+    if rate is None:
+      missing.add(cur)
+      continue
+    for i in idxs:
+      factors[i] = rate
+  for cur in sorted(missing):
+    print(f"[WARN] No {cur}->{base} rate available; {cur} amounts left unconverted.")
+  return factors
+
+def convert_currency(rows: List[Dict[str,Any]], rates, base_currency: str = "USD") -> List[Dict[str,Any]]:
+  """Convert amount_total and your_share into the base currency, in place."""
+  for r, k in zip(rows, fx_factors(rows, rates, base_currency)):
+    if k != 1.0:
+      r["amount_total"] = round(r["amount_total"] * k, 2)
+      r["your_share"] = round(r["your_share"] * k, 2)
+  return rows
+
+def normalize_rows(raw_rows: List[Dict[str,Any]], bucket_cfg, rates=None, base_currency: str = "USD") -> List[Dict[str,Any]]:
   rules, cat_map, payment_titles = build_bucket_resolvers(bucket_cfg)
 
   out = []
   for r in raw_rows:
-    d = parse_date_or_none(r.get("date_raw",""))
-    if d is None:
-      # skip rows without usable dates
+    n = _normalize_one(r, rules, cat_map, payment_titles)
+    if n is not None:
+      out.append(n)
+  if rates is not None:
+    convert_currency(out, rates, base_currency)
+  return out
+
+def iter_normalized(raw_rows: Iterable[Dict[str,Any]], bucket_cfg, rates=None, base_currency: str = "USD") -> Iterator[Dict[str,Any]]:
+  """Lazy normalize_rows: one row in, at most one row out (FX applied per row via the memoized table)."""
+  rules, cat_map, payment_titles = build_bucket_resolvers(bucket_cfg)
+  base = base_currency.upper()
+  warned = set()
+  for r in raw_rows:
+    n = _normalize_one(r, rules, cat_map, payment_titles)
+    if n is None:
       continue
-    t = (r.get("title") or "").strip()
-    is_payment = t.lower() in payment_titles
-
-    bucket = apply_bucket(t, r.get("category_raw",""), rules, cat_map)
-    if bucket in {"-", "–", ""}:
-      bucket = "uncategorized"
-
-    out.append({
-      "date": d.isoformat(),
-      "month": month_key(d),
-      "title": t,
-      "payer": r.get("by",""),
-      "category_raw": r.get("category_raw",""),
-      "bucket": bucket,
-      "amount_total": float(r.get("amount_total",0.0)),
-      "your_share": float(r.get("your_share",0.0)),
-      "is_payment": bool(is_payment)
-    })
+    if rates is not None and (n["orig_currency"] or base) != base:
+      k = rates.rate(n["orig_currency"], datetime.strptime(n["date"], "%Y-%m-%d").date())
+      if k is not None:
+        n["amount_total"] = round(n["amount_total"] * k, 2)
+        n["your_share"] = round(n["your_share"] * k, 2)
+      elif n["orig_currency"] not in warned:
+        warned.add(n["orig_currency"])
+        print(f"[WARN] No {n['orig_currency']}->{base} rate available; {n['orig_currency']} amounts left unconverted.")
+    yield n
+
+def normalize_rows_by_member(base_rows: List[Dict[str,Any]], shares: Dict[str, List[float]], bucket_cfg,
+                             rates=None, base_currency: str = "USD") -> Dict[str, List[Dict[str,Any]]]:
+  """
+  Normalize shared rows once (date parsing + bucketing), then fan out a cheap
+  copy per member with that member's share as `your_share`.
+  """
+  rules, cat_map, payment_titles = build_bucket_resolvers(bucket_cfg)
+
+  normalized = [_normalize_one(r, rules, cat_map, payment_titles) for r in base_rows]
+  factors = [1.0] * len(normalized)
+  if rates is not None:
+    kept = [i for i, n in enumerate(normalized) if n is not None]
+    for i, k in zip(kept, fx_factors([normalized[i] for i in kept], rates, base_currency)):
+      factors[i] = k
+  out: Dict[str, List[Dict[str,Any]]] = {}
+  for name, col in shares.items():
+    rows = []
+    for n, share, k in zip(normalized, col, factors):
+      if n is None:
+        continue
+      # same "truly empty" rule parse_splid_xls applies per person
+      if not (n["title"] or n["amount_total"] or share):
+        continue
+      if k != 1.0:
+        rows.append({**n, "amount_total": round(n["amount_total"] * k, 2), "your_share": round(float(share) * k, 2)})
+      else:
+        rows.append({**n, "your_share": float(share)})
+    out[name] = rows
   return out
+
+def iter_shared_entries(base_rows: List[Dict[str,Any]], shares: Dict[str, List[float]], rates=None,
+                        base_currency: str = "USD") -> Iterator[tuple]:
+  """
+  (date, payer, amount_total, {member: share}) for each dated row of a household parse,
+  in the base currency — what the settle-up balances are built from (payments included).
+  """
+  dated = []
+  for i, r in enumerate(base_rows):
+    d = parse_date_or_none(r.get("date_raw", ""))
+    if d is not None:
+      dated.append((i, {"date": d.isoformat(), "orig_currency": (r.get("currency") or "").strip().upper()}))
+  factors = fx_factors([n for _, n in dated], rates, base_currency) if rates is not None else [1.0] * len(dated)
+  cols = list(shares.items())
+  for (i, n), k in zip(dated, factors):
+    yield _shared_entry(n["date"], base_rows[i], {name: col[i] for name, col in cols}, k)
+
+def _shared_entry(day: str, r: Dict[str,Any], row_shares: Dict[str, float], k: float) -> tuple:
+  return (
+    day,
+    (r.get("by") or "").strip(),
+    round(float(r.get("amount_total") or 0.0) * k, 2),
+    {name: round(float(v) * k, 2) for name, v in row_shares.items() if v},
+  )
+
+def shared_entry(r: Dict[str,Any], row_shares: Dict[str, float], rates=None, base_currency: str = "USD") -> tuple | None:
+  """
+  Lazy iter_shared_entries for one (base row, {member: share}) pair; None for undated rows.
+  Missing rates are left at 1.0 without a warning (iter_normalized warns for the same rows).
+  """
+  d = parse_date_or_none(r.get("date_raw", ""))
+  if d is None:
+    return None
+  base = base_currency.upper()
+  cur = (r.get("currency") or "").strip().upper() or base
+  k = (rates.rate(cur, d) if rates is not None and cur != base else None) or 1.0
+  return _shared_entry(d.isoformat(), r, row_shares, k)
@@ -1,55 +1,165 @@
 from __future__ import annotations
+import asyncio
+import re
+import tempfile
+from dataclasses import asdict, dataclass, field, replace
 from pathlib import Path
 from datetime import date
 from collections import defaultdict
-from pathlib import Path
-from glob import glob
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Iterable, Iterator, List
 
 from reports import (
+  CARD_BUCKET_PREFIX,
+  ensure_dir,
+  monthly_summary_row,
+  render_anomaly_section,
+  render_balances_section,
+  render_card_summary_section,
+  render_month_csv,
+  render_month_md,
+  render_weekly_schedule_section,
   summarize_month,
-  write_card_summary_section,
-  write_month_csv,
-  upsert_monthly_summary,
-  write_month_md,
+  upsert_monthly_summary_rows,
+  read_monthly_summary,
+  merge_monthly_summary,
+  render_alerts_section,
+  render_overall_trends_md,
+  render_recurring_section,
+  render_what_if_md,
   write_overall_trends_md,
-  write_weekly_schedule_section,
 )
 from config.loader import UnifiedConfig
 from budgeting.weekly_budget import (
-    forecast_monthly_spend,
     compute_weekly_spending_schedule,
+    compute_weeks_in_month,
+    month_forecaster,
+    month_nowcaster,
+    planned_monthly_spend,
 )
-from ingest.splid import parse_splid_xls
+from budgeting.scenarios import BucketTotals, Scenario, evaluate_scenarios
+from ingest.splid import SPLID_SUFFIXES, iter_splid, iter_splid_all, parse_splid, parse_splid_all
+from ingest.fx import load_rate_table
 from analytics.periods import months_present
+from analytics.monthly_aggregates import monthly_living_totals
 from core.dates import previous_complete_month
-from budgeting.income import monthly_income       # (or rename to calculate_monthly_income later)
-from ingest.cards.bofa import parse_statement_pdf
+from budgeting.income import IncomeTimeline, build_income_timeline
+from budgeting.ledger import SpendLedger, splid_ledger_entries, card_ledger_entries
+from budgeting.nowcast import IntraMonthCurves, Nowcast, living_by_bucket_day
+from budgeting.balances import BalanceHistory, entries_by_month
+from ingest.cards.registry import iter_statement, statement_paths
+from ingest.cards.ids import CardDeduper, dedup_statements
 from analytics.cards import calendarize as calendarize_card_transactions
 from analytics.card_matching import exact_match
-from normalize import normalize_rows
+from analytics.fuzzy_matching import scored_match
+from analytics.recurring import (
+  RecurringTracker,
+  card_observations,
+  splid_observations,
+)
+from analytics.anomalies import AnomalyDetector
+from analytics.alerts import AlertEngine, summary_metrics, week_metrics
+from analytics.outliers import treat_outliers
+from analytics.projection import SavingsProjection, project_savings
+from analytics.trends import shift_month
+from analytics.merchants import CardClassifier, spend_by_bucket as card_spend_by_bucket
+from normalize import iter_normalized, iter_shared_entries, normalize_rows, normalize_rows_by_member, shared_entry
+from store.sqlite_store import open_store
+from core.models import CreditCardTransaction
+from core.spill import MonthPartitions
+from core.dag import Stage, format_timings, run_stages
 
-def _find_latest_splid_xls(splid_dir: Path) -> Path:
-    candidates = sorted([p for p in splid_dir.glob("*.xls") if p.is_file()],
-                        key=lambda p: p.stat().st_mtime, reverse=True)
+def _find_latest_splid_export(splid_dir: Path) -> Path:
+    """Newest Splid export (.xls, .csv, .json, .jsonl); the parser is picked by extension."""
+    candidates = sorted([p for p in splid_dir.iterdir() if p.is_file() and p.suffix.lower() in SPLID_SUFFIXES],
+                        key=lambda p: p.stat().st_mtime, reverse=True) if splid_dir.is_dir() else []
     if not candidates:
-        raise FileNotFoundError(f"No Splid .xls files found in {splid_dir}")
+        raise FileNotFoundError(f"No Splid exports ({', '.join(SPLID_SUFFIXES)}) found in {splid_dir}")
     return candidates[0]
 
-def run_pipeline(cfg: UnifiedConfig):
-  inputs_dir  = cfg.paths.inputs_dir
-  data_dir    = cfg.paths.data_dir
-  reports_dir = cfg.paths.reports_dir
-  config_dir  = cfg.paths.config_dir
+def _statement_paths(cfg: UnifiedConfig) -> List[Path]:
+  return statement_paths(cfg.cc_sources.globs, cfg.paths.config_dir.parent)
 
-  # 1) Read latest Splid XML (contains all time)
-  splid_dir = inputs_dir / "splid"
-  xml_path = _find_latest_splid_xls(splid_dir)
+def _guarded_statement(p: Path) -> Iterator[CreditCardTransaction]:
+  try:
+    yield from iter_statement(p)
+  except Exception as e:
+    print(f"[WARN] Failed to parse {p.name}: {e}")
 
-  raw_rows = parse_splid_xls(xml_path, your_name=cfg.you.name)
-  rows = normalize_rows(raw_rows, cfg.bucket)
+def _parse_statements(paths: Iterable[Path]) -> Iterator[Iterator[CreditCardTransaction]]:
+  for p in paths:
+    yield _guarded_statement(p)
 
-  # 2) Decide which months to process
-  all_months = months_present(rows)
+def _report_duplicates(n: int) -> None:
+  if n:
+    print(f"[INFO] Dropped {n} duplicate card transaction(s) found in overlapping statements.")
+
+def _ingest_cards(cfg: UnifiedConfig) -> list:
+  cc_rows_all, dups = dedup_statements(_parse_statements(_statement_paths(cfg)))
+  _report_duplicates(dups)
+  return cc_rows_all
+
+def _member_slug(name: str) -> str:
+  return re.sub(r"[^A-Za-z0-9_-]+", "_", name.strip()) or "member"
+
+def member_cfg(cfg: UnifiedConfig, name: str) -> UnifiedConfig:
+  # Per-member report trees; income settings describe *you*, so other members get none.
+  slug = _member_slug(name)
+  is_you = name.strip().lower() == cfg.you.name.strip().lower()
+  return replace(
+    cfg,
+    you=replace(cfg.you, name=name),
+    income=cfg.income if is_you else replace(cfg.income, hourly_rate=0.0, hours_overrides={}),
+    paths=replace(
+      cfg.paths,
+      data_dir=cfg.paths.data_dir / "members" / slug,
+      reports_dir=cfg.paths.reports_dir / "members" / slug,
+    ),
+  )
+
+def run_pipeline(cfg: UnifiedConfig, members: list[str] | None = None):
+  """
+  Single-user run (default), or a household run when `members` is given:
+  ["all"] auto-detects every member column, otherwise the listed names are used.
+  Household runs parse + normalize the workbook once and write data/members/<name>/,
+  reports/members/<name>/. Card statements are yours, so only your tree gets card matching.
+  """
+  # 1) Read latest Splid export (contains all time)
+  splid_dir = cfg.paths.inputs_dir / "splid"
+  xml_path = _find_latest_splid_export(splid_dir)
+
+  # FX rates (optional, local file) — loaded once, applied in bulk during normalization
+  rates = _load_rates(cfg)
+
+  if members is None:
+    if cfg.options.settle_up:
+      # one household parse gives both your rows and the settle-up balances
+      parsed = parse_splid_all(xml_path, your_name=cfg.you.name)
+      rows = _your_household_rows(cfg, parsed, rates)
+      _process_rows(cfg, rows, _ingest_cards(cfg), _household_balances(cfg, parsed, rates))
+      return
+    raw_rows = parse_splid(xml_path, your_name=cfg.you.name)
+    rows = normalize_rows(raw_rows, cfg.bucket, rates=rates, base_currency=cfg.currency.base)
+    _process_rows(cfg, rows, _ingest_cards(cfg))
+    return
+
+  wanted = None if [m.lower() for m in members] == ["all"] else members
+  base_rows, shares = parse_splid_all(xml_path, members=wanted)
+  balances = _household_balances(cfg, (base_rows, shares), rates)
+  rows_by_member = normalize_rows_by_member(base_rows, shares, cfg.bucket, rates=rates, base_currency=cfg.currency.base)
+  cc_rows_all = _ingest_cards(cfg)
+  you = cfg.you.name.strip().lower()
+  for name, member_rows in rows_by_member.items():
+    print(f"== {name} ==")
+    _process_rows(
+      member_cfg(cfg, name),
+      member_rows,
+      cc_rows_all if name.strip().lower() == you else [],
+      balances,
+    )
+
+def _select_target_months(cfg: UnifiedConfig, all_months: list) -> list:
   target_months = list(all_months)
 
   if cfg.options.override_month:
@@ -59,6 +169,302 @@ def run_pipeline(cfg: UnifiedConfig):
       target_months = [previous_complete_month(date.today())]
     else:
       target_months = [all_months[-1]] if all_months else []
+  return target_months
+
+def _match_cards(cfg: UnifiedConfig, cc_rows_m: list, month_rows: list):
+  """(matched, unmatched, per-match confidences — empty for the exact matcher)."""
+  splid_rows = [r for r in month_rows if not r["is_payment"]]
+  if cfg.cc_match.method == "scored":
+    return scored_match(
+      cc_rows_m,
+      splid_rows,
+      cfg.you.name,
+      amount_tol_cents=cfg.cc_match.amount_tolerance_cents,
+      amount_tol_pct=cfg.cc_match.amount_tolerance_pct,
+      date_window_days=cfg.cc_match.date_window_days,
+      only_if_payer_is_you=cfg.cc_match.only_if_payer_is_you,
+      min_score=cfg.cc_match.min_score,
+    )
+  matched, unmatched = exact_match(
+    cc_rows_m,
+    splid_rows,
+    cfg.you.name,
+    amount_tol_cents=cfg.cc_match.amount_tolerance_cents,
+    date_window_days=cfg.cc_match.date_window_days,
+    only_if_payer_is_you=cfg.cc_match.only_if_payer_is_you,
+  )
+  return matched, unmatched, []
+
+def _sync_ledger(cfg: UnifiedConfig, ledger: SpendLedger, month: str, month_rows: list, unmatched_m: list):
+  ledger.sync(month, splid_ledger_entries(
+    month_rows,
+    exclude_buckets=cfg.budgeting.exclude_buckets,
+    use_your_share=cfg.budgeting.use_your_share,
+  ) + card_ledger_entries(unmatched_m, use_post_date=cfg.cc_sources.use_posting_date_for_month))
+
+def _update_recurring(cfg: UnifiedConfig, recurring: RecurringTracker, month: str, month_rows: list,
+                      unmatched_m: list | None = None) -> None:
+  # Splid rows every month we see; card charges only for months matched this run
+  recurring.update(month, "s", splid_observations(
+    month_rows,
+    exclude_buckets=cfg.budgeting.exclude_buckets,
+    use_your_share=cfg.budgeting.use_your_share,
+  ))
+  if unmatched_m is not None:
+    recurring.update(month, "c", card_observations(unmatched_m, use_post_date=cfg.cc_sources.use_posting_date_for_month))
+
+def _load_curves(cfg: UnifiedConfig) -> IntraMonthCurves | None:
+  if not cfg.budgeting.nowcast:
+    return None
+  return IntraMonthCurves.load(cfg.paths.data_dir / "nowcast.json")
+
+def _update_curves(cfg: UnifiedConfig, curves: IntraMonthCurves, month: str, month_rows: list) -> None:
+  curves.update(month, living_by_bucket_day(
+    month_rows,
+    exclude_buckets=cfg.budgeting.exclude_buckets,
+    use_your_share=cfg.budgeting.use_your_share,
+  ))
+
+def _project_savings(cfg: UnifiedConfig, summary_rows: List[dict]) -> SavingsProjection | None:
+  """Savings paths from the budgeting window's complete months, starting the month after."""
+  pc, bc = cfg.projection, cfg.budgeting
+  current_month = date.today().strftime("%Y-%m")
+  history = sorted((r for r in summary_rows if r["month"] < current_month), key=lambda r: r["month"])
+  if not pc.enabled or not history:
+    return None
+  if bc.window_months > 0:
+    history = history[-bc.window_months:]
+  living = treat_outliers([float(r["living_total"] or 0.0) for r in history], bc.outlier_method, bc.outlier_k)
+  latest = history[-1]["month"]
+  tl = build_income_timeline(shift_month(latest, 1), shift_month(latest, pc.horizon_months), cfg.income)
+  return project_savings(living, tl.months(), tl.values(), pc.paths, seed=pc.seed, workers=pc.workers)
+
+def _load_rates(cfg: UnifiedConfig):
+  """The local FX rate table, or None when currency.rates_csv isn't set."""
+  if cfg.currency.rates_csv is None:
+    return None
+  return load_rate_table(cfg.currency.rates_csv, base=cfg.currency.base)
+
+def _your_column(members: Iterable[str], your_name: str) -> str:
+  members = list(members)
+  if your_name in members:
+    return your_name
+  return next(m for m in members if m.strip().lower() == your_name.strip().lower())
+
+def _your_household_rows(cfg: UnifiedConfig, parsed: tuple, rates=None) -> list:
+  """Your normalized rows out of a parse_splid_all result (the rows parse_splid + normalize_rows give)."""
+  base_rows, shares = parsed
+  you = _your_column(shares, cfg.you.name)
+  return normalize_rows_by_member(base_rows, {you: shares[you]}, cfg.bucket, rates=rates, base_currency=cfg.currency.base)[you]
+
+def _settle_up_history(cfg: UnifiedConfig, months: Iterable) -> BalanceHistory:
+  """data/balances.json brought up to date with `months` (entries_by_month); only changed months are re-applied."""
+  path = cfg.paths.data_dir / "balances.json"
+  history = BalanceHistory.load(path)
+  history.update(months)
+  history.save(path)
+  return history
+
+def _household_balances(cfg: UnifiedConfig, parsed: tuple, rates=None) -> BalanceHistory | None:
+  """Settle-up balances over every member column of a parse_splid_all result."""
+  if not cfg.options.settle_up:
+    return None
+  if rates is None:
+    rates = _load_rates(cfg)
+  base_rows, shares = parsed
+  return _settle_up_history(cfg, entries_by_month(iter_shared_entries(base_rows, shares, rates=rates, base_currency=cfg.currency.base)))
+
+def _split_household(pairs: Iterable[tuple], you: str, parts: MonthPartitions, rates=None,
+                     base_currency: str = "USD") -> Iterator[dict]:
+  """Your raw rows out of an iter_splid_all stream; every row's settle-up entry is spilled as kind "b"."""
+  for row, row_shares in pairs:
+    entry = shared_entry(row, row_shares, rates, base_currency)
+    if entry is not None:
+      parts.add(entry[0][:7], "b", list(entry))
+    share = row_shares[you]
+    # same "truly empty" rule iter_splid applies
+    if row["title"] or row["amount_total"] or share:
+      yield {**row, "your_share": share}
+
+def _spilled_entries(parts: MonthPartitions) -> Iterator[tuple]:
+  """entries_by_month over the "b" records, one month in memory at a time."""
+  for month in parts.months("b"):
+    yield month, sorted((tuple(rec) for kind, rec in parts.read(month) if kind == "b"), key=lambda e: e[0])
+
+def _load_anomalies(cfg: UnifiedConfig) -> AnomalyDetector | None:
+  if not cfg.anomalies.enabled:
+    return None
+  a = cfg.anomalies
+  return AnomalyDetector.load(
+    cfg.paths.data_dir / "anomalies.json",
+    k=a.k, alpha=a.alpha, min_history=a.min_history, min_delta=a.min_delta,
+  )
+
+def _append_recurring_section(cfg: UnifiedConfig, recurring: RecurringTracker, month: str) -> None:
+  today = date.today()
+  with (cfg.paths.reports_dir / f"{month}.md").open("a", encoding="utf-8") as f:
+    f.write(render_recurring_section(recurring.series(asof=today), asof=today))
+
+@dataclass
+class _RunContext:
+  """What the per-month step needs from the run, independent of batch vs streaming."""
+  cfg: UnifiedConfig
+  income_tl: IncomeTimeline
+  ledger: SpendLedger
+  forecast: Callable[[str], float]            # month -> forecast from months strictly before it
+  ensure_ledger_month: Callable[[str], None]  # bring a month not processed this run into the ledger
+  card_classifier: CardClassifier | None = None  # buckets personal (unmatched) card charges
+  anomalies: AnomalyDetector | None = None        # already fed every month being rendered
+  nowcast: Callable[[str, date], Nowcast] | None = None  # (month, as of) -> mid-month estimate
+  balances: BalanceHistory | None = None          # household settle-up state, month by month
+
+@dataclass
+class MonthOutput:
+  """Everything one processed month writes, rendered in memory."""
+  month: str
+  summary_row: dict
+  md_text: str
+  csv_text: str | None = None
+  alert_metrics: dict = field(default_factory=dict)   # weekly-plan metrics for the alert rules
+
+def _run_alerts(cfg: UnifiedConfig, summary_rows: list, month_metrics: dict) -> AlertEngine | None:
+  """Alert rules over monthly_summary.csv (+ weekly-plan metrics); only changed inputs are re-evaluated."""
+  if not cfg.alerts.enabled or not cfg.alerts.rules:
+    return None
+  engine = AlertEngine.load(cfg.paths.data_dir / "alerts.json", cfg.alerts.rules)
+  aggregates = {r["month"]: summary_metrics(r) for r in summary_rows}
+  for month, metrics in month_metrics.items():
+    aggregates.setdefault(month, {}).update(metrics)
+  engine.run(aggregates)
+  return engine
+
+def _alerts_section(engine: AlertEngine, month: str) -> str:
+  return render_alerts_section(month, engine.alerts(month), len(engine.alerts()))
+
+def _append_alerts_section(cfg: UnifiedConfig, engine: AlertEngine, month: str) -> None:
+  with (cfg.paths.reports_dir / f"{month}.md").open("a", encoding="utf-8") as f:
+    f.write(_alerts_section(engine, month))
+
+def _render_month(ctx: _RunContext, month: str, month_rows: list, matched: list, unmatched: list,
+                  confidences: list | None = None) -> MonthOutput:
+  cfg = ctx.cfg
+
+  # per-month normalized CSV (optional export; the store has everything)
+  csv_text = render_month_csv(month_rows) if cfg.storage.write_month_csv else None
+
+  # living + buckets
+  summary = summarize_month(month_rows)
+  living_total = summary["living_total"]
+  per_bucket = summary["per_bucket"]
+
+  # income
+  income = ctx.income_tl[month]
+
+  has_card_purchases = bool(matched or unmatched)
+  alert_metrics = {}
+
+  if has_card_purchases:
+    # Totals you want to display (exclude returns/credits from "spend")
+    house_on_card = round(sum(c.amount for c in matched if c.amount > 0), 2)
+    personal_spend_card = round(sum(c.amount for c in unmatched if c.amount > 0), 2)
+    personal_by_bucket = card_spend_by_bucket(unmatched, ctx.card_classifier)
+  else:
+    house_on_card = personal_spend_card = 0.0
+    personal_by_bucket = {}
+
+  # summary row & markdown
+  extra = {}
+  if has_card_purchases and (house_on_card != 0.0 or personal_spend_card != 0.0):
+    extra = {
+        "house_on_card": house_on_card,
+        "personal_spend_card": personal_spend_card,
+        **{f"{CARD_BUCKET_PREFIX}{b}": v for b, v in personal_by_bucket.items()},
+    }
+
+  summary_row = monthly_summary_row(month, income, living_total, per_bucket, extra=extra)
+  md = [render_month_md(month, income, living_total, per_bucket)]
+  if has_card_purchases and (house_on_card != 0.0 or personal_spend_card != 0.0):
+    md.append(render_card_summary_section(
+      house_on_card=house_on_card,
+      personal_spend_card=personal_spend_card,
+      personal_by_bucket=personal_by_bucket,
+      matches=confidences,
+    ))
+
+  flags = ctx.anomalies.flags(month) if ctx.anomalies is not None else []
+  if flags:
+    md.append(render_anomaly_section(flags))
+
+  if ctx.balances is not None:
+    net, transfers = ctx.balances.at(month)
+    md.append(render_balances_section(month, net, transfers, you=cfg.you.name))
+
+  # Only show weekly plan for the CURRENT calendar month
+  current_month = date.today().strftime("%Y-%m")
+  if month == current_month:
+    forecasted_monthly_spend, nowcast = planned_monthly_spend(month, date.today(), ctx.forecast, ctx.nowcast)
+    weekly_sched = compute_weekly_spending_schedule(
+      month=month,
+      monthly_spend_budget=forecasted_monthly_spend,
+      start_weekday=cfg.budgeting.week_start,
+    )
+
+    # actual spend vs plan, with carryover between weeks (and from last month)
+    carry_in = 0.0
+    if cfg.options.carryover_mode == "monthly":
+      prev = previous_complete_month(date.fromisoformat(f"{month}-01"))
+      ctx.ensure_ledger_month(prev)
+      carry_in = ctx.ledger.month_carry(prev, ctx.forecast(prev))
+    balances = ctx.ledger.week_balances(month, weekly_sched, cfg.options.carryover_mode, carry_in)
+    alert_metrics = week_metrics(balances)
+    today = date.today()
+    running = ctx.ledger.daily_running_balance(month, weekly_sched, carry_in)
+    balance_today = next((bal for d, _, bal in running if d == today), None)
+
+    md.append(render_weekly_schedule_section(
+      month,
+      weekly_sched,
+      meta={
+        "forecast_basis_usd": forecasted_monthly_spend,
+        "week_start": cfg.budgeting.week_start,
+        "ewma_alpha": cfg.budgeting.ewma_alpha,
+        "seasonal_weight": cfg.budgeting.seasonal_weight,
+        "window_months": cfg.budgeting.window_months,
+        "outlier_method": cfg.budgeting.outlier_method,
+        "outlier_k": cfg.budgeting.outlier_k,
+        "exclude_buckets": cfg.budgeting.exclude_buckets or [],
+        "carryover_mode": cfg.options.carryover_mode,
+        "balance_today": balance_today,
+        "balance_date": today.isoformat(),
+        "nowcast": nowcast,
+      },
+      balances=balances,
+    ))
+
+  return MonthOutput(month=month, summary_row=summary_row, md_text="".join(md), csv_text=csv_text,
+                     alert_metrics=alert_metrics)
+
+def _write_month_files(cfg: UnifiedConfig, out: MonthOutput) -> None:
+  """Per-month files (CSV export + report); the summary row is upserted separately."""
+  if out.csv_text is not None:
+    ensure_dir(cfg.paths.data_dir)
+    (cfg.paths.data_dir / f"month={out.month}.csv").write_text(out.csv_text, encoding="utf-8", newline="")
+  ensure_dir(cfg.paths.reports_dir)
+  (cfg.paths.reports_dir / f"{out.month}.md").write_text(out.md_text, encoding="utf-8")
+
+def _process_month(ctx: _RunContext, month: str, month_rows: list, matched: list, unmatched: list,
+                   confidences: list | None = None):
+  out = _render_month(ctx, month, month_rows, matched, unmatched, confidences)
+  _write_month_files(ctx.cfg, out)
+  upsert_monthly_summary_rows(ctx.cfg.paths.data_dir, [out.summary_row])
+  return out
+
+def _process_rows(cfg: UnifiedConfig, rows: list, cc_rows_all: list, balances: BalanceHistory | None = None):
+  data_dir    = cfg.paths.data_dir
+  reports_dir = cfg.paths.reports_dir
+
+  # 2) Decide which months to process
+  target_months = _select_target_months(cfg, months_present(rows))
 
   if not target_months:
     print("No months found to process.")
@@ -68,105 +474,482 @@ def run_pipeline(cfg: UnifiedConfig):
   rows_by_month = defaultdict(list)
   for r in rows:
     rows_by_month[r["month"]].append(r)
-    
-  pdf_glob = cfg.cc_sources.pdf_statements_glob
-  pdf_paths = [Path(p) for p in glob(str(config_dir.parent / pdf_glob))]
-  cc_rows_all = []
-  for p in pdf_paths:
-      try:
-          cc_rows_all += parse_statement_pdf(p)
-      except Exception as e:
-          print(f"[WARN] Failed to parse {p.name}: {e}")
+
   # Calendarize by month (posting date by default)
   cal_by_month = calendarize_card_transactions(cc_rows_all, use_post_date = cfg.cc_sources.use_posting_date_for_month)
 
+  # Daily spend ledger (persisted; only changed transactions are applied)
+  ledger_path = data_dir / "ledger"
+  ledger = SpendLedger.load(ledger_path)
+
+  # Recurring series (persisted; only groups whose charges changed are re-detected)
+  recurring_path = data_dir / "recurring.json"
+  recurring = RecurringTracker.load(recurring_path)
+  for m, m_rows in rows_by_month.items():
+    _update_recurring(cfg, recurring, m, m_rows)
+  totals = monthly_living_totals(
+    rows,
+    use_your_share=cfg.budgeting.use_your_share,
+    exclude_buckets=cfg.budgeting.exclude_buckets,
+  )
+
+  # Unusual single expenses: rows are scored oldest month first; already-seen rows are skipped
+  anomalies = _load_anomalies(cfg)
+  if anomalies is not None:
+    for m in sorted(rows_by_month):
+      anomalies.observe_month(m, rows_by_month[m])
+
+  # Day-of-month spending curves for the nowcast (only months whose rows changed move them)
+  curves = _load_curves(cfg)
+  if curves is not None:
+    for m in sorted(rows_by_month):
+      _update_curves(cfg, curves, m, rows_by_month[m])
+
+  def _ensure_ledger_month(m):
+    if m not in target_months:
+      _sync_ledger(cfg, ledger, m, rows_by_month.get(m, []),
+                   _match_cards(cfg, cal_by_month.get(m, []), rows_by_month.get(m, []))[1])
+
+  ctx = _RunContext(
+    cfg=cfg,
+    # income for every target month in one pass (O(1) lookup per month below)
+    income_tl=build_income_timeline(min(target_months), max(target_months), cfg.income),
+    ledger=ledger,
+    forecast=month_forecaster(totals, cfg.budgeting, recurring),
+    ensure_ledger_month=_ensure_ledger_month,
+    card_classifier=CardClassifier.from_config(cfg.bucket),
+    anomalies=anomalies,
+    nowcast=month_nowcaster(totals, cfg.budgeting, curves),
+    balances=balances,
+  )
+
+  match_log = []  # (card txn, month, "matched"|"unmatched") for the store
+  alert_metrics = {}  # month -> weekly-plan metrics for the alert rules
   for month in target_months:
     month_rows = rows_by_month.get(month, [])
     if not month_rows:
       continue
 
-    # write per-month normalized CSV
-    write_month_csv(data_dir, month, month_rows)
+    # Card charges for this month (if any)
+    matched, unmatched, confidences = _match_cards(cfg, cal_by_month.get(month, []), month_rows)
+    _sync_ledger(cfg, ledger, month, month_rows, unmatched)
+    match_log += [(c, month, "matched") for c in matched]
+    match_log += [(c, month, "unmatched") for c in unmatched]
+    _update_recurring(cfg, recurring, month, month_rows, unmatched)
 
-    # living + buckets
-    summary = summarize_month(month_rows)
-    living_total = summary["living_total"]
-    per_bucket = summary["per_bucket"]
+    alert_metrics[month] = _process_month(ctx, month, month_rows, matched, unmatched, confidences).alert_metrics
 
-    # income
-    income = monthly_income(month, cfg.income)
-    
-    # Card charges for this month (if any)
-    cc_rows_m = cal_by_month.get(month, [])
+  # recurring charges + what's coming up, on the newest report
+  written = [m for m in target_months if rows_by_month.get(m)]
+  if written:
+    _append_recurring_section(cfg, recurring, max(written))
+  alerts = _run_alerts(cfg, read_monthly_summary(data_dir / "monthly_summary.csv"), alert_metrics)
+  if alerts is not None:
+    if written:
+      _append_alerts_section(cfg, alerts, max(written))
+    alerts.save(data_dir / "alerts.json")
+  ledger.save(ledger_path)
+  recurring.save(recurring_path)
+  if anomalies is not None:
+    anomalies.save(data_dir / "anomalies.json")
+  if curves is not None:
+    curves.save(data_dir / "nowcast.json")
 
-    matched, unmatched = exact_match(
-      cc_rows_m,
-      [r for r in month_rows if not r["is_payment"]],
-      cfg.you.name,
-      amount_tol_cents=cfg.cc_match.amount_tolerance_cents,
-      date_window_days=cfg.cc_match.date_window_days,
-      only_if_payer_is_you=cfg.cc_match.only_if_payer_is_you,
-    )
-    
-    has_card_purchases = bool(matched or unmatched)
+  store = open_store(cfg.storage.sqlite_path)
+  if store is not None:
+    with store:
+      store.replace_member(
+        cfg.you.name, rows, cc_rows_all, match_log,
+        use_post_date=cfg.cc_sources.use_posting_date_for_month,
+      )
+
+  # 4) overall trends page
+  write_overall_trends_md(reports_dir, data_dir / "monthly_summary.csv", partial(_project_savings, cfg))
+
+  print(f"Processed months: {', '.join(target_months)}")
+
+# --- streaming mode ---
+
+def _iter_cards(cfg: UnifiedConfig) -> Iterator[CreditCardTransaction]:
+  dedup = CardDeduper()
+  yield from dedup.stream(_parse_statements(_statement_paths(cfg)))
+  _report_duplicates(dedup.duplicates)
 
-    if has_card_purchases:
-      # Totals you want to display (exclude returns/credits from "spend")
-      house_on_card = round(sum(c.amount for c in matched if c.amount > 0), 2)
-      personal_spend_card = round(sum(c.amount for c in unmatched if c.amount > 0), 2)
+def run_pipeline_streaming(
+  cfg: UnifiedConfig,
+  raw_rows: Iterable[dict] | None = None,
+  cc_rows: Iterable[CreditCardTransaction] | None = None,
+):
+  """
+  Same outputs as run_pipeline, as a chain of generators with bounded memory:
+    ingest (yield raw rows) -> normalize (lazy) -> spill to one file per month ->
+    process months oldest-first, releasing each before loading the next.
+  Only per-month living totals (for the forecaster) are kept across months.
+  `raw_rows` / `cc_rows` default to the latest Splid export and the card statements. With
+  options.settle_up the export is read once for every member and the settle-up entries are
+  spilled by month alongside your rows; injected `raw_rows` carry only your share, so
+  balances are skipped then.
+  """
+  data_dir    = cfg.paths.data_dir
+  reports_dir = cfg.paths.reports_dir
+  use_post = cfg.cc_sources.use_posting_date_for_month
+
+  household = None   # (members, pairs) when balances come from the same stream
+  if raw_rows is None:
+    export = _find_latest_splid_export(cfg.paths.inputs_dir / "splid")
+    if cfg.options.settle_up:
+      household = iter_splid_all(export, your_name=cfg.you.name)
     else:
-      house_on_card = personal_spend_card = 0.0
-
-    # summary row & markdown
-    extra = {}
-    if has_card_purchases and (house_on_card != 0.0 or personal_spend_card != 0.0):
-      extra = {
-          "house_on_card": house_on_card,
-          "personal_spend_card": personal_spend_card,
-      }
-
-    upsert_monthly_summary(
-        data_dir, month, income, living_total, per_bucket,
-        extra=extra
-    )
-    write_month_md(reports_dir, month, income, living_total, per_bucket)
-    if has_card_purchases and (house_on_card != 0.0 or personal_spend_card != 0.0):
-      write_card_summary_section(
-        reports_dir, month,
-        house_on_card=house_on_card,
-        personal_spend_card=personal_spend_card,
-      )
-    
-    # Only show weekly plan for the CURRENT calendar month
+      raw_rows = iter_splid(export, your_name=cfg.you.name)
+  if cc_rows is None:
+    cc_rows = _iter_cards(cfg)
+  rates = _load_rates(cfg)
+
+  with tempfile.TemporaryDirectory(prefix="splid-stream-") as tmp:
+    parts = MonthPartitions(Path(tmp))
+    if household is not None:
+      members, pairs = household
+      raw_rows = _split_household(pairs, _your_column(members, cfg.you.name), parts, rates, cfg.currency.base)
+    for r in iter_normalized(raw_rows, cfg.bucket, rates=rates, base_currency=cfg.currency.base):
+      parts.add(r["month"], "s", r)
+    for c in cc_rows:
+      parts.add((c.post_date if use_post else c.trans_date)[:7], "c", asdict(c))
+    parts.flush()
+
+    months_with_rows = set(parts.months("s"))
+    target_months = _select_target_months(cfg, parts.months("s"))
+    if not target_months:
+      print("No months found to process.")
+      return
+
     current_month = date.today().strftime("%Y-%m")
-    if month == current_month:
-      forecasted_monthly_spend = forecast_monthly_spend(
-        rows,   # normalized rows for all months
-        month,  # "YYYY-MM"
-        cfg.budgeting,
-      )
-      weekly_sched = compute_weekly_spending_schedule(
-        month=month,
-        monthly_spend_budget=forecasted_monthly_spend,
-        start_weekday=cfg.budgeting.week_start,
-      )
-      write_weekly_schedule_section(
-        reports_dir,
-        month,
-        weekly_sched,
-        meta={
-          "forecast_basis_usd": forecasted_monthly_spend,
-          "week_start": cfg.budgeting.week_start,
-          "ewma_alpha": cfg.budgeting.ewma_alpha,
-          "seasonal_weight": cfg.budgeting.seasonal_weight,
-          "window_months": cfg.budgeting.window_months,
-          "outlier_method": cfg.budgeting.outlier_method,
-          "outlier_k": cfg.budgeting.outlier_k,
-          "exclude_buckets": cfg.budgeting.exclude_buckets or [],
-        },
-      )
+    prev_of_current = previous_complete_month(date.fromisoformat(f"{current_month}-01"))
+    ledger_months = {current_month, prev_of_current}
 
-  # 4) overall trends page
-  write_overall_trends_md(reports_dir, data_dir / "monthly_summary.csv")
+    # only the months the weekly plan reads are loaded/updated, so this stays flat too
+    ledger_path = data_dir / "ledger"
+    ledger = SpendLedger.load(ledger_path, months=ledger_months)
+    recurring_path = data_dir / "recurring.json"
+    recurring = RecurringTracker.load(recurring_path)
+    anomalies = _load_anomalies(cfg)
+    curves = _load_curves(cfg)
+    balances = _settle_up_history(cfg, _spilled_entries(parts)) if household is not None else None
+    totals = {}  # running { month: living total } — the only cross-month state the forecaster needs
+    alert_metrics = {}  # month -> weekly-plan metrics for the alert rules
+    ex = set(cfg.budgeting.exclude_buckets or [])
+    target_set = set(target_months)
+
+    ctx = _RunContext(
+      cfg=cfg,
+      income_tl=build_income_timeline(min(target_months), max(target_months), cfg.income),
+      ledger=ledger,
+      forecast=month_forecaster(totals, cfg.budgeting, recurring),
+      card_classifier=CardClassifier.from_config(cfg.bucket),
+      anomalies=anomalies,
+      nowcast=month_nowcaster(totals, cfg.budgeting, curves),
+      balances=balances,
+      ensure_ledger_month=lambda m: None,  # already synced while streaming past it
+    )
+
+    store = open_store(cfg.storage.sqlite_path)
+    try:
+      if store is not None:
+        store.conn.execute("BEGIN")
+        store.clear_member(cfg.you.name)
+
+      for month in sorted(set(parts.months("s")) | set(parts.months("c")) | target_set):
+        month_rows, cc_rows_m = [], []
+        for kind, rec in parts.read(month):
+          if kind == "s":
+            month_rows.append(rec)
+          elif kind == "c":
+            cc_rows_m.append(CreditCardTransaction(**rec))
+
+        total = 0.0
+        for r in month_rows:
+          if not r["is_payment"] and r["bucket"] not in ex:
+            total += float(r["your_share"] if cfg.budgeting.use_your_share else r["amount_total"])
+        if month_rows:
+          totals[month] = total
+
+        matched = unmatched = confidences = []
+        if month_rows and (month in target_set or month in ledger_months):
+          matched, unmatched, confidences = _match_cards(cfg, cc_rows_m, month_rows)
+        if month in ledger_months:
+          _sync_ledger(cfg, ledger, month, month_rows, unmatched)
+        if month_rows:
+          _update_recurring(cfg, recurring, month, month_rows, unmatched if month in target_set else None)
+          if anomalies is not None:
+            anomalies.observe_month(month, month_rows)
+          if curves is not None:
+            _update_curves(cfg, curves, month, month_rows)
+
+        if store is not None:
+          store.insert_rows(cfg.you.name, month_rows)
+          keys = store.insert_card_txns(cfg.you.name, cc_rows_m, use_post)
+          if month in target_set:
+            store.insert_matches(
+              cfg.you.name,
+              [(c, month, "matched") for c in matched] + [(c, month, "unmatched") for c in unmatched],
+              keys,
+            )
+
+        if month in target_set and month_rows:
+          alert_metrics[month] = _process_month(ctx, month, month_rows, matched, unmatched, confidences).alert_metrics
+        del month_rows, cc_rows_m, matched, unmatched, confidences
+
+      if store is not None:
+        store.conn.commit()
+    except BaseException:
+      if store is not None:
+        store.conn.rollback()
+      raise
+    finally:
+      if store is not None:
+        store.close()
 
+  written = [m for m in target_months if m in months_with_rows]
+  if written:
+    _append_recurring_section(cfg, recurring, max(written))
+  alerts = _run_alerts(cfg, read_monthly_summary(data_dir / "monthly_summary.csv"), alert_metrics)
+  if alerts is not None:
+    if written:
+      _append_alerts_section(cfg, alerts, max(written))
+    alerts.save(data_dir / "alerts.json")
+  ledger.save(ledger_path)
+  recurring.save(recurring_path)
+  if anomalies is not None:
+    anomalies.save(data_dir / "anomalies.json")
+  if curves is not None:
+    curves.save(data_dir / "nowcast.json")
+  write_overall_trends_md(reports_dir, data_dir / "monthly_summary.csv", partial(_project_savings, cfg))
   print(f"Processed months: {', '.join(target_months)}")
+
+# --- staged (DAG) mode ---
+
+def run_pipeline_dag(cfg: UnifiedConfig, workers: int = 4, use_processes: bool = False, show_timings: bool = True):
+  """
+  Same outputs as run_pipeline (single user), as a DAG of stages run by core.dag:
+
+    splid_ingest -> normalize -> aggregate --+--------------+-> forecast --+
+    card_ingest  -> calendarize ------------ match -> recurring -----------+-> render -> alerts -> write
+
+  Splid and card parsing overlap, as do normalize/calendarize; with options.settle_up the
+  Splid parse covers every member column, and a balances stage builds the settle-up state
+  from it next to normalize. `use_processes` moves the parse stages to a process pool
+  (worth it when they are CPU-bound).
+  The write stage runs every file write, the ledger save and the store write
+  concurrently on an asyncio loop. Prints per-stage timings and the critical path.
+  """
+  data_dir    = cfg.paths.data_dir
+  reports_dir = cfg.paths.reports_dir
+  xml_path = _find_latest_splid_export(cfg.paths.inputs_dir / "splid")
+  current_month = date.today().strftime("%Y-%m")
+  prev_of_current = previous_complete_month(date.fromisoformat(f"{current_month}-01"))
+
+  def normalize(parsed):
+    rates = _load_rates(cfg)
+    if cfg.options.settle_up:
+      return _your_household_rows(cfg, parsed, rates)
+    return normalize_rows(parsed, cfg.bucket, rates=rates, base_currency=cfg.currency.base)
+
+  def calendarize(cc_rows_all):
+    return calendarize_card_transactions(cc_rows_all, use_post_date=cfg.cc_sources.use_posting_date_for_month)
+
+  def aggregate(rows):
+    rows_by_month = defaultdict(list)
+    for r in rows:
+      rows_by_month[r["month"]].append(r)
+    target_months = _select_target_months(cfg, months_present(rows))
+    totals = monthly_living_totals(
+      rows,
+      use_your_share=cfg.budgeting.use_your_share,
+      exclude_buckets=cfg.budgeting.exclude_buckets,
+    )
+    income_tl = build_income_timeline(min(target_months), max(target_months), cfg.income) if target_months else None
+    return rows_by_month, target_months, totals, income_tl
+
+  def match(agg, cal_by_month):
+    rows_by_month, target_months, _, _ = agg
+    ledger = SpendLedger.load(data_dir / "ledger")
+    by_month, match_log = {}, []
+    for month in target_months:
+      month_rows = rows_by_month.get(month, [])
+      if not month_rows:
+        continue
+      matched, unmatched, confidences = _match_cards(cfg, cal_by_month.get(month, []), month_rows)
+      _sync_ledger(cfg, ledger, month, month_rows, unmatched)
+      by_month[month] = (matched, unmatched, confidences)
+      match_log += [(c, month, "matched") for c in matched]
+      match_log += [(c, month, "unmatched") for c in unmatched]
+    # the current month's weekly plan carries in from last month's ledger
+    if (cfg.options.carryover_mode == "monthly" and current_month in by_month
+        and prev_of_current not in target_months):
+      prev_rows = rows_by_month.get(prev_of_current, [])
+      _sync_ledger(cfg, ledger, prev_of_current, prev_rows,
+                   _match_cards(cfg, cal_by_month.get(prev_of_current, []), prev_rows)[1])
+    return ledger, by_month, match_log
+
+  def recurring(agg, matches):
+    rows_by_month = agg[0]
+    _, by_month, _ = matches
+    tracker = RecurringTracker.load(data_dir / "recurring.json")
+    for m, m_rows in rows_by_month.items():
+      _update_recurring(cfg, tracker, m, m_rows)
+    for m, (_, unmatched, _) in by_month.items():
+      _update_recurring(cfg, tracker, m, rows_by_month[m], unmatched)
+    tracker.refresh()
+    return tracker
+
+  def anomalies(agg):
+    detector = _load_anomalies(cfg)
+    if detector is not None:
+      for m in sorted(agg[0]):
+        detector.observe_month(m, agg[0][m])
+    return detector
+
+  def curves(agg):
+    c = _load_curves(cfg)
+    if c is not None:
+      for m in sorted(agg[0]):
+        _update_curves(cfg, c, m, agg[0][m])
+    return c
+
+  def forecast(agg, tracker):
+    _, _, totals, _ = agg
+    fc = month_forecaster(totals, cfg.budgeting, tracker)
+    return {m: fc(m) for m in (current_month, prev_of_current)}
+
+  def render(agg, matches, forecasts, tracker, detector, day_curves, balances):
+    rows_by_month, _, totals, income_tl = agg
+    ledger, by_month, _ = matches
+    fc = month_forecaster(totals, cfg.budgeting, tracker)
+    ctx = _RunContext(
+      cfg=cfg,
+      income_tl=income_tl,
+      ledger=ledger,
+      forecast=lambda m: forecasts[m] if m in forecasts else fc(m),
+      card_classifier=CardClassifier.from_config(cfg.bucket),
+      anomalies=detector,
+      nowcast=month_nowcaster(totals, cfg.budgeting, day_curves),
+      balances=balances,
+      ensure_ledger_month=lambda m: None,  # synced by the match stage
+    )
+    outputs = [
+      _render_month(ctx, month, rows_by_month[month], matched, unmatched, confidences)
+      for month, (matched, unmatched, confidences) in by_month.items()
+    ]
+    if outputs:
+      newest = max(outputs, key=lambda o: o.month)
+      today = date.today()
+      newest.md_text += render_recurring_section(tracker.series(asof=today), asof=today)
+    return outputs
+
+  def alerts(outputs):
+    # rules read the summary as it will be after the write stage's upsert
+    merged = merge_monthly_summary(read_monthly_summary(data_dir / "monthly_summary.csv"),
+                                   [o.summary_row for o in outputs])
+    engine = _run_alerts(cfg, merged, {o.month: o.alert_metrics for o in outputs})
+    if engine is not None and outputs:
+      newest = max(outputs, key=lambda o: o.month)
+      newest.md_text += _alerts_section(engine, newest.month)
+    return engine
+
+  def write(agg, outputs, matches, tracker, detector, day_curves, engine, rows, cc_rows_all):
+    ledger, _, match_log = matches
+    if not agg[1]:
+      return 0
+    asyncio.run(_write_outputs(cfg, outputs, ledger, tracker, detector, rows, cc_rows_all, match_log, day_curves, engine))
+    return len(outputs)
+
+  stages = [
+    Stage("splid_ingest", partial(parse_splid_all if cfg.options.settle_up else parse_splid, xml_path,
+                                  your_name=cfg.you.name), process=True),
+    Stage("card_ingest", partial(_ingest_cards, cfg), process=True),
+    Stage("balances", partial(_household_balances, cfg), ("splid_ingest",)),
+    Stage("normalize", normalize, ("splid_ingest",)),
+    Stage("calendarize", calendarize, ("card_ingest",)),
+    Stage("aggregate", aggregate, ("normalize",)),
+    Stage("match", match, ("aggregate", "calendarize")),
+    Stage("recurring", recurring, ("aggregate", "match")),
+    Stage("forecast", forecast, ("aggregate", "recurring")),
+    Stage("anomalies", anomalies, ("aggregate",)),
+    Stage("curves", curves, ("aggregate",)),
+    Stage("render", render, ("aggregate", "match", "forecast", "recurring", "anomalies", "curves", "balances")),
+    Stage("alerts", alerts, ("render",)),
+    Stage("write", write, ("aggregate", "render", "match", "recurring", "anomalies", "curves", "alerts", "normalize", "card_ingest")),
+  ]
+
+  if use_processes:
+    with ProcessPoolExecutor(max_workers=2) as procs:
+      run = run_stages(stages, max_workers=workers, process_pool=procs)
+  else:
+    run = run_stages(stages, max_workers=workers)
+
+  if show_timings:
+    print(format_timings(stages, run))
+  target_months = run.results["aggregate"][1]
+  if not target_months:
+    print("No months found to process.")
+    return run
+  print(f"Processed months: {', '.join(target_months)}")
+  return run
+
+async def _write_outputs(cfg: UnifiedConfig, outputs: list, ledger: SpendLedger, recurring: RecurringTracker,
+                         anomalies: AnomalyDetector | None, rows: list, cc_rows_all: list, match_log: list,
+                         curves: IntraMonthCurves | None = None, alerts: AlertEngine | None = None):
+  data_dir    = cfg.paths.data_dir
+  reports_dir = cfg.paths.reports_dir
+
+  def summary_and_trends():
+    # one read-merge-write of monthly_summary.csv for every month, then the trends page from it
+    if outputs:
+      merged = upsert_monthly_summary_rows(data_dir, [o.summary_row for o in outputs])
+    else:
+      merged = read_monthly_summary(data_dir / "monthly_summary.csv")
+    text = render_overall_trends_md(merged, _project_savings(cfg, merged))
+    if text is not None:
+      ensure_dir(reports_dir)
+      (reports_dir / "overall_trends.md").write_text(text, encoding="utf-8")
+
+  def store_write():
+    store = open_store(cfg.storage.sqlite_path)
+    if store is not None:
+      with store:
+        store.replace_member(
+          cfg.you.name, rows, cc_rows_all, match_log,
+          use_post_date=cfg.cc_sources.use_posting_date_for_month,
+        )
+
+  ensure_dir(data_dir)
+  ensure_dir(reports_dir)
+  await asyncio.gather(
+    *(asyncio.to_thread(_write_month_files, cfg, o) for o in outputs),
+    asyncio.to_thread(summary_and_trends),
+    asyncio.to_thread(ledger.save, data_dir / "ledger"),
+    asyncio.to_thread(recurring.save, data_dir / "recurring.json"),
+    *([asyncio.to_thread(anomalies.save, data_dir / "anomalies.json")] if anomalies is not None else []),
+    *([asyncio.to_thread(curves.save, data_dir / "nowcast.json")] if curves is not None else []),
+    *([asyncio.to_thread(alerts.save, data_dir / "alerts.json")] if alerts is not None else []),
+    asyncio.to_thread(store_write),
+  )
+
+# --- what-if scenarios ---
+
+def run_what_if(cfg: UnifiedConfig, month: str | None = None) -> str:
+  """
+  Evaluate what_if.scenarios (next to an unchanged baseline) for `month` over the latest
+  Splid export, without touching the rest of the outputs; writes reports/what_if.md.
+  """
+  month = month or cfg.what_if.target_month or date.today().strftime("%Y-%m")
+  rates = _load_rates(cfg)
+  raw_rows = parse_splid(_find_latest_splid_export(cfg.paths.inputs_dir / "splid"), your_name=cfg.you.name)
+  rows = normalize_rows(raw_rows, cfg.bucket, rates=rates, base_currency=cfg.currency.base)
+
+  scenarios = [Scenario(name="baseline")] + [Scenario(**s) for s in cfg.what_if.scenarios]
+  results = evaluate_scenarios(BucketTotals.from_rows(rows, cfg.budgeting.use_your_share), scenarios,
+                               month, cfg.income, cfg.budgeting)
+  text = render_what_if_md(month, results, compute_weeks_in_month(month, cfg.budgeting.week_start))
+  ensure_dir(cfg.paths.reports_dir)
+  (cfg.paths.reports_dir / "what_if.md").write_text(text, encoding="utf-8")
+  return text
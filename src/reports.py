@@ -1,8 +1,13 @@
 from __future__ import annotations
 import csv
+import io
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, List, Iterable
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Iterable
+
+from analytics.projection import PERCENTILES, SavingsProjection
+from analytics.trends import PrefixTrends
 
 def ensure_dir(p: Path):
   p.mkdir(parents=True, exist_ok=True)
@@ -19,32 +24,33 @@ def summarize_month(rows: List[dict]) -> dict:
   return {"living_total": round(living_total,2),
           "per_bucket": {k: round(v,2) for k,v in per_bucket.items()}}
 
+MONTH_CSV_FIELDS = ["date","month","title","payer","category_raw","bucket","amount_total","your_share","is_payment","orig_currency"]
+# monthly_summary.csv columns for personal card spend per bucket, e.g. "card_groceries"
+CARD_BUCKET_PREFIX = "card_"
+SUMMARY_BASE_FIELDS = ["month","income","living_total","excess","savings_allowance","spending_allowance"]
+
+def render_month_csv(rows: List[dict]) -> str:
+  buf = io.StringIO(newline="")
+  w = csv.DictWriter(buf, fieldnames=MONTH_CSV_FIELDS)
+  w.writeheader()
+  for r in rows:
+    w.writerow({k: r.get(k, "") for k in MONTH_CSV_FIELDS})
+  return buf.getvalue()
+
 def write_month_csv(out_dir: Path, month: str, rows: List[dict]):
   ensure_dir(out_dir)
   path = out_dir / f"month={month}.csv"
-  fieldnames = ["date","month","title","payer","category_raw","bucket","amount_total","your_share","is_payment"]
-  with path.open("w", newline="", encoding="utf-8") as f:
-    w = csv.DictWriter(f, fieldnames=fieldnames)
-    w.writeheader()
-    for r in rows:
-      w.writerow({k: r[k] for k in fieldnames})
-
-def upsert_monthly_summary(data_dir: Path, month: str, income: float, living_total: float, per_bucket: Dict[str,float], extra: Dict[str, float] | None = None):
-  ensure_dir(data_dir)
-  path = data_dir / "monthly_summary.csv"
-  # load existing
-  rows: List[dict] = []
-  if path.exists():
-    with path.open("r", newline="", encoding="utf-8") as f:
-      rows = list(csv.DictReader(f))
+  path.write_text(render_month_csv(rows), encoding="utf-8", newline="")
 
+def monthly_summary_row(month: str, income: float, living_total: float, per_bucket: Dict[str,float], extra: Dict[str, float] | None = None) -> dict:
+  """One monthly_summary.csv row (string-formatted), including the 50/50 excess split."""
   # compute split
   excess = max(0.0, income - living_total)
   savings = round(0.5 * excess, 2)
   spending = round(excess - savings, 2)
 
   # flatten buckets (keep a stable subset + dynamic)
-  base = {
+  out = {
     "month": month,
     "income": f"{income:.2f}",
     "living_total": f"{living_total:.2f}",
@@ -53,7 +59,6 @@ def upsert_monthly_summary(data_dir: Path, month: str, income: float, living_tot
     "spending_allowance": f"{spending:.2f}",
   }
   extra = extra or {}
-  out = base.copy()
   # include common buckets if present
   for k, v in per_bucket.items():
     if v != 0.0:
@@ -62,31 +67,57 @@ def upsert_monthly_summary(data_dir: Path, month: str, income: float, living_tot
   for k, v in extra.items():
     if v != 0.0:
       out[k] = f"{float(v):.2f}"
-
-  # upsert by month
-  rows = [r for r in rows if r.get("month") != month]
-  rows.append(out)
+  return out
+
+def read_monthly_summary(path: Path) -> List[dict]:
+  if not path.exists():
+    return []
+  with path.open("r", newline="", encoding="utf-8") as f:
+    return list(csv.DictReader(f))
+
+def merge_monthly_summary(existing: List[dict], new_rows: List[dict]) -> List[dict]:
+  """Upsert `new_rows` by month into `existing`; sorted by month, every row has every field."""
+  months = {r["month"] for r in new_rows}
+  rows = [r for r in existing if r.get("month") not in months] + [dict(r) for r in new_rows]
   # sort by month
   rows.sort(key=lambda r: r["month"])
 
   # unify fieldnames
-  all_fields = list(base.keys())
-  dynamic = sorted({k for r in rows for k in r.keys()} - set(all_fields))
-  fieldnames = all_fields + dynamic
-
-  with path.open("w", newline="", encoding="utf-8") as f:
-    w = csv.DictWriter(f, fieldnames=fieldnames)
-    w.writeheader()
-    for r in rows:
-      # fill missing
-      for k in fieldnames:
-        r.setdefault(k, "")
-      w.writerow(r)
+  fieldnames = summary_fieldnames(rows)
+  for r in rows:
+    # fill missing
+    for k in fieldnames:
+      r.setdefault(k, "")
+  return rows
+
+def summary_fieldnames(rows: List[dict]) -> List[str]:
+  dynamic = sorted({k for r in rows for k in r.keys()} - set(SUMMARY_BASE_FIELDS))
+  return SUMMARY_BASE_FIELDS + dynamic
+
+def render_monthly_summary_csv(rows: List[dict]) -> str:
+  buf = io.StringIO(newline="")
+  w = csv.DictWriter(buf, fieldnames=summary_fieldnames(rows))
+  w.writeheader()
+  for r in rows:
+    w.writerow(r)
+  return buf.getvalue()
+
+def upsert_monthly_summary_rows(data_dir: Path, new_rows: List[dict]) -> List[dict]:
+  ensure_dir(data_dir)
+  path = data_dir / "monthly_summary.csv"
+  rows = merge_monthly_summary(read_monthly_summary(path), new_rows)
+  path.write_text(render_monthly_summary_csv(rows), encoding="utf-8", newline="")
+  return rows
+
+def upsert_monthly_summary(data_dir: Path, month: str, income: float, living_total: float, per_bucket: Dict[str,float], extra: Dict[str, float] | None = None):
+  upsert_monthly_summary_rows(data_dir, [monthly_summary_row(month, income, living_total, per_bucket, extra)])
 
 def write_month_md(reports_dir: Path, month: str, income: float, living_total: float, per_bucket: Dict[str,float]):
   ensure_dir(reports_dir)
   path = reports_dir / f"{month}.md"
+  path.write_text(render_month_md(month, income, living_total, per_bucket), encoding="utf-8")
 
+def render_month_md(month: str, income: float, living_total: float, per_bucket: Dict[str,float]) -> str:
   lines = []
   lines.append(f"# {month} — Your Monthly Budget Summary\n")
   lines.append("> All amounts below are **your share only**. Splid settle-up “Payment” rows are excluded.\n")
@@ -112,31 +143,36 @@ def write_month_md(reports_dir: Path, month: str, income: float, living_total: f
       lines.append(f"- **{k}**: ${per_bucket[k]:,.2f}")
     lines.append("")
 
-  path.write_text("\n".join(lines), encoding="utf-8")
+  return "\n".join(lines)
 
-def write_overall_trends_md(reports_dir: Path, monthly_summary_path: Path):
+def write_overall_trends_md(reports_dir: Path, monthly_summary_path: Path,
+                            project: Callable[[List[dict]], SavingsProjection | None] | None = None):
   ensure_dir(reports_dir)
   if not monthly_summary_path.exists():
     return
-  import csv
-  rows = list(csv.DictReader(monthly_summary_path.open("r", encoding="utf-8")))
-  if not rows:
-    return
+  rows = read_monthly_summary(monthly_summary_path)
+  text = render_overall_trends_md(rows, project(rows) if project is not None else None)
+  if text is not None:
+    (reports_dir / "overall_trends.md").write_text(text, encoding="utf-8")
+
+TREND_WINDOWS = (3, 6, 12)
+
+def _money_or_dash(v: float | None) -> str:
+  return "—" if v is None else f"${v:,.2f}"
 
-  def f(r, k):
-    try:
-      return float(r.get(k, "") or 0.0)
-    except Exception:
-      return 0.0
+def _signed_money(v: float) -> str:
+  return f"{'+' if v >= 0 else '-'}${abs(v):,.2f}"
 
-  n_all = len(rows)
-  rows_with_income = [r for r in rows if f(r, "income") > 0.0]
-  n_income = len(rows_with_income)
+def render_overall_trends_md(rows: List[dict], projection: SavingsProjection | None = None) -> str | None:
+  if not rows:
+    return None
+
+  alias_bucket = {"-": "uncategorized", "–": "uncategorized"}
+  t = PrefixTrends(rows, aliases=alias_bucket)
+  latest = t.latest
 
-  # Averages
-  avg_living_all = (sum(f(r, "living_total") for r in rows) / n_all) if n_all else 0.0
-  avg_income_inc = (sum(f(r, "income") for r in rows_with_income) / n_income) if n_income else None
-  avg_excess_inc = (sum(f(r, "excess") for r in rows_with_income) / n_income) if n_income else None
+  n_all = t.count()
+  n_income = t.count(over_income=True)
 
   lines = []
   lines.append("# Overall Trends\n")
@@ -144,16 +180,15 @@ def write_overall_trends_md(reports_dir: Path, monthly_summary_path: Path):
 
   # Income/excess averaged over months with income only
   if n_income:
-    lines.append(f"- **Your Average Income:** ${avg_income_inc:,.2f}")
-    lines.append(f"- **Your Average Excess:** ${avg_excess_inc:,.2f}")
+    lines.append(f"- **Your Average Income:** ${t.mean('income', over_income=True):,.2f}")
+    lines.append(f"- **Your Average Excess:** ${t.mean('excess', over_income=True):,.2f}")
   else:
     lines.append(f"- **Your Average Income:** —  _(no months with income)_")
     lines.append(f"- **Your Average Excess:** —  _(no months with income)_")
 
   # Living cost is independent of income; keep across all months
-  lines.append(f"- **Your Average Living Cost:** ${avg_living_all:,.2f}\n")
+  lines.append(f"- **Your Average Living Cost:** ${t.mean('living_total'):,.2f}\n")
 
-  # ---- Buckets / Extras (unchanged from your current version) ----
   base_fields = {
       "month", "income", "living_total", "excess",
       "savings_allowance", "spending_allowance"
@@ -163,38 +198,132 @@ def write_overall_trends_md(reports_dir: Path, monthly_summary_path: Path):
       "fun_spend_card": "Personal spending on card (unmatched)",
       "personal_spend_card": "Personal spending on card",
   }
-  alias_bucket = {"-": "uncategorized", "–": "uncategorized"}
+  dynamic_keys = sorted(set(t.keys) - base_fields)
 
-  all_keys = set(k for r in rows for k in r.keys())
-  dynamic_keys = sorted(all_keys - base_fields)
-
-  # Buckets averaged over ALL months (you can change to income-only if you want)
-  bucket_sums = {}
+  # Buckets averaged over ALL months
+  bucket_avgs = {}
   for key in dynamic_keys:
-    if key in extras_display:
+    if key in extras_display or key.startswith(CARD_BUCKET_PREFIX):
       continue
-    canon = alias_bucket.get(key, key)
-    bucket_sums[canon] = bucket_sums.get(canon, 0.0) + sum(f(r, key) for r in rows)
-  bucket_avgs = {k: (v / n_all) for k, v in bucket_sums.items() if v > 0.0}
+    if t.total(key) > 0.0:
+      bucket_avgs[key] = t.total(key) / n_all
+  buckets = [b for b, _ in sorted(bucket_avgs.items(), key=lambda kv: kv[1], reverse=True)]
 
   lines.append("## Buckets (averages per month)\n")
-  for b, avg_val in sorted(bucket_avgs.items(), key=lambda kv: kv[1], reverse=True):
-    lines.append(f"- {b}: ${avg_val:,.2f}")
+  for b in buckets:
+    lines.append(f"- {b}: ${bucket_avgs[b]:,.2f}")
 
-  # Extras: if you want them averaged only over months with data, swap this block later
   extras_avgs = {}
   for raw_key, label in extras_display.items():
-    if raw_key in dynamic_keys:
-      total = sum(f(r, raw_key) for r in rows)
-      if total > 0.0:
-        extras_avgs[label] = total / n_all
+    if raw_key in dynamic_keys and t.total(raw_key) > 0.0:
+      extras_avgs[label] = t.total(raw_key) / n_all
 
   if extras_avgs:
     lines.append("\n## Other indicators (averages per month)\n")
     for label, avg_val in sorted(extras_avgs.items(), key=lambda kv: kv[1], reverse=True):
       lines.append(f"- {label}: ${avg_val:,.2f}")
 
-  (reports_dir / "overall_trends.md").write_text("\n".join(lines), encoding="utf-8")
+  card_avgs = {}
+  for key in dynamic_keys:
+    if key.startswith(CARD_BUCKET_PREFIX) and t.total(key) > 0.0:
+      card_avgs[key[len(CARD_BUCKET_PREFIX):]] = t.total(key) / n_all
+
+  if card_avgs:
+    lines.append("\n## Personal card spending by bucket (averages per month)\n")
+    for b, avg_val in sorted(card_avgs.items(), key=lambda kv: kv[1], reverse=True):
+      lines.append(f"- {b}: ${avg_val:,.2f}")
+
+  # ---- Rolling windows ending at the latest month ----
+  metrics = [("Living cost", "living_total", False), ("Income", "income", True), ("Excess", "excess", True)]
+  metrics += [(b, b, False) for b in buckets]
+  head = " | ".join(f"Last {w} mo" for w in TREND_WINDOWS)
+  lines.append(f"\n## Rolling averages (per month, through {latest})\n")
+  lines.append(f"| | {head} | All months |")
+  lines.append("|---|" + "---:|" * (len(TREND_WINDOWS) + 1))
+  for label, key, over_income in metrics:
+    cells = [_money_or_dash(t.mean(key, latest, w, over_income)) for w in TREND_WINDOWS]
+    cells.append(_money_or_dash(t.mean(key, over_income=over_income)))
+    lines.append(f"| {label} | " + " | ".join(cells) + " |")
+  lines.append("\n_Income and excess average over months with income only._")
+
+  # ---- Year over year ----
+  yoy_rows = []
+  for label, key, _ in metrics:
+    for period, window in ((latest, 1), (f"12 months to {latest}", 12)):
+      hit = t.yoy(key, latest, window)
+      if hit is not None:
+        yoy_rows.append((label, period, hit))
+  if yoy_rows:
+    lines.append("\n## Year over year\n")
+    lines.append("| | Period | This year | Year before | Change | % |")
+    lines.append("|---|---|---:|---:|---:|---:|")
+    for label, period, (cur, prev) in yoy_rows:
+      pct = f"{(cur - prev) / prev * 100:+.0f}%" if prev > 0 else "—"
+      lines.append(f"| {label} | {period} | ${cur:,.2f} | ${prev:,.2f} | {_signed_money(cur - prev)} | {pct} |")
+
+  # ---- Share of living cost ----
+  if buckets and t.total("living_total") > 0.0:
+    lines.append("\n## Share of living cost by bucket\n")
+    lines.append("| Bucket | Last 12 mo | All months |")
+    lines.append("|---|---:|---:|")
+    for b in buckets:
+      recent, overall = t.share(b, last=latest, window=12), t.share(b)
+      recent_s = "—" if recent is None else f"{recent * 100:.1f}%"
+      overall_s = "—" if overall is None else f"{overall * 100:.1f}%"
+      lines.append(f"| {b} | {recent_s} | {overall_s} |")
+
+  if projection is not None:
+    lines.append(render_savings_projection_section(projection))
+
+  return "\n".join(lines)
+
+PROJECTION_CHECKPOINTS = (3, 6, 12, 24, 36)
+
+def render_savings_projection_section(p: SavingsProjection) -> str:
+  n = len(p.months)
+  steps = sorted({s for s in PROJECTION_CHECKPOINTS if s <= n} | {n})
+  lines = [f"\n## Savings projection (next {n} months)\n"]
+  lines.append(
+    f"_{p.n_paths:,} simulated futures: each month's living cost is drawn from "
+    f"{p.history_months} recent complete months (after the forecast's outlier treatment), income follows your pay "
+    f"schedule, and half of any excess is saved. Bands are total savings by the end of the month._\n"
+  )
+  head = " | ".join("Median" if q == 50 else f"P{q}" for q in PERCENTILES)
+  lines.append(f"| Through | {head} |")
+  lines.append("|---|" + "---:|" * len(PERCENTILES))
+  for s in steps:
+    cells = " | ".join(f"${p.bands[q][s - 1]:,.2f}" for q in PERCENTILES)
+    lines.append(f"| {p.months[s - 1]} ({s} mo) | {cells} |")
+  return "\n".join(lines)
+
+def render_what_if_md(month: str, results: List, weeks: List) -> str:
+  """What-if comparison for `month`: one row per scenario, the first one being the baseline."""
+  lines = [f"# What-if scenarios ({month})\n"]
+  if not results:
+    lines.append("_No scenarios._")
+    return "\n".join(lines) + "\n"
+  base = results[0]
+  if base.history_months:
+    lines.append(
+      f"_Forecast, income split and weekly plan for {month} under each scenario; history columns total the "
+      f"{base.history_months} months before it with the same changes applied. Half of any excess is saved._\n"
+    )
+  lines.append("| Scenario | Income | Forecast spend | Excess | Savings | Spending | vs baseline | History savings |")
+  lines.append("|---|---:|---:|---:|---:|---:|---:|---:|")
+  for r in results:
+    delta = "" if r is base else f"{r.savings - base.savings:+,.2f}"
+    lines.append(
+      f"| {r.name} | ${r.income:,.2f} | ${r.forecast:,.2f} | ${r.excess:,.2f} | ${r.savings:,.2f} "
+      f"| ${r.spending:,.2f} | {delta} | ${r.history_savings:,.2f} |"
+    )
+  if weeks:
+    lines.append("\n## Weekly plans\n")
+    lines.append("| Scenario | " + " | ".join(f"{w.week_start:%m-%d}..{w.week_end:%m-%d}" for w in weeks) + " |")
+    lines.append("|---|" + "---:|" * len(weeks))
+    for r in results:
+      lines.append(f"| {r.name} | " + " | ".join(f"${v:,.2f}" for v in r.weekly) + " |")
+  lines.append("")
+  return "\n".join(lines)
 
   
 # --- Extra section writers ---
@@ -205,6 +334,7 @@ def write_weekly_schedule_section(
   weekly_sched: Iterable,            # items with week_start, week_end, allowance
   *,
   meta: dict,                         # method + inputs for the explainer
+  balances: Iterable | None = None,   # WeekBalance items from the spend ledger (optional)
 ) -> None:
   """
   Appends a self-contained 'Weekly spending plan' section to <reports_dir>/<month>.md.
@@ -212,6 +342,16 @@ def write_weekly_schedule_section(
   """
   ensure_dir(reports_dir)
   path = reports_dir / f"{month}.md"
+  with path.open("a", encoding="utf-8") as f:
+    f.write(render_weekly_schedule_section(month, weekly_sched, meta=meta, balances=balances))
+
+def render_weekly_schedule_section(
+  month: str,
+  weekly_sched: Iterable,
+  *,
+  meta: dict,
+  balances: Iterable | None = None,
+) -> str:
 
   forecast = float(meta.get("forecast_basis_usd", 0.0))
   week_start = str(meta.get("week_start", "MON"))
@@ -239,6 +379,13 @@ def write_weekly_schedule_section(
     + (f" ({outlier_method}, k={outlier_k})" if outlier_method is not None else "")
     + "."
   )
+  nowcast = meta.get("nowcast")
+  if nowcast is not None:
+    lines.append(
+      f"_Nowcast as of {nowcast.asof.isoformat()}:_ ${nowcast.spent:,.2f} spent so far, plus what each bucket "
+      f"usually still spends after today → **${nowcast.estimate:,.2f}** for the month "
+      f"(forecast before the month: ${nowcast.baseline:,.2f})."
+    )
   lines.append(
     "Excluded buckets from this forecast: "
     + (", ".join(exclude_buckets) if exclude_buckets else "none")
@@ -246,16 +393,33 @@ def write_weekly_schedule_section(
   )
 
   # Render as a table (clearer than bullets)
-  lines.append("| Week start | Week end | Allowance |")
-  lines.append("|---|---|---:|")
-  for w in weekly_sched:
-    lines.append(f"| {w.week_start.isoformat()} | {w.week_end.isoformat()} | ${w.allowance:,.2f} |")
+  balances = list(balances or [])
+  if balances:
+    carryover_mode = str(meta.get("carryover_mode", "none"))
+    lines.append(
+      "_Remaining:_ allowance minus what you've actually spent (your-share Splid rows + personal card charges)"
+      + (f", with under/over-spend carried forward (carryover: **{carryover_mode}**)" if carryover_mode != "none" else "")
+      + ".\n"
+    )
+    if meta.get("balance_today") is not None:
+      lines.append(f"- **Running balance as of {meta.get('balance_date')}:** ${float(meta['balance_today']):,.2f}\n")
+    lines.append("| Week start | Week end | Allowance | Carry-in | Spent | Remaining |")
+    lines.append("|---|---|---:|---:|---:|---:|")
+    for b in balances:
+      lines.append(
+        f"| {b.week_start.isoformat()} | {b.week_end.isoformat()} | ${b.allowance:,.2f} "
+        f"| ${b.carry_in:,.2f} | ${b.spent:,.2f} | ${b.remaining:,.2f} |"
+      )
+  else:
+    lines.append("| Week start | Week end | Allowance |")
+    lines.append("|---|---|---:|")
+    for w in weekly_sched:
+      lines.append(f"| {w.week_start.isoformat()} | {w.week_end.isoformat()} | ${w.allowance:,.2f} |")
   lines.append("")
+  return "\n".join(lines)
 
-  with path.open("a", encoding="utf-8") as f:
-    f.write("\n".join(lines))
-
-def write_card_summary_section(reports_dir: Path, month: str, *, house_on_card: float, personal_spend_card: float) -> None:
+def write_card_summary_section(reports_dir: Path, month: str, *, house_on_card: float, personal_spend_card: float,
+                               personal_by_bucket: Dict[str, float] | None = None) -> None:
   """
   Appends a credit card spending panel for the month.
   - 'house_on_card' = charges that matched house expenses in Splid (shared/living)
@@ -263,6 +427,14 @@ def write_card_summary_section(reports_dir: Path, month: str, *, house_on_card:
   """
   ensure_dir(reports_dir)
   path = reports_dir / f"{month}.md"
+  with path.open("a", encoding="utf-8") as f:
+    f.write(render_card_summary_section(
+      house_on_card=house_on_card, personal_spend_card=personal_spend_card, personal_by_bucket=personal_by_bucket,
+    ))
+
+def render_card_summary_section(*, house_on_card: float, personal_spend_card: float,
+                                personal_by_bucket: Dict[str, float] | None = None,
+                                matches: Iterable | None = None) -> str:
   total_card_purchases = round(house_on_card + personal_spend_card, 2)
 
   lines = []
@@ -271,6 +443,112 @@ def write_card_summary_section(reports_dir: Path, month: str, *, house_on_card:
   lines.append(f"- **Total card purchases:** ${total_card_purchases:,.2f}")
   lines.append(f"  - Matched to house expenses: ${house_on_card:,.2f}")
   lines.append(f"  - Personal (unmatched): ${personal_spend_card:,.2f}")
+  for b, v in sorted((personal_by_bucket or {}).items(), key=lambda kv: (-kv[1], kv[0])):
+    lines.append(f"    - {b}: ${v:,.2f}")
   lines.append("")
-  with path.open("a", encoding="utf-8") as f:
-    f.write("\n".join(lines))
+
+  # scored matcher only: every match with its confidence, to review the weak ones
+  matches = list(matches or [])
+  if matches:
+    avg = sum(m.score for m in matches) / len(matches)
+    lines.append(f"### Matched charges (average confidence {avg:.2f})\n")
+    lines.append("| Posted | Card description | Amount | Splid title | Splid date | Amount diff | Confidence |")
+    lines.append("|---|---|---:|---|---|---:|---:|")
+    for m in sorted(matches, key=lambda m: (m.txn.post_date, m.txn.description)):
+      lines.append(
+        f"| {m.txn.post_date} | {m.txn.description} | ${m.txn.amount:,.2f} | {m.row.get('title', '')} "
+        f"| {m.row.get('date', '')} | ${m.amount_diff:,.2f} | {m.score:.2f} |"
+      )
+    lines.append("")
+  return "\n".join(lines)
+
+def render_recurring_section(series: Iterable, *, asof: date, horizon_days: int = 30) -> str:
+  """'Recurring' panel: detected recurring charges and what's expected in the next `horizon_days`."""
+  series = list(series)
+  lines = []
+  lines.append("")  # spacer
+  lines.append("## Recurring\n")
+  if not series:
+    lines.append("_No recurring charges detected yet._")
+    lines.append("")
+    return "\n".join(lines)
+
+  total_monthly = sum(s.monthly_equivalent for s in series)
+  lines.append(f"- **Recurring charges (monthly equivalent):** ${total_monthly:,.2f} across {len(series)} series\n")
+  lines.append("| Name | Cadence | Typical | Last seen | Drift / period | Next expected | Next amount |")
+  lines.append("|---|---|---:|---|---:|---|---:|")
+  for s in series:
+    lines.append(
+      f"| {s.label} | {s.cadence} | ${s.typical_amount:,.2f} | {s.last_date} | ${s.drift_per_period:+,.2f} "
+      f"| {s.next_date} | ${s.next_amount:,.2f} |"
+    )
+  lines.append("")
+
+  end = asof + timedelta(days=horizon_days)
+  upcoming = sorted((d, s.label, amt) for s in series for d, amt in s.expected_between(asof, end))
+  lines.append(f"### Expected {asof.isoformat()} – {end.isoformat()}\n")
+  if upcoming:
+    for d, label, amt in upcoming:
+      lines.append(f"- {d.isoformat()}: {label} — ${amt:,.2f}")
+    lines.append(f"- **Total:** ${sum(a for _, _, a in upcoming):,.2f}")
+  else:
+    lines.append("_Nothing expected._")
+  lines.append("")
+  return "\n".join(lines)
+
+def render_balances_section(month: str, balances: Dict[str, float], transfers: Iterable, you: str = "") -> str:
+  """'Balances' panel: household net balances at month end and the transfers that settle them."""
+  you_key = you.strip().lower()
+  lines = []
+  lines.append("")  # spacer
+  lines.append(f"## Balances (through {month})\n")
+  if not balances:
+    lines.append("Everyone is settled up.\n")
+    return "\n".join(lines)
+  lines.append("| Member | Balance | |")
+  lines.append("|---|---:|---|")
+  for m, v in sorted(balances.items(), key=lambda kv: (-kv[1], kv[0])):
+    name = f"**{m}**" if m.strip().lower() == you_key else m
+    lines.append(f"| {name} | {_signed_money(v)} | {'is owed' if v > 0 else 'owes'} |")
+  transfers = list(transfers)
+  lines.append(f"\n**Settle up** ({len(transfers)} transfer{'s' if len(transfers) != 1 else ''}):\n")
+  for frm, to, amt in transfers:
+    lines.append(f"- {frm} → {to}: ${amt:,.2f}")
+  drift = round(sum(balances.values()), 2)
+  if drift:
+    lines.append(f"\n_Shares don't add up to the amounts paid by {_signed_money(drift)}; that part stays unsettled._")
+  lines.append("")
+  return "\n".join(lines)
+
+def render_alerts_section(month: str, alerts: Iterable, total: int = 0) -> str:
+  """'Alerts' panel: budget alert rules firing for the month (all months are in data/alerts.json)."""
+  alerts = list(alerts)
+  lines = []
+  lines.append("")  # spacer
+  lines.append(f"## Alerts ({month})\n")
+  if alerts:
+    lines.append("| Rule | Metric | Value | Threshold |")
+    lines.append("|---|---|---:|---|")
+    for a in alerts:
+      lines.append(f"| {a.rule} | {a.metric} | {a.value:,.2f} | {a.threshold} |")
+  else:
+    lines.append("No alert rules fired this month.")
+  earlier = total - len(alerts)
+  if earlier > 0:
+    lines.append(f"\n_{earlier} more alert(s) in other months; see data/alerts.json._")
+  lines.append("")
+  return "\n".join(lines)
+
+def render_anomaly_section(flags: Iterable) -> str:
+  """'Unusual expenses' panel: rows far above what their bucket/title usually costs."""
+  lines = []
+  lines.append("")  # spacer
+  lines.append("## Unusual expenses\n")
+  lines.append("| Date | Title | Bucket | Amount | Typical | Score | Compared to |")
+  lines.append("|---|---|---|---:|---:|---:|---|")
+  for f in flags:
+    lines.append(
+      f"| {f.date} | {f.title} | {f.bucket} | ${f.amount:,.2f} | ${f.typical:,.2f} | {f.score:.1f} | {f.stream} |"
+    )
+  lines.append("")
+  return "\n".join(lines)
@@ -0,0 +1,296 @@
+from __future__ import annotations
+import csv
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from urllib.parse import unquote, urlsplit
+
+from config.loader import UnifiedConfig
+from budgeting.ledger import SpendLedger
+from budgeting.nowcast import IntraMonthCurves
+from budgeting.weekly_budget import (
+  compute_weekly_spending_schedule, month_forecaster, month_nowcaster, planned_monthly_spend,
+)
+from analytics.monthly_aggregates import monthly_living_totals
+from analytics.recurring import RecurringTracker
+from core.dates import previous_complete_month
+from store.sqlite_store import TransactionStore
+from reports import CARD_BUCKET_PREFIX
+
+# Read-only JSON API over the pipeline outputs (store + monthly_summary.csv + data/ledger/).
+# Everything is loaded into memory once; responses are cached per path with an ETag
+# and only rebuilt when one of the source files changes.
+
+_MONTH = re.compile(r"\d{4}-(0[1-9]|1[0-2])")
+_SUMMARY_BASE = ("income", "living_total", "excess", "savings_allowance", "spending_allowance")
+_SUMMARY_EXTRAS = ("house_on_card", "personal_spend_card", "fun_spend_card")
+
+def _f(v: Any) -> float:
+  try:
+    return float(v or 0.0)
+  except (TypeError, ValueError):
+    return 0.0
+
+class DashboardData:
+  """In-memory, indexed snapshot of one member's pipeline outputs."""
+
+  def __init__(self, cfg: UnifiedConfig):
+    self.cfg = cfg
+    self.summary: Dict[str, dict] = {}
+    self.bucket_series: Dict[str, Dict[str, float]] = defaultdict(dict)
+    self.rows_by_month: Dict[str, List[dict]] = defaultdict(list)
+    self.rows: List[dict] = []
+    self.unmatched_by_month: Dict[str, List[dict]] = defaultdict(list)
+    self.ledger = SpendLedger.load(cfg.paths.data_dir / "ledger")
+    self._weekly: Dict[Tuple[str, date | None], dict] = {}
+    self._load_summary(cfg.paths.data_dir / "monthly_summary.csv")
+    self._load_rows_and_cards()
+    # the month reports' forecast: recurring subtraction and the nowcast as configured
+    totals = monthly_living_totals(
+      self.rows,
+      use_your_share=cfg.budgeting.use_your_share,
+      exclude_buckets=cfg.budgeting.exclude_buckets,
+    )
+    self.forecast = month_forecaster(totals, cfg.budgeting, RecurringTracker.load(cfg.paths.data_dir / "recurring.json"))
+    curves = IntraMonthCurves.load(cfg.paths.data_dir / "nowcast.json") if cfg.budgeting.nowcast else None
+    self.nowcast = month_nowcaster(totals, cfg.budgeting, curves)
+
+  def _load_summary(self, path: Path) -> None:
+    if not path.exists():
+      return
+    with path.open("r", newline="", encoding="utf-8") as f:
+      for r in csv.DictReader(f):
+        month = r["month"]
+        base = {k: _f(r.get(k)) for k in _SUMMARY_BASE}
+        extras = {k: _f(r.get(k)) for k in _SUMMARY_EXTRAS if r.get(k)}
+        card_buckets = {
+          k[len(CARD_BUCKET_PREFIX):]: _f(v) for k, v in r.items()
+          if k.startswith(CARD_BUCKET_PREFIX) and v not in ("", None)
+        }
+        buckets = {
+          k: _f(v) for k, v in r.items()
+          if k != "month" and k not in _SUMMARY_BASE and k not in _SUMMARY_EXTRAS
+          and not k.startswith(CARD_BUCKET_PREFIX) and v not in ("", None)
+        }
+        self.summary[month] = {"month": month, **base, "buckets": buckets, "card": {**extras, "personal_by_bucket": card_buckets}}
+        for b, v in buckets.items():
+          self.bucket_series[b][month] = v
+
+  def _load_rows_and_cards(self) -> None:
+    path = self.cfg.storage.sqlite_path
+    if path is not None and path.exists():
+      with TransactionStore(path) as store:
+        self.rows = store.rows_between(self.cfg.you.name)
+        for month, status, c in store.card_match_results(self.cfg.you.name):
+          if status == "unmatched" and c.amount > 0:
+            self.unmatched_by_month[month].append({
+              "trans_date": c.trans_date, "post_date": c.post_date,
+              "description": c.description, "amount": round(c.amount, 2),
+            })
+    else:
+      # no store: fall back to the per-month CSV exports (no card match results there)
+      for p in sorted(self.cfg.paths.data_dir.glob("month=*.csv")):
+        with p.open("r", newline="", encoding="utf-8") as f:
+          for r in csv.DictReader(f):
+            r["amount_total"] = _f(r["amount_total"])
+            r["your_share"] = _f(r["your_share"])
+            r["is_payment"] = r["is_payment"] == "True"
+            self.rows.append(r)
+    for r in self.rows:
+      self.rows_by_month[r["month"]].append(r)
+
+  # ---- views ----
+
+  def months(self) -> List[dict]:
+    return [
+      {k: s[k] for k in ("month",) + _SUMMARY_BASE}
+      for _, s in sorted(self.summary.items())
+    ]
+
+  def month(self, month: str) -> dict | None:
+    return self.summary.get(month)
+
+  def bucket_trends(self) -> Dict[str, List[dict]]:
+    return {b: self.bucket_trend(b) for b in sorted(self.bucket_series)}
+
+  def bucket_trend(self, bucket: str) -> List[dict]:
+    series = self.bucket_series.get(bucket, {})
+    return [{"month": m, "amount": series.get(m, 0.0)} for m in sorted(self.summary)]
+
+  def unmatched(self, month: str) -> dict:
+    txns = self.unmatched_by_month.get(month, [])
+    return {"month": month, "total": round(sum(t["amount"] for t in txns), 2), "transactions": txns}
+
+  def unmatched_totals(self) -> List[dict]:
+    return [
+      {"month": m, "total": round(sum(t["amount"] for t in txns), 2), "count": len(txns)}
+      for m, txns in sorted(self.unmatched_by_month.items())
+    ]
+
+  def weekly(self, month: str, asof: date | None = None) -> dict:
+    asof = asof or date.today()
+    # the current month's plan follows the nowcast, which moves with the as-of date
+    key = (month, asof if month == asof.strftime("%Y-%m") else None)
+    if key in self._weekly:
+      return self._weekly[key]
+    cfg = self.cfg
+    forecast, _ = planned_monthly_spend(month, asof, self.forecast, self.nowcast)
+    sched = compute_weekly_spending_schedule(month, forecast, cfg.budgeting.week_start)
+    carry_in = 0.0
+    if cfg.options.carryover_mode == "monthly":
+      prev = previous_complete_month(date.fromisoformat(f"{month}-01"))
+      carry_in = self.ledger.month_carry(prev, self.forecast(prev))
+    balances = self.ledger.week_balances(month, sched, cfg.options.carryover_mode, carry_in)
+    out = {
+      "month": month,
+      "forecast": round(forecast, 2),
+      "carryover_mode": cfg.options.carryover_mode,
+      "weeks": [
+        {
+          "week_start": b.week_start.isoformat(), "week_end": b.week_end.isoformat(),
+          "allowance": b.allowance, "carry_in": b.carry_in, "spent": b.spent, "remaining": b.remaining,
+        }
+        for b in balances
+      ],
+    }
+    self._weekly[key] = out
+    return out
+
+class DashboardServer:
+  """Routes + per-path response cache; reloads DashboardData when source files change."""
+
+  def __init__(self, cfg: UnifiedConfig, check_interval_s: float = 2.0):
+    self.cfg = cfg
+    self.check_interval_s = check_interval_s
+    self._lock = threading.Lock()
+    self._fingerprint = self._sources_fingerprint()
+    self._checked_at = time.monotonic()
+    self.data = DashboardData(cfg)
+    self._cache: Dict[str, Tuple[int, bytes, str]] = {}
+
+  def _sources(self) -> List[Path]:
+    srcs = [self.cfg.paths.data_dir / "monthly_summary.csv"]
+    srcs += [self.cfg.paths.data_dir / "recurring.json", self.cfg.paths.data_dir / "nowcast.json"]
+    srcs += sorted((self.cfg.paths.data_dir / "ledger").glob("*.json"))
+    if self.cfg.storage.sqlite_path is not None:
+      srcs += [self.cfg.storage.sqlite_path, Path(f"{self.cfg.storage.sqlite_path}-wal")]
+    else:
+      srcs += sorted(self.cfg.paths.data_dir.glob("month=*.csv"))
+    return srcs
+
+  def _sources_fingerprint(self) -> str:
+    h = hashlib.sha1()
+    for p in self._sources():
+      try:
+        st = p.stat()
+        h.update(f"{p}|{st.st_mtime_ns}|{st.st_size};".encode("utf-8"))
+      except FileNotFoundError:
+        h.update(f"{p}|-;".encode("utf-8"))
+    return h.hexdigest()
+
+  def maybe_reload(self) -> None:
+    # stat() the sources at most every check_interval_s; requests in between never touch disk
+    now = time.monotonic()
+    if now - self._checked_at < self.check_interval_s:
+      return
+    with self._lock:
+      self._checked_at = now
+      fp = self._sources_fingerprint()
+      if fp != self._fingerprint:
+        self.data = DashboardData(self.cfg)
+        self._cache = {}
+        self._fingerprint = fp
+
+  def _route(self, path: str, today: date) -> Tuple[int, Any]:
+    d = self.data
+    parts = [unquote(p) for p in path.strip("/").split("/") if p]
+    if parts[:1] != ["api"]:
+      return 404, {"error": "not found"}
+    parts = parts[1:]
+    if parts == ["health"]:
+      return 200, {"ok": True, "months": len(d.summary)}
+    if parts == ["months"]:
+      return 200, d.months()
+    if len(parts) == 2 and parts[0] == "months":
+      m = d.month(parts[1])
+      return (200, m) if m is not None else (404, {"error": f"no summary for {parts[1]}"})
+    if parts == ["buckets"]:
+      return 200, d.bucket_trends()
+    if len(parts) == 2 and parts[0] == "buckets":
+      return 200, {"bucket": parts[1], "series": d.bucket_trend(parts[1])}
+    if len(parts) == 2 and parts[0] == "weekly":
+      if not _MONTH.fullmatch(parts[1]):
+        return 400, {"error": f"expected a YYYY-MM month, got {parts[1]!r}"}
+      return 200, d.weekly(parts[1], today)
+    if parts == ["cards", "unmatched"]:
+      return 200, d.unmatched_totals()
+    if len(parts) == 3 and parts[:2] == ["cards", "unmatched"]:
+      if not _MONTH.fullmatch(parts[2]):
+        return 400, {"error": f"expected a YYYY-MM month, got {parts[2]!r}"}
+      return 200, d.unmatched(parts[2])
+    return 404, {"error": "not found"}
+
+  def respond(self, raw_path: str) -> Tuple[int, bytes, str]:
+    """(status, JSON body, etag) for a GET path, served from cache when unchanged."""
+    self.maybe_reload()
+    path = urlsplit(raw_path).path
+    today = date.today()
+    current = today.strftime("%Y-%m")
+    if path.rstrip("/") == "/api/weekly":
+      path = f"/api/weekly/{current}"
+    # the current month's weekly plan is nowcast as of today: cache it per day
+    key = f"{path}@{today.isoformat()}" if path.rstrip("/") == f"/api/weekly/{current}" else path
+    hit = self._cache.get(key)
+    if hit is not None:
+      return hit
+    try:
+      status, payload = self._route(path, today)
+    except Exception as e:
+      print(f"[WARN] {path}: {type(e).__name__}: {e}")
+      status, payload = 500, {"error": f"internal error ({type(e).__name__})"}
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha1(self._fingerprint.encode("utf-8") + body).hexdigest()[:16] + '"'
+    out = (status, body, etag)
+    if status == 200:
+      self._cache[key] = out
+    return out
+
+def _make_handler(app: DashboardServer):
+  class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+      status, body, etag = app.respond(self.path)
+      if status == 200 and self.headers.get("If-None-Match") == etag:
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.end_headers()
+        return
+      self.send_response(status)
+      self.send_header("Content-Type", "application/json; charset=utf-8")
+      self.send_header("Content-Length", str(len(body)))
+      self.send_header("ETag", etag)
+      self.send_header("Cache-Control", "no-cache")
+      self.end_headers()
+      self.wfile.write(body)
+
+    def log_message(self, fmt, *args):  # keep the console quiet
+      pass
+
+  return Handler
+
+def serve(cfg: UnifiedConfig, host: str = "127.0.0.1", port: int = 8765) -> None:
+  app = DashboardServer(cfg)
+  httpd = ThreadingHTTPServer((host, port), _make_handler(app))
+  print(f"Serving dashboard API on http://{host}:{port}/api/months (Ctrl+C to stop)")
+  try:
+    httpd.serve_forever()
+  except KeyboardInterrupt:
+    pass
+  finally:
+    httpd.server_close()
@@ -0,0 +1,247 @@
+from __future__ import annotations
+import sqlite3
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.models import CreditCardTransaction
+
+# One local SQLite file holding every normalized Splid row, card transaction and
+# card match result. Written once per run (single transaction, executemany);
+# read through the small query API below, which only hits indexed columns.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS splid_rows (
+    member        TEXT NOT NULL,
+    date          TEXT NOT NULL,
+    month         TEXT NOT NULL,
+    title         TEXT NOT NULL,
+    payer         TEXT NOT NULL,
+    category_raw  TEXT NOT NULL,
+    bucket        TEXT NOT NULL,
+    amount_total  REAL NOT NULL,
+    your_share    REAL NOT NULL,
+    is_payment    INTEGER NOT NULL,
+    orig_currency TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS ix_splid_member_month  ON splid_rows (member, month);
+CREATE INDEX IF NOT EXISTS ix_splid_member_bucket ON splid_rows (member, bucket, date);
+CREATE INDEX IF NOT EXISTS ix_splid_member_date   ON splid_rows (member, date);
+CREATE INDEX IF NOT EXISTS ix_splid_payer         ON splid_rows (payer, date);
+
+CREATE TABLE IF NOT EXISTS card_txns (
+    owner       TEXT NOT NULL,
+    txn_key     TEXT NOT NULL,
+    trans_date  TEXT NOT NULL,
+    post_date   TEXT NOT NULL,
+    month       TEXT NOT NULL,
+    description TEXT NOT NULL,
+    amount      REAL NOT NULL,
+    section     TEXT NOT NULL,
+    PRIMARY KEY (owner, txn_key)
+);
+CREATE INDEX IF NOT EXISTS ix_card_owner_month ON card_txns (owner, month);
+CREATE INDEX IF NOT EXISTS ix_card_owner_date  ON card_txns (owner, post_date);
+
+CREATE TABLE IF NOT EXISTS card_matches (
+    owner   TEXT NOT NULL,
+    txn_key TEXT NOT NULL,
+    month   TEXT NOT NULL,
+    status  TEXT NOT NULL,              -- "matched" | "unmatched"
+    PRIMARY KEY (owner, txn_key)
+);
+CREATE INDEX IF NOT EXISTS ix_match_owner_month ON card_matches (owner, month, status);
+"""
+
+def card_txn_keys(txns: Iterable[CreditCardTransaction]) -> List[str]:
+    """
+    Stable per-transaction key: the transaction's txn_id when it has one, otherwise
+    dates | description | amount | occurrence among identical charges.
+    """
+    seen: Dict[str, int] = defaultdict(int)
+    out: List[str] = []
+    for c in txns:
+        if c.txn_id:
+            out.append(c.txn_id)
+            continue
+        base = f"{c.trans_date}|{c.post_date}|{c.description}|{c.amount:.2f}"
+        seen[base] += 1
+        out.append(f"{base}|{seen[base]}")
+    return out
+
+def _card_txn(rec) -> CreditCardTransaction:
+    # (trans_date, post_date, description, amount, section, txn_key); legacy keys contain "|"
+    *fields, key = rec
+    return CreditCardTransaction(*fields, txn_id="" if "|" in key else key)
+
+class TransactionStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "TransactionStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---- writes (one transaction per run) ----
+
+    def replace_member(
+        self,
+        member: str,
+        rows: List[dict],
+        card_txns: List[CreditCardTransaction] | None = None,
+        matches: List[Tuple[CreditCardTransaction, str, str]] | None = None,
+        use_post_date: bool = True,
+    ) -> None:
+        """
+        Replace everything stored for `member` with this run's data.
+        `matches` = (transaction, month, "matched"|"unmatched") for the months processed.
+        """
+        with self.conn:
+            self.clear_member(member)
+            self.insert_rows(member, rows)
+            keys = self.insert_card_txns(member, card_txns or [], use_post_date)
+            if matches is not None:
+                self.insert_matches(member, matches, keys)
+
+    # Building blocks for callers that stream month by month inside one `with store.conn:`.
+
+    def clear_member(self, member: str) -> None:
+        self.conn.execute("DELETE FROM splid_rows WHERE member = ?", (member,))
+        self.conn.execute("DELETE FROM card_txns WHERE owner = ?", (member,))
+        self.conn.execute("DELETE FROM card_matches WHERE owner = ?", (member,))
+
+    def insert_rows(self, member: str, rows: Iterable[dict]) -> None:
+        self.conn.executemany(
+            "INSERT INTO splid_rows VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+            (
+                (member, r["date"], r["month"], r["title"], r["payer"], r["category_raw"], r["bucket"],
+                 float(r["amount_total"]), float(r["your_share"]), int(bool(r["is_payment"])),
+                 r.get("orig_currency", ""))
+                for r in rows
+            ),
+        )
+
+    def insert_card_txns(self, member: str, card_txns: List[CreditCardTransaction], use_post_date: bool = True) -> Dict[int, str]:
+        """Insert card transactions; returns {id(txn): txn_key} for insert_matches."""
+        keys = {id(c): k for c, k in zip(card_txns, card_txn_keys(card_txns))}
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO card_txns VALUES (?,?,?,?,?,?,?,?)",
+            (
+                (member, keys[id(c)], c.trans_date, c.post_date,
+                 (c.post_date if use_post_date else c.trans_date)[:7],
+                 c.description, float(c.amount), c.section)
+                for c in card_txns
+            ),
+        )
+        return keys
+
+    def insert_matches(self, member: str, matches: List[Tuple[CreditCardTransaction, str, str]], keys: Dict[int, str]) -> None:
+        months = sorted({m for _, m, _ in matches})
+        self.conn.executemany(
+            "DELETE FROM card_matches WHERE owner = ? AND month = ?",
+            ((member, m) for m in months),
+        )
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO card_matches VALUES (?,?,?,?)",
+            ((member, keys[id(c)], m, status) for c, m, status in matches if id(c) in keys),
+        )
+
+    # ---- queries ----
+
+    def members(self) -> List[str]:
+        return [r[0] for r in self.conn.execute("SELECT DISTINCT member FROM splid_rows ORDER BY member")]
+
+    def spend_by_bucket(self, member: str, first_date: str, last_date: str, use_your_share: bool = True) -> Dict[str, float]:
+        """{bucket: spend} for living rows (payments excluded) with first_date <= date <= last_date."""
+        col = "your_share" if use_your_share else "amount_total"
+        cur = self.conn.execute(
+            f"SELECT bucket, ROUND(SUM({col}), 2) FROM splid_rows "
+            "WHERE member = ? AND date BETWEEN ? AND ? AND is_payment = 0 "
+            "GROUP BY bucket ORDER BY bucket",
+            (member, first_date, last_date),
+        )
+        return {b: v for b, v in cur}
+
+    def monthly_living_totals(self, member: str, first_month: str = "0000-00", last_month: str = "9999-99",
+                              use_your_share: bool = True) -> Dict[str, float]:
+        col = "your_share" if use_your_share else "amount_total"
+        cur = self.conn.execute(
+            f"SELECT month, ROUND(SUM({col}), 2) FROM splid_rows "
+            "WHERE member = ? AND month BETWEEN ? AND ? AND is_payment = 0 "
+            "GROUP BY month ORDER BY month",
+            (member, first_month, last_month),
+        )
+        return {m: v for m, v in cur}
+
+    def spend_by_payer(self, member: str, first_date: str, last_date: str) -> Dict[str, float]:
+        """{payer: amount_total paid} over the range (payments excluded)."""
+        cur = self.conn.execute(
+            "SELECT payer, ROUND(SUM(amount_total), 2) FROM splid_rows "
+            "WHERE member = ? AND date BETWEEN ? AND ? AND is_payment = 0 "
+            "GROUP BY payer ORDER BY payer",
+            (member, first_date, last_date),
+        )
+        return {p: v for p, v in cur}
+
+    def rows_for_month(self, member: str, month: str) -> List[dict]:
+        return self.rows_between(member, month, month)
+
+    def rows_between(self, member: str, first_month: str = "0000-00", last_month: str = "9999-99") -> List[dict]:
+        cur = self.conn.execute(
+            "SELECT date, month, title, payer, category_raw, bucket, amount_total, your_share, is_payment, orig_currency "
+            "FROM splid_rows WHERE member = ? AND month BETWEEN ? AND ? ORDER BY date",
+            (member, first_month, last_month),
+        )
+        names = [d[0] for d in cur.description]
+        out = []
+        for rec in cur:
+            r = dict(zip(names, rec))
+            r["is_payment"] = bool(r["is_payment"])
+            out.append(r)
+        return out
+
+    def card_spend_by_status(self, owner: str, first_month: str, last_month: str) -> Dict[str, Dict[str, float]]:
+        """{month: {"matched": $, "unmatched": $}} over positive card purchases."""
+        cur = self.conn.execute(
+            "SELECT m.month, m.status, ROUND(SUM(t.amount), 2) FROM card_matches m "
+            "JOIN card_txns t ON t.owner = m.owner AND t.txn_key = m.txn_key "
+            "WHERE m.owner = ? AND m.month BETWEEN ? AND ? AND t.amount > 0 "
+            "GROUP BY m.month, m.status ORDER BY m.month",
+            (owner, first_month, last_month),
+        )
+        out: Dict[str, Dict[str, float]] = defaultdict(dict)
+        for month, status, total in cur:
+            out[month][status] = total
+        return dict(out)
+
+    def unmatched_card_txns(self, owner: str, month: str) -> List[CreditCardTransaction]:
+        cur = self.conn.execute(
+            "SELECT t.trans_date, t.post_date, t.description, t.amount, t.section, t.txn_key FROM card_matches m "
+            "JOIN card_txns t ON t.owner = m.owner AND t.txn_key = m.txn_key "
+            "WHERE m.owner = ? AND m.month = ? AND m.status = 'unmatched' ORDER BY t.post_date",
+            (owner, month),
+        )
+        return [_card_txn(rec) for rec in cur]
+
+    def card_match_results(self, owner: str) -> List[Tuple[str, str, CreditCardTransaction]]:
+        """Every stored (month, status, transaction) for `owner`, oldest first."""
+        cur = self.conn.execute(
+            "SELECT m.month, m.status, t.trans_date, t.post_date, t.description, t.amount, t.section, t.txn_key "
+            "FROM card_matches m JOIN card_txns t ON t.owner = m.owner AND t.txn_key = m.txn_key "
+            "WHERE m.owner = ? ORDER BY m.month, t.post_date",
+            (owner,),
+        )
+        return [(rec[0], rec[1], _card_txn(rec[2:])) for rec in cur]
+
+def open_store(path: Optional[Path]) -> Optional[TransactionStore]:
+    return TransactionStore(path) if path is not None else None
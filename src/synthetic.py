@@ -0,0 +1,95 @@
+from __future__ import annotations
+import csv
+import random
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple
+
+# Synthetic Splid histories shared by the benchmarks and the engine verification.
+# One generator draws the expenses; they can be laid out as an export sheet (preamble,
+# header, a paid and a share column per member) or as the rows ingest yields.
+
+TITLES = [
+  ("Rent", "House bills", 1800.0), ("Xfinity internet", "House bills", 80.0),
+  ("Avista power", "House bills", 120.0), ("Safeway", "Groceries", 90.0),
+  ("Costco", "Groceries", 220.0), ("Paper towels", "House Supplies", 25.0), ("Pizza", "-", 45.0),
+]
+MERCHANTS = ["STARBUCKS #1021", "AMAZON MKTPLACE", "SHELL OIL 5521", "NETFLIX.COM", "REI #88", "UBER TRIP"]
+HOUSEMATES = ["Sam", "Kai"]
+
+class Expense(NamedTuple):
+  title: str
+  category: str
+  amount: float
+  by: str
+  day: date
+  shares: List[float]       # one per member, in the members' order
+
+def split_cents(amount: float, n: int) -> List[float]:
+  cents = int(round(amount * 100))
+  base, extra = divmod(cents, n)
+  return [(base + (i < extra)) / 100 for i in range(n)]
+
+def synthetic_expenses(members: List[str], n_months: int, rows_per_month: int, seed: int = 7,
+                       last_month: str = "2025-12", payment_share: float = 0.0,
+                       spread: float = 0.2) -> Iterator[Expense]:
+  """
+  Lazily yield `rows_per_month` expenses per month, newest month first (like the export).
+  Amounts are a title's base +/- `spread`, split evenly to the cent; `payment_share` of
+  the rows are settle-up payments from the payer to one other member.
+  """
+  rnd = random.Random(seed)
+  y, m = int(last_month[:4]), int(last_month[5:])
+  for _ in range(n_months):
+    for _ in range(rows_per_month):
+      by = rnd.choice(members)
+      day = date(y, m, rnd.randint(1, 28))
+      if payment_share and rnd.random() < payment_share:
+        amt = round(rnd.uniform(20, 400), 2)
+        to = rnd.choice([x for x in members if x != by])
+        yield Expense("Payment", "-", amt, by, day, [amt if x == to else 0.0 for x in members])
+        continue
+      title, cat, base = TITLES[rnd.randrange(len(TITLES))]
+      amt = round(base * rnd.uniform(1.0 - spread, 1.0 + spread), 2)
+      yield Expense(title, cat, amt, by, day, split_cents(amt, len(members)))
+    y, m = (y - 1, 12) if m == 1 else (y, m - 1)
+
+def raw_row(e: Expense, members: List[str], you: str) -> dict:
+  """The row ingest yields for `you`."""
+  return {
+    "title": e.title, "amount_total": e.amount, "currency": "USD", "by": e.by,
+    "date_raw": e.day.strftime("%m/%d/%Y"), "category_raw": e.category,
+    "your_share": e.shares[members.index(you)],
+  }
+
+def splid_sheet(members: List[str], expenses: Iterable[Expense]) -> List[list]:
+  """Export-shaped grid: preamble, header, then per member a paid column and a share column."""
+  header = ["Title", "Amount", "Currency", "By", "Created on", "Category"]
+  for m in members:
+    header += [m, ""]
+  grid: List[list] = [["Splid export"] + [""] * (len(header) - 1), [""] * len(header), header]
+  for e in expenses:
+    row = [e.title, e.amount, "USD", e.by, e.day.strftime("%m/%d/%Y"), e.category]
+    for m, s in zip(members, e.shares):
+      row += [e.amount if m == e.by else 0.0, s]
+    grid.append(row)
+  return grid
+
+def write_csv(grid: List[list], path: Path) -> None:
+  with path.open("w", newline="", encoding="utf-8") as f:
+    csv.writer(f).writerows(grid)
+
+def write_xls(grid: List[list], path: Path) -> None:
+  try:
+    import xlwt
+  except ImportError as e:
+    raise ImportError(
+      "xlwt is required to write the .xls fixture. Install with: pip install -r requirements-dev.txt"
+    ) from e
+  wb = xlwt.Workbook()
+  ws = wb.add_sheet("Expenses")
+  for i, row in enumerate(grid):
+    for j, v in enumerate(row):
+      if v != "":
+        ws.write(i, j, v)
+  wb.save(str(path))
@@ -0,0 +1,340 @@
+from __future__ import annotations
+import csv
+import importlib
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields, is_dataclass
+from itertools import islice
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from analytics.card_matching import exact_match
+from analytics.cards import calendarize
+from analytics.fuzzy_matching import scored_match
+from analytics.monthly_aggregates import monthly_living_totals
+from budgeting.weekly_budget import forecast_from_totals, forecast_monthly_spend
+from config.loader import UnifiedConfig
+from core.models import CreditCardTransaction
+from ingest.splid import iter_splid_text, parse_splid_xls
+from normalize import iter_normalized, normalize_rows
+from reports import summarize_month
+from store.sqlite_store import TransactionStore
+from synthetic import HOUSEMATES, MERCHANTS, raw_row, splid_sheet, synthetic_expenses, write_csv, write_xls
+
+# Differential verification of alternative engines against the reference functions
+# the reports are defined by. Every stage gets the same dataset for the reference and
+# for each engine; outputs are compared with every number in whole cents, and wall time
+# is kept per engine, so one run reports both mismatches and speedups. Synthetic
+# datasets are independent, so they can be generated and checked on a process pool.
+
+Engine = Callable[["Dataset"], Any]
+
+@dataclass
+class Dataset:
+  name: str
+  cfg: UnifiedConfig
+  raw_rows: List[dict]                           # ingest output the later stages start from
+  cards: List[CreditCardTransaction]
+  workdir: Path
+  xls_path: Optional[Path] = None                # same sheet as .xls (reference ingest) ...
+  text_path: Optional[Path] = None               # ... and as CSV
+  rows: List[dict] = field(default_factory=list)
+  rows_by_month: Dict[str, List[dict]] = field(default_factory=dict)
+  cards_by_month: Dict[str, List[CreditCardTransaction]] = field(default_factory=dict)
+
+  @property
+  def you(self) -> str:
+    return self.cfg.you.name
+
+  @property
+  def months(self) -> List[str]:
+    return sorted(self.rows_by_month)
+
+  def prepare(self) -> "Dataset":
+    """Derived inputs, built once with the reference functions (never timed)."""
+    self.rows = normalize_rows(self.raw_rows, self.cfg.bucket)
+    by_month: Dict[str, List[dict]] = {}
+    for r in self.rows:
+      by_month.setdefault(r["month"], []).append(r)
+    self.rows_by_month = by_month
+    self.cards_by_month = dict(calendarize(self.cards, use_post_date=self.cfg.cc_sources.use_posting_date_for_month))
+    return self
+
+# ---- stages: reference + built-in alternatives ----
+
+def _ingest_xls(ds: Dataset):
+  return parse_splid_xls(ds.xls_path, ds.you)
+
+def _ingest_text(ds: Dataset):
+  return list(iter_splid_text(ds.text_path, ds.you))
+
+def _normalize_ref(ds: Dataset):
+  return normalize_rows(ds.raw_rows, ds.cfg.bucket)
+
+def _normalize_lazy(ds: Dataset):
+  return list(iter_normalized(ds.raw_rows, ds.cfg.bucket))
+
+def _match_ref(ds: Dataset):
+  m = ds.cfg.cc_match
+  return {
+    month: exact_match(ds.cards_by_month.get(month, []), rows, ds.you,
+                       m.amount_tolerance_cents, m.date_window_days, m.only_if_payer_is_you)
+    for month, rows in ds.rows_by_month.items()
+  }
+
+def _match_scored(ds: Dataset):
+  # no percentage tolerance and no score floor: every candidate pair the exact rule accepts
+  # is an edge, so with distinct amounts the one-to-one assignment picks the same charges
+  m = ds.cfg.cc_match
+  out = {}
+  for month, rows in ds.rows_by_month.items():
+    matched, unmatched, _ = scored_match(ds.cards_by_month.get(month, []), rows, ds.you,
+                                         amount_tol_cents=m.amount_tolerance_cents, amount_tol_pct=0.0,
+                                         date_window_days=m.date_window_days,
+                                         only_if_payer_is_you=m.only_if_payer_is_you, min_score=0.0)
+    out[month] = (matched, unmatched)
+  return out
+
+def _forecast_ref(ds: Dataset):
+  return {m: forecast_monthly_spend(ds.rows, m, ds.cfg.budgeting) for m in ds.months}
+
+def _forecast_totals(ds: Dataset):
+  b = ds.cfg.budgeting
+  totals = monthly_living_totals(ds.rows, use_your_share=b.use_your_share, exclude_buckets=b.exclude_buckets)
+  return {m: forecast_from_totals(totals, m, b) for m in ds.months}
+
+def _summarize_ref(ds: Dataset):
+  return {m: summarize_month(rows) for m, rows in ds.rows_by_month.items()}
+
+def _summarize_sqlite(ds: Dataset):
+  path = ds.workdir / "verify.sqlite"
+  for p in ds.workdir.glob("verify.sqlite*"):
+    p.unlink()
+  with TransactionStore(path) as store:
+    with store.conn:
+      store.insert_rows(ds.you, ds.rows)
+    totals = store.monthly_living_totals(ds.you)
+    return {
+      m: {"living_total": totals.get(m, 0.0), "per_bucket": store.spend_by_bucket(ds.you, f"{m}-01", f"{m}-31")}
+      for m in ds.months
+    }
+
+@dataclass
+class StageSpec:
+  reference: Engine
+  engines: Dict[str, Engine] = field(default_factory=dict)
+  needs: str = ""        # Dataset attribute the stage can't run without
+
+STAGES: Dict[str, StageSpec] = {
+  "ingest": StageSpec(_ingest_xls, {"text": _ingest_text}, needs="xls_path"),
+  "normalize": StageSpec(_normalize_ref, {"lazy": _normalize_lazy}),
+  "match": StageSpec(_match_ref, {"scored": _match_scored}),
+  "forecast": StageSpec(_forecast_ref, {"totals": _forecast_totals}),
+  "summarize": StageSpec(_summarize_ref, {"sqlite": _summarize_sqlite}),
+}
+
+def load_engine(spec: str) -> tuple[str, str, Engine]:
+  """'stage=package.module:function' -> (stage, function name, function)."""
+  stage, _, target = spec.partition("=")
+  module, _, func = target.partition(":")
+  if stage not in STAGES or not module or not func:
+    raise ValueError(f"engine spec must be <stage>=<module>:<function> with stage in {', '.join(STAGES)}; got {spec!r}")
+  return stage, func, getattr(importlib.import_module(module), func)
+
+# ---- comparing to the cent ----
+
+def canonical(x: Any) -> Any:
+  """Numbers -> whole cents, dataclasses -> dicts, tuples -> lists; the form outputs are compared in."""
+  if x is None or isinstance(x, (bool, str)):
+    return x
+  if isinstance(x, (int, float)):
+    return int(round(x * 100))
+  if is_dataclass(x):
+    return {f.name: canonical(getattr(x, f.name)) for f in fields(x)}
+  if isinstance(x, dict):
+    return {str(k): canonical(v) for k, v in x.items()}
+  if isinstance(x, (list, tuple)):
+    return [canonical(v) for v in x]
+  return repr(x)
+
+def diff(ref: Any, alt: Any, path: str = "", limit: int = 5) -> List[str]:
+  """Up to `limit` differences between two canonical values, as 'path: reference != engine'."""
+  out: List[str] = []
+
+  def walk(a, b, p):
+    if len(out) >= limit:
+      return
+    if isinstance(a, dict) and isinstance(b, dict):
+      for k in sorted(set(a) | set(b)):
+        kp = f"{p}.{k}" if p else k
+        if k not in b:
+          out.append(f"{kp}: missing from engine")
+        elif k not in a:
+          out.append(f"{kp}: not in reference")
+        else:
+          walk(a[k], b[k], kp)
+        if len(out) >= limit:
+          return
+    elif isinstance(a, list) and isinstance(b, list):
+      if len(a) != len(b):
+        out.append(f"{p}: {len(a)} items != {len(b)} items")
+      # past the first differing item the rest is usually just shifted
+      for i, (x, y) in enumerate(zip(a, b)):
+        if x != y:
+          walk(x, y, f"{p}[{i}]")
+          return
+    elif a != b:
+      out.append(f"{p or '<output>'}: {a!r} != {b!r}")
+
+  walk(ref, alt, path)
+  return out
+
+# ---- running ----
+
+@dataclass
+class Outcome:
+  dataset: str
+  stage: str
+  engine: str
+  ref_seconds: float = 0.0
+  seconds: float = 0.0
+  mismatches: List[str] = field(default_factory=list)
+  skipped: str = ""       # why the stage didn't run on this dataset
+
+def _timed(fn: Engine, ds: Dataset, repeat: int):
+  best, out = float("inf"), None
+  for _ in range(max(1, repeat)):
+    t0 = time.perf_counter()
+    out = fn(ds)
+    best = min(best, time.perf_counter() - t0)
+  return out, best
+
+def verify_dataset(ds: Dataset, stages: List[str] | None = None, extra: List[str] | None = None,
+                   repeat: int = 1) -> List[Outcome]:
+  """Run each stage's reference and engines on `ds` (best of `repeat` timings each)."""
+  engines: Dict[str, Dict[str, Engine]] = {name: dict(s.engines) for name, s in STAGES.items()}
+  for spec in extra or []:
+    stage, name, fn = load_engine(spec)
+    engines[stage][name] = fn
+  ds.prepare()
+  out: List[Outcome] = []
+  for stage in stages or list(STAGES):
+    spec = STAGES[stage]
+    if not engines[stage]:
+      out.append(Outcome(ds.name, stage, "-", skipped="no alternative engine"))
+      continue
+    if spec.needs and getattr(ds, spec.needs) is None:
+      out += [Outcome(ds.name, stage, name, skipped=f"no {spec.needs}") for name in engines[stage]]
+      continue
+    ref, ref_s = _timed(spec.reference, ds, repeat)
+    ref_c = canonical(ref)
+    for name, fn in engines[stage].items():
+      o = Outcome(ds.name, stage, name, ref_seconds=ref_s)
+      try:
+        alt, o.seconds = _timed(fn, ds, repeat)
+        o.mismatches = diff(ref_c, canonical(alt))
+      except Exception as e:
+        o.mismatches = [f"engine raised {type(e).__name__}: {e}"]
+      out.append(o)
+  return out
+
+# ---- datasets ----
+
+_SPAN_MONTHS = 36
+
+def synthetic_dataset(cfg: UnifiedConfig, seed: int, n_rows: int, workdir: Path) -> Dataset:
+  """
+  A Splid sheet (written as .xls and as CSV) with you and two housemates, settle-up
+  payments, and card statements where most of your house purchases reappear (some a
+  day or a cent off) next to personal charges and credits.
+  """
+  rnd = random.Random(seed)
+  you = cfg.you.name
+  members = [you, *HOUSEMATES]
+  expenses = list(islice(
+    synthetic_expenses(members, _SPAN_MONTHS, -(-n_rows // _SPAN_MONTHS), seed=seed, payment_share=0.03, spread=0.3),
+    n_rows,
+  ))
+  cards: List[CreditCardTransaction] = []
+  for e in expenses:
+    if e.by == you and e.title != "Payment" and rnd.random() < 0.6:
+      off = 0.01 if rnd.random() < 0.1 else 0.0
+      post = e.day + timedelta(days=rnd.randrange(4))
+      cards.append(CreditCardTransaction(e.day.isoformat(), post.isoformat(), e.title.upper(), round(e.amount + off, 2),
+                                         "purchases_adjustments", "1234"))
+  start = date(2023, 1, 1)
+  for _ in range(n_rows // 4):
+    d = start + timedelta(days=rnd.randrange(_SPAN_MONTHS * 365 // 12))
+    credit = rnd.random() < 0.1
+    cards.append(CreditCardTransaction(
+      d.isoformat(), (d + timedelta(days=1)).isoformat(), rnd.choice(MERCHANTS),
+      round(-rnd.uniform(5, 300) if credit else rnd.uniform(3, 150), 2),
+      "payments_credits" if credit else "purchases_adjustments", "1234",
+    ))
+
+  grid = splid_sheet(members, expenses)
+  text_path = workdir / f"splid_{seed}.csv"
+  write_csv(grid, text_path)
+  xls_path = workdir / f"splid_{seed}.xls"
+  write_xls(grid, xls_path)
+  return Dataset(
+    name=f"synthetic seed={seed}", cfg=cfg, raw_rows=[raw_row(e, members, you) for e in expenses],
+    cards=cards, workdir=workdir, xls_path=xls_path, text_path=text_path,
+  )
+
+def real_dataset(cfg: UnifiedConfig, workdir: Path) -> Dataset:
+  """The configured inputs: latest Splid export (plus a CSV copy of an .xls) and the card statements."""
+  import pipeline
+  export = pipeline._find_latest_splid_export(cfg.paths.inputs_dir / "splid")
+  cards = pipeline._ingest_cards(cfg)
+  if export.suffix.lower() != ".xls":
+    return Dataset(name=export.name, cfg=cfg, raw_rows=list(iter_splid_text(export, cfg.you.name)),
+                   cards=cards, workdir=workdir, text_path=export)
+  import pandas as pd
+  sheet = pd.read_excel(export, header=None, dtype=object, engine="xlrd")
+  text_path = workdir / (export.stem + ".csv")
+  with text_path.open("w", newline="", encoding="utf-8") as f:
+    csv.writer(f).writerows(["" if pd.isna(v) else v for v in row] for row in sheet.itertuples(index=False))
+  return Dataset(name=export.name, cfg=cfg, raw_rows=parse_splid_xls(export, cfg.you.name),
+                 cards=cards, workdir=workdir, xls_path=export, text_path=text_path)
+
+def _verify_synthetic(cfg: UnifiedConfig, n_rows: int, stages: List[str] | None, extra: List[str] | None,
+                      repeat: int, seed: int) -> List[Outcome]:
+  with tempfile.TemporaryDirectory(prefix="splid-verify-") as tmp:
+    return verify_dataset(synthetic_dataset(cfg, seed, n_rows, Path(tmp)), stages, extra, repeat)
+
+def verify_synthetic(cfg: UnifiedConfig, seeds: List[int], n_rows: int, stages: List[str] | None = None,
+                     extra: List[str] | None = None, repeat: int = 1, workers: int = 0) -> List[Outcome]:
+  """One generated dataset per seed; `workers` > 1 checks them on a process pool."""
+  args = (cfg, n_rows, stages, extra, repeat)
+  if workers > 1 and len(seeds) > 1:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+      parts = list(pool.map(_verify_synthetic, *zip(*[args] * len(seeds)), seeds))
+  else:
+    parts = [_verify_synthetic(*args, s) for s in seeds]
+  return [o for part in parts for o in part]
+
+def format_report(outcomes: List[Outcome], examples: int = 3) -> str:
+  """Per stage/engine: datasets checked, datasets with mismatches, summed times and speedup."""
+  groups: Dict[tuple, List[Outcome]] = {}
+  for o in outcomes:
+    groups.setdefault((o.stage, o.engine), []).append(o)
+  lines = [f"{'stage':<10} {'engine':<12} {'datasets':>8} {'mismatch':>8} {'ref s':>9} {'engine s':>9} {'speedup':>8}"]
+  notes: List[str] = []
+  for (stage, engine), os_ in groups.items():
+    ran = [o for o in os_ if not o.skipped]
+    bad = [o for o in ran if o.mismatches]
+    if not ran:
+      lines.append(f"{stage:<10} {engine:<12} {'skipped (' + os_[0].skipped + ')':>27}")
+      continue
+    ref_s, alt_s = sum(o.ref_seconds for o in ran), sum(o.seconds for o in ran)
+    speedup = f"{ref_s / alt_s:.2f}x" if alt_s > 0 else "—"
+    lines.append(f"{stage:<10} {engine:<12} {len(ran):>8} {len(bad):>8} {ref_s:>9.4f} {alt_s:>9.4f} {speedup:>8}")
+    for o in bad[:examples]:
+      notes += [f"  [{stage}/{engine}] {o.dataset}: {m}" for m in o.mismatches]
+  if notes:
+    lines += ["", "Mismatches (reference != engine, amounts in cents):"] + notes
+  return "\n".join(lines)
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# the modules import each other from src/ (e.g. `from core.models import ...`)
+SRC = Path(__file__).resolve().parents[1] / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
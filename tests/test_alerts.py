@@ -0,0 +1,58 @@
+from analytics.alerts import AlertEngine
+
+RULES = [
+    {"name": "High living", "metric": "living_total", "above": 1000},
+    {"name": "Living jump", "metric": "living_total", "compare": "mom", "percent": True, "above": 20},
+]
+MONTHS = {
+    "2025-01": {"living_total": 900.0, "income": 3000.0},
+    "2025-02": {"living_total": 950.0, "income": 3000.0},
+    "2025-03": {"living_total": 1200.0, "income": 3000.0},
+}
+
+
+def _fired(engine):
+    return [(a.month, a.rule) for a in engine.alerts()]
+
+
+def test_first_run_evaluates_everything():
+    e = AlertEngine(RULES)
+    e.run(MONTHS)
+    assert e.evaluated == len(RULES) * len(MONTHS)
+    assert _fired(e) == [("2025-03", "High living"), ("2025-03", "Living jump")]
+
+
+def test_unchanged_inputs_evaluate_nothing(tmp_path):
+    e = AlertEngine(RULES)
+    e.run(MONTHS)
+    e.save(tmp_path / "alerts.json")
+    again = AlertEngine.load(tmp_path / "alerts.json", RULES)
+    # a metric no rule reads changing doesn't count as an input change either
+    again.run({**MONTHS, "2025-02": {"living_total": 950.0, "income": 9999.0}})
+    assert again.evaluated == 0
+    assert _fired(again) == _fired(e)
+
+
+def test_changed_month_reevaluates_itself_and_its_readers():
+    e = AlertEngine(RULES)
+    e.run(MONTHS)
+    e.run({"2025-02": {"living_total": 1100.0}})
+    # value rule: Feb; mom rule: Feb and March (which compares against Feb)
+    assert e.evaluated == 3
+    assert _fired(e) == [("2025-02", "High living"), ("2025-02", "Living jump"), ("2025-03", "High living")]
+    fresh = AlertEngine(RULES)
+    fresh.run({**MONTHS, "2025-02": {"living_total": 1100.0, "income": 3000.0}})
+    assert _fired(fresh) == _fired(e)
+
+
+def test_new_rule_runs_over_history_and_removed_rule_drops_its_alerts(tmp_path):
+    e = AlertEngine(RULES)
+    e.run(MONTHS)
+    e.save(tmp_path / "alerts.json")
+    rules = RULES[1:] + [{"name": "Low income", "metric": "income", "below": 3500}]
+    e2 = AlertEngine.load(tmp_path / "alerts.json", rules)
+    e2.run(MONTHS)
+    assert e2.evaluated == len(MONTHS)
+    assert _fired(e2) == [
+        ("2025-01", "Low income"), ("2025-02", "Low income"), ("2025-03", "Living jump"), ("2025-03", "Low income"),
+    ]
@@ -0,0 +1,63 @@
+import itertools
+import random
+
+from budgeting.balances import BalanceBook, _zero_sum_groups, settle_greedy, settle_up
+
+
+def _apply(net, transfers):
+    out = dict(net)
+    for frm, to, amt in transfers:
+        out[frm] += round(amt * 100)
+        out[to] -= round(amt * 100)
+    return out
+
+
+def _max_zero_sum_groups(cents):
+    # brute force: the most blocks a partition into zero-sum groups can have
+    n = len(cents)
+    best = {0: 0}
+    for mask in range(1, 1 << n):
+        total = sum(cents[i] for i in range(n) if mask >> i & 1)
+        best[mask] = max(best[mask & ~(1 << i)] for i in range(n) if mask >> i & 1) + (total == 0)
+    return best[(1 << n) - 1]
+
+
+def test_fewer_transfers_than_greedy():
+    net = {"A": 200, "B": 400, "C": -500, "D": -400, "E": 300}
+    assert len(settle_greedy(net)) == 4
+    transfers = settle_up(net)
+    assert len(transfers) == 3
+    assert all(v == 0 for v in _apply(net, transfers).values())
+
+
+def test_groups_are_zero_sum_and_maximal():
+    rnd = random.Random(5)
+    for _ in range(300):
+        n = rnd.randint(2, 7)
+        cents = [rnd.choice([-1, 1]) * rnd.randint(1, 5) * 100 for _ in range(n - 1)]
+        cents.append(-sum(cents))
+        if 0 in cents:
+            continue
+        members = [chr(65 + i) for i in range(n)]
+        groups = _zero_sum_groups(members, cents)
+        value = dict(zip(members, cents))
+        assert sorted(itertools.chain.from_iterable(groups)) == members
+        assert all(sum(value[m] for m in g) == 0 for g in groups)
+        assert len(groups) == _max_zero_sum_groups(cents)
+        transfers = settle_up(value)
+        assert len(transfers) == n - len(groups)
+        assert all(v == 0 for v in _apply(value, transfers).values())
+
+
+def test_unbalanced_falls_back_to_greedy():
+    net = {"A": 500, "B": -300}
+    assert settle_up(net) == settle_greedy(net) == [("B", "A", 3.0)]
+
+
+def test_book_nets_to_zero():
+    book = BalanceBook()
+    book.add("A", 90.0, {"A": 30.0, "B": 30.0, "C": 30.0})
+    book.add("B", 10.01, {"A": 3.34, "B": 3.34, "C": 3.33})
+    book.add("C", 40.0, {"A": 40.0})           # a settle-up payment C -> A
+    assert sum(book.net.values()) == 0
+    assert book.balances() == {"A": 16.66, "B": -23.33, "C": 6.67}
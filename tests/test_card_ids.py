@@ -0,0 +1,39 @@
+from core.models import CreditCardTransaction
+from ingest.cards.ids import CardDeduper, dedup_statements
+
+
+def _c(day, desc, amount, account="1234"):
+    return CreditCardTransaction(day, day, desc, amount, "purchases_adjustments", account)
+
+
+def test_overlapping_statements_keep_each_charge_once():
+    july = [_c("2025-07-30", "COFFEE", 4.5), _c("2025-07-31", "RENT", 1800.0)]
+    # August's download repeats the end of July, with different spacing and case
+    august = [_c("2025-07-31", "rent", 1800.0), _c("2025-08-01", "  GROCERY   STORE ", 80.0)]
+    out, dropped = dedup_statements([july, august])
+    assert [(c.trans_date, c.description) for c in out] == [
+        ("2025-07-30", "COFFEE"), ("2025-07-31", "RENT"), ("2025-08-01", "  GROCERY   STORE "),
+    ]
+    assert dropped == 1
+    assert len({c.txn_id for c in out}) == 3
+
+
+def test_identical_charges_in_one_statement_are_kept():
+    two_coffees = [_c("2025-08-02", "COFFEE", 4.5), _c("2025-08-02", "COFFEE", 4.5)]
+    out, dropped = dedup_statements([two_coffees])
+    assert len(out) == 2 and dropped == 0
+    assert out[0].txn_id != out[1].txn_id
+
+
+def test_overlap_counts_occurrences():
+    # the first statement saw one coffee that day, the re-download sees both
+    first = [_c("2025-08-02", "COFFEE", 4.5)]
+    full = [_c("2025-08-02", "COFFEE", 4.5), _c("2025-08-02", "COFFEE", 4.5)]
+    d = CardDeduper()
+    out = list(d.stream([first, full]))
+    assert len(out) == 2 and d.duplicates == 1
+
+
+def test_other_account_is_not_a_duplicate():
+    out, dropped = dedup_statements([[_c("2025-08-02", "COFFEE", 4.5)], [_c("2025-08-02", "COFFEE", 4.5, account="9999")]])
+    assert len(out) == 2 and dropped == 0
@@ -0,0 +1,59 @@
+import itertools
+import random
+
+from analytics.fuzzy_matching import _hungarian_max, scored_match
+from core.models import CreditCardTransaction
+
+
+def _best_total(weights):
+    n, m = len(weights), len(weights[0])
+    return max(sum(weights[i][j] for i, j in enumerate(cols)) for cols in itertools.permutations(range(m), n))
+
+
+def test_hungarian_beats_greedy():
+    # greedy takes the 10 and is left with 1; the optimum crosses over for 9 + 9
+    assert _hungarian_max([[10.0, 9.0], [9.0, 1.0]]) == [1, 0]
+
+
+def test_hungarian_matches_brute_force():
+    rnd = random.Random(3)
+    for _ in range(200):
+        n = rnd.randint(1, 4)
+        m = rnd.randint(n, 5)
+        w = [[rnd.choice([0.0, rnd.random()]) for _ in range(m)] for _ in range(n)]
+        cols = _hungarian_max(w)
+        assert len(set(cols)) == n and all(0 <= j < m for j in cols)
+        assert abs(sum(w[i][j] for i, j in enumerate(cols)) - _best_total(w)) < 1e-9
+
+
+def _row(title, amount, day, payer="Alex"):
+    return {"title": title, "amount_total": amount, "date": day, "payer": payer, "is_payment": False}
+
+
+def _charge(desc, amount, day):
+    return CreditCardTransaction(day, day, desc, amount, "purchases_adjustments")
+
+
+def test_one_row_absorbs_one_charge():
+    rows = [_row("Safeway", 50.0, "2025-03-02")]
+    charges = [_charge("SAFEWAY #12", 50.0, "2025-03-02"), _charge("SAFEWAY #12", 50.0, "2025-03-02")]
+    matched, unmatched, matches = scored_match(charges, rows, "Alex", date_window_days=3)
+    assert len(matched) == 1 and len(unmatched) == 1
+    assert len(matches) == 1
+
+
+def test_crossing_candidates_are_assigned_one_to_one():
+    # both charges could take the Costco row; the best total pairs each with its own row
+    rows = [_row("Costco", 100.00, "2025-03-05"), _row("Costco gas", 100.50, "2025-03-05")]
+    charges = [_charge("COSTCO WHSE", 100.00, "2025-03-05"), _charge("COSTCO GAS", 100.50, "2025-03-06")]
+    matched, unmatched, matches = scored_match(charges, rows, "Alex", amount_tol_cents=100, date_window_days=3)
+    assert unmatched == []
+    assert sorted((m.txn.description, m.row["title"]) for m in matches) == [
+        ("COSTCO GAS", "Costco gas"), ("COSTCO WHSE", "Costco"),
+    ]
+
+
+def test_only_your_rows_when_required():
+    rows = [_row("Safeway", 50.0, "2025-03-02", payer="Sam")]
+    matched, unmatched, _ = scored_match([_charge("SAFEWAY", 50.0, "2025-03-02")], rows, "Alex")
+    assert matched == [] and len(unmatched) == 1
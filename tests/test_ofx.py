@@ -0,0 +1,59 @@
+import pytest
+
+from ingest.cards import ofx
+from ingest.cards.ofx import iter_ofx_statement
+
+_HEADER = "OFXHEADER:100\nDATA:OFXSGML\n\n<OFX><CREDITCARDMSGSRSV1><CCSTMTTRNRS><CCSTMTRS><CCACCTFROM><ACCTID>4111222233334444\n"
+_TXNS = (
+    "<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250803120000.000[-5:EST]<DTUSER>20250801<TRNAMT>-42.17"
+    "<NAME>STARBUCKS  #1021 &amp; CO<MEMO>coffee</STMTTRN>\n"
+    "<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20250805<TRNAMT>1,250.00<NAME>PAYMENT THANK YOU</STMTTRN>\n"
+)
+_FOOTER = "</BANKTRANLIST></CCSTMTRS></CCSTMTTRNRS></CREDITCARDMSGSRSV1></OFX>\n"
+_EXPECTED = [
+    ("2025-08-01", "2025-08-03", "STARBUCKS #1021 & CO", 42.17, "purchases_adjustments", "4444"),
+    ("2025-08-05", "2025-08-05", "PAYMENT THANK YOU", -1250.0, "payments_credits", "4444"),
+]
+
+
+def _parse(path):
+    return [(c.trans_date, c.post_date, c.description, c.amount, c.section, c.account) for c in iter_ofx_statement(path)]
+
+
+def test_sgml_statement(tmp_path):
+    p = tmp_path / "s.qfx"
+    p.write_text(_HEADER + "<BANKTRANLIST>" + _TXNS + _FOOTER, encoding="utf-8")
+    assert _parse(p) == _EXPECTED
+
+
+def test_every_split_across_the_chunk_boundary(tmp_path):
+    # pad so the 64 KiB boundary falls on each character of the transactions in turn
+    p = tmp_path / "s.ofx"
+    head = _HEADER + "<BANKTRANLIST>"
+    for offset in range(len(_TXNS) + 1):
+        pad = ofx._CHUNK - len(head) - offset
+        p.write_text(head.replace("\n\n", "\n" + " " * pad + "\n", 1) + _TXNS + _FOOTER, encoding="utf-8")
+        assert _parse(p) == _EXPECTED, offset
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 3, 7, 64])
+def test_tiny_chunks(tmp_path, monkeypatch, chunk):
+    monkeypatch.setattr(ofx, "_CHUNK", chunk)
+    p = tmp_path / "s.ofx"
+    p.write_text(_HEADER + "<BANKTRANLIST>" + _TXNS + _FOOTER, encoding="utf-8")
+    assert _parse(p) == _EXPECTED
+
+
+def test_xml_flavour_spanning_chunks(tmp_path):
+    body = "".join(
+        f"<STMTTRN><TRNTYPE>DEBIT</TRNTYPE><DTPOSTED>20250810</DTPOSTED><TRNAMT>-{i}.25</TRNAMT>"
+        f"<NAME>SHOP {i}</NAME></STMTTRN>\n"
+        for i in range(1, 3001)
+    )
+    p = tmp_path / "s.ofx"
+    p.write_text('<?xml version="1.0"?>\n<OFX><ACCTID>99990001</ACCTID><BANKTRANLIST>' + body + _FOOTER, encoding="utf-8")
+    assert p.stat().st_size > 2 * ofx._CHUNK
+    txns = list(iter_ofx_statement(p))
+    assert [t.description for t in txns] == [f"SHOP {i}" for i in range(1, 3001)]
+    assert [t.amount for t in txns[:2]] == [1.25, 2.25]
+    assert {t.account for t in txns} == {"0001"}